@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+@Time    : 2026/10/18 20:00
+@Author  : Manus AI
+@File    : aho_corasick.py
+@Desc    : Aho-Corasick多模式匹配自动机：一次扫描文本统计所有关键词的出现次数
+"""
+
+from collections import deque
+from typing import Dict, List
+
+
+class AhoCorasick:
+    """
+    Aho-Corasick自动机
+
+    计数语义与 len(re.findall(keyword, text)) 一致：每个关键词按从左到右、互不重叠的方式计数
+    （如在 "aaaa" 中 "aa" 计2次）。不同关键词之间可以重叠，各自独立计数。
+    """
+
+    def __init__(self, patterns: List[str]):
+        """
+        构建自动机
+
+        :param patterns: 模式串列表（非空字符串），计数结果以列表下标为键
+        """
+        self.patterns = list(patterns)
+        self.lengths = [len(pattern) for pattern in self.patterns]
+        # goto[state]: 字符 -> 下一状态；fail[state]: 失配转移；output[state]: 在该状态结束的模式下标
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.output: List[List[int]] = [[]]
+
+        for index, pattern in enumerate(self.patterns):
+            if not pattern:
+                raise ValueError("模式串不能为空")
+            state = 0
+            for char in pattern:
+                next_state = self.goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][char] = next_state
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                state = next_state
+            self.output[state].append(index)
+
+        self._build_fail_links()
+
+    def _build_fail_links(self):
+        """按广度优先计算失配转移，并把失配状态的输出合并到当前状态"""
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(char, 0)
+                self.output[next_state] = self.output[next_state] + self.output[self.fail[next_state]]
+
+    def count(self, text: str) -> Dict[int, int]:
+        """
+        统计各模式在文本中的出现次数（互不重叠）
+
+        :param text: 待匹配文本
+        :return: {模式下标: 出现次数}，只包含出现过的模式
+        """
+        goto, fail, output, lengths = self.goto, self.fail, self.output, self.lengths
+        counts: Dict[int, int] = {}
+        last_end: Dict[int, int] = {}
+        state = 0
+
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for index in output[state]:
+                # 与上一次计数的同一模式重叠时跳过（re.findall的非重叠语义）
+                if position - lengths[index] + 1 >= last_end.get(index, 0):
+                    counts[index] = counts.get(index, 0) + 1
+                    last_end[index] = position + 1
+
+        return counts
@@ -13,6 +13,7 @@ from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker, Session
 from loguru import logger
 
+from app.core.migrations import ensure_fts
 from app.models.bid_project import Base
 
 # 从环境变量读取数据库配置
@@ -80,6 +81,28 @@ def init_database():
             conn.commit()
             logger.info("其他索引创建成功")
 
+            # 补齐旧版本数据库中新增的字段
+            conn.execute(text("""
+                ALTER TABLE crawl_logs ADD COLUMN IF NOT EXISTS metrics JSONB;
+            """))
+            conn.execute(text("""
+                ALTER TABLE seen_urls ADD COLUMN IF NOT EXISTS status VARCHAR(10) NOT NULL DEFAULT 'done';
+                ALTER TABLE seen_urls ADD COLUMN IF NOT EXISTS failures INTEGER NOT NULL DEFAULT 0;
+            """))
+            conn.commit()
+
+            # 旧版本的关键词命中表没有外键：清理已删除项目遗留的明细后补上级联删除
+            _add_keyword_hits_foreign_key(conn)
+            conn.commit()
+
+            # 关键词配置变更时递增版本号，进程内的已编译匹配器据此判断是否需要重建
+            _create_keyword_version_triggers(conn)
+            conn.commit()
+
+            # 全文检索向量由数据库触发器生成：只在缺失时安装，分词方式变化时报错
+            # （重装并回填历史数据: python migrate_database.py fts）
+            ensure_fts(conn)
+
         # 初始化关键词数据
         _init_keywords()
 
@@ -90,6 +113,59 @@ def init_database():
         raise
 
 
+def _add_keyword_hits_foreign_key(conn):
+    """
+    为 project_keyword_hits.project_id 补充外键（删除项目时级联删除命中明细），已存在时跳过
+
+    :param conn: 数据库连接
+    """
+    exists = conn.execute(text("""
+        SELECT 1 FROM pg_constraint
+        WHERE conname = 'project_keyword_hits_project_id_fkey'
+          AND conrelid = 'project_keyword_hits'::regclass;
+    """)).first()
+    if exists:
+        return
+
+    orphans = conn.execute(text("""
+        DELETE FROM project_keyword_hits AS h
+        WHERE NOT EXISTS (SELECT 1 FROM bid_projects AS p WHERE p.project_id = h.project_id);
+    """)).rowcount
+    conn.execute(text("""
+        ALTER TABLE project_keyword_hits ADD CONSTRAINT project_keyword_hits_project_id_fkey
+        FOREIGN KEY (project_id) REFERENCES bid_projects (project_id) ON DELETE CASCADE;
+    """))
+    logger.info(f"关键词命中表外键创建成功，清理遗留明细 {orphans} 条")
+
+
+def _create_keyword_version_triggers(conn):
+    """
+    创建关键词配置版本触发器
+
+    :param conn: 数据库连接
+    """
+    conn.execute(text("""
+        INSERT INTO keyword_versions (id, version) VALUES ('keywords', 0)
+        ON CONFLICT (id) DO NOTHING;
+    """))
+    conn.execute(text("""
+        CREATE OR REPLACE FUNCTION bump_keyword_version() RETURNS trigger AS $$
+        BEGIN
+            UPDATE keyword_versions SET version = version + 1, updated_at = now() WHERE id = 'keywords';
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """))
+    for table in ('keywords', 'keyword_profiles', 'profile_keywords'):
+        conn.execute(text(f"DROP TRIGGER IF EXISTS trg_{table}_version ON {table};"))
+        conn.execute(text(f"""
+            CREATE TRIGGER trg_{table}_version
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+            FOR EACH STATEMENT EXECUTE PROCEDURE bump_keyword_version();
+        """))
+    logger.info("关键词版本触发器创建成功")
+
+
 def _init_keywords():
     """初始化关键词数据"""
     from app.models.bid_project import Keyword
@@ -8,22 +8,167 @@
 @Desc    : 关键词匹配与评分算法
 """
 
+import os
 import re
-from typing import List, Dict, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
 from loguru import logger
 
+from app.core.aho_corasick import AhoCorasick
+
+# 匹配引擎：aho_corasick - 普通关键词用Aho-Corasick自动机一次扫描，含正则元字符的关键词仍用正则；
+#           regex - 逐个关键词执行re.findall（旧实现）；
+#           auto - 普通关键词数达到阈值时使用自动机，否则使用正则
+MATCHER_ENGINE = os.getenv('MATCHER_ENGINE', 'auto')
+# auto模式下启用自动机的最少关键词数：关键词很少时逐个正则匹配（C实现）比纯Python自动机更快，
+# 实测交叉点约30个关键词（benchmarks/matcher_benchmark.py）
+MATCHER_AUTOMATON_MIN_KEYWORDS = int(os.getenv('MATCHER_AUTOMATON_MIN_KEYWORDS', '30'))
+
+# 字段权重：关键词在各字段的出现次数按权重折算后计分，如标题中的关键词比正文更重要。
+# 业主单位是从正文中提取的，默认权重为0，避免与正文重复计数；默认配置下的分数与旧算法（标题+正文）一致
+MATCHER_FIELD_WEIGHTS = os.getenv('MATCHER_FIELD_WEIGHTS', 'title:1,body:1,owner_unit:0')
+
+# 正则元字符，关键词包含其中任一字符时按正则表达式匹配
+REGEX_METACHARACTERS = set('.^$*+?{}[]\\|()')
+
+
+def parse_field_weights(spec: str) -> Dict[str, float]:
+    """
+    解析字段权重配置
+
+    :param spec: 形如 "title:2,body:1,owner_unit:0.5" 的配置
+    :return: {字段名: 权重}
+    """
+    weights = {}
+    for item in spec.split(','):
+        if not item.strip():
+            continue
+        name, _, weight = item.partition(':')
+        weights[name.strip()] = float(weight)
+    return weights
+
+
+def round_scores(scores: np.ndarray) -> np.ndarray:
+    """
+    分数保留两位小数，舍入结果与逐篇计算使用的内置round一致
+
+    np.round 先乘100再舍入，遇到 49.825 这类二进制下略大于中点的值会与 round 结果不同
+
+    :param scores: 分数数组
+    :return: 舍入后的分数数组
+    """
+    return np.array([round(score, 2) for score in scores.ravel().tolist()], dtype=np.float64).reshape(scores.shape)
+
+
+def is_literal_keyword(keyword: str) -> bool:
+    """
+    关键词是否为普通字符串（不含正则元字符）
+
+    :param keyword: 关键词
+    :return: True表示可以用自动机按字面匹配
+    """
+    return bool(keyword) and not REGEX_METACHARACTERS.intersection(keyword)
+
+
+class KeywordCountMatrix:
+    """
+    关键词计数矩阵（文档 × 关键词），CSR稀疏格式
+
+    绝大多数文档只命中少数关键词，稀疏存储避免 文档数 × 关键词数 的稠密矩阵占用内存
+    """
+
+    def __init__(self, data: np.ndarray, indices: np.ndarray, indptr: np.ndarray, shape: Tuple[int, int]):
+        """
+        :param data: 非零计数
+        :param indices: 非零计数对应的关键词下标（每行内升序）
+        :param indptr: 每行在data中的起止位置，长度为文档数+1
+        :param shape: (文档数, 关键词数)
+        """
+        self.data = data
+        self.indices = indices
+        self.indptr = indptr
+        self.shape = shape
+
+    @property
+    def row_ids(self) -> np.ndarray:
+        """每个非零计数所在的行（文档）下标"""
+        return np.repeat(np.arange(self.shape[0]), np.diff(self.indptr))
+
+    def score(self, weights: Sequence[float]) -> np.ndarray:
+        """
+        按给定权重一次性计算所有文档的分数：Σ weight × (1 + 0.5 × (count - 1))
+
+        :param weights: 各关键词权重（长度为关键词数），可传入不同于当前配置的权重做假设分析
+        :return: 各文档分数（保留两位小数）
+        """
+        weights = np.asarray(weights, dtype=np.float64)
+        if weights.shape != (self.shape[1],):
+            raise ValueError(f"权重数量 {weights.shape} 与关键词数 {self.shape[1]} 不一致")
+        contributions = weights[self.indices] * (1 + 0.5 * (self.data - 1))
+        # 按行内关键词顺序依次累加，与逐篇计算的浮点结果一致
+        totals = np.bincount(self.row_ids, weights=contributions, minlength=self.shape[0])
+        return round_scores(totals)
+
+    def toarray(self) -> np.ndarray:
+        """转换为稠密矩阵"""
+        dense = np.zeros(self.shape, dtype=self.data.dtype)
+        dense[self.row_ids, self.indices] = self.data
+        return dense
+
+    def to_scipy(self):
+        """转换为scipy.sparse.csr_matrix（需安装scipy）"""
+        from scipy.sparse import csr_matrix
+
+        return csr_matrix((self.data, self.indices, self.indptr), shape=self.shape)
+
 
 class KeywordMatcher:
     """关键词匹配器"""
 
-    def __init__(self, keywords: List[Dict[str, any]]):
+    def __init__(self, keywords: List[Dict[str, any]], engine: str = MATCHER_ENGINE):
         """
         初始化匹配器
 
         :param keywords: 关键词列表，每个元素包含 {'keyword': str, 'weight': float}
+        :param engine: 匹配引擎，auto、aho_corasick 或 regex
         """
+        if engine not in ('auto', 'aho_corasick', 'regex'):
+            raise ValueError(f"未知匹配引擎: {engine}")
         self.keywords = keywords
-        logger.info(f"关键词匹配器初始化完成，共 {len(keywords)} 个关键词")
+        self.engine = engine
+
+        # 自动机只构建一次，按关键词在列表中的下标计数
+        literal = [] if engine == 'regex' else [
+            index for index, kw_data in enumerate(keywords) if is_literal_keyword(kw_data['keyword'])
+        ]
+        if engine == 'auto' and len(literal) < MATCHER_AUTOMATON_MIN_KEYWORDS:
+            literal = []
+        self._automaton_indices = literal
+        self._automaton = AhoCorasick([keywords[index]['keyword'] for index in literal]) if literal else None
+        literal_set = set(literal)
+        self._regex_indices = [index for index in range(len(keywords)) if index not in literal_set]
+
+        logger.info(
+            f"关键词匹配器初始化完成，共 {len(keywords)} 个关键词"
+            f"（自动机 {len(literal)} 个，正则 {len(self._regex_indices)} 个）"
+        )
+
+    def count_keywords(self, text: str) -> Dict[int, int]:
+        """
+        统计各关键词在文本中的出现次数
+
+        :param text: 待匹配的文本
+        :return: {关键词下标: 出现次数}，只包含出现过的关键词
+        """
+        counts = {}
+        if self._automaton:
+            for pattern_index, count in self._automaton.count(text).items():
+                counts[self._automaton_indices[pattern_index]] = count
+        for index in self._regex_indices:
+            count = len(re.findall(self.keywords[index]['keyword'], text))
+            if count > 0:
+                counts[index] = count
+        return counts
 
     def calculate_match_score(self, text: str) -> Tuple[float, Dict[str, int]]:
         """
@@ -38,12 +183,14 @@ class KeywordMatcher:
         total_score = 0.0
         match_details = {}
 
-        for kw_data in self.keywords:
+        # 统计关键词出现次数，按关键词列表顺序累加分数（与逐个匹配的结果完全一致）
+        counts = self.count_keywords(text)
+
+        for index in sorted(counts):
+            kw_data = self.keywords[index]
             keyword = kw_data['keyword']
             weight = kw_data['weight']
-
-            # 统计关键词出现次数
-            count = len(re.findall(keyword, text))
+            count = counts[index]
 
             if count > 0:
                 match_details[keyword] = count
@@ -57,6 +204,67 @@ class KeywordMatcher:
         logger.info(f"文本匹配总分: {total_score:.2f}, 匹配关键词: {list(match_details.keys())}")
         return round(total_score, 2), match_details
 
+    def count_matrix(self, texts: Iterable[str]) -> KeywordCountMatrix:
+        """
+        统计一批文本的关键词计数矩阵
+
+        :param texts: 文本（None或空字符串计为全零行）
+        :return: 计数矩阵（文档 × 关键词）
+        """
+        data, indices, indptr = [], [], [0]
+        for text in texts:
+            counts = self.count_keywords(text) if text else {}
+            for index in sorted(counts):
+                indices.append(index)
+                data.append(counts[index])
+            indptr.append(len(indices))
+
+        return KeywordCountMatrix(
+            np.array(data, dtype=np.int32),
+            np.array(indices, dtype=np.int64),
+            np.array(indptr, dtype=np.int64),
+            (len(indptr) - 1, len(self.keywords))
+        )
+
+    def score_batch(self, texts: Iterable[str],
+                    weights: Optional[Sequence[float]] = None) -> Tuple[np.ndarray, KeywordCountMatrix]:
+        """
+        批量计算匹配分数：逐篇扫描得到计数矩阵后，一次向量化计算全部分数
+
+        :param texts: 文本
+        :param weights: 各关键词权重，默认使用关键词配置中的权重
+        :return: (各文档分数, 计数矩阵)，分数与逐篇调用 calculate_match_score 的结果一致
+        """
+        matrix = self.count_matrix(texts)
+        scores = matrix.score(self.weights if weights is None else weights)
+        logger.info(f"批量匹配完成，共 {matrix.shape[0]} 篇，命中 {int((scores > 0).sum())} 篇")
+        return scores, matrix
+
+    def iter_score_batches(self, texts: Iterable[str], batch_size: int = 1000,
+                           weights: Optional[Sequence[float]] = None
+                           ) -> Iterator[Tuple[np.ndarray, KeywordCountMatrix]]:
+        """
+        流式批量计算匹配分数，内存占用与批大小有关，与总文档数无关
+
+        :param texts: 文本迭代器（如数据库游标）
+        :param batch_size: 每批文档数
+        :param weights: 各关键词权重，默认使用关键词配置中的权重
+        :return: 每批的 (各文档分数, 计数矩阵) 迭代器
+        """
+        batch = []
+        for text in texts:
+            batch.append(text)
+            if len(batch) >= batch_size:
+                yield self.score_batch(batch, weights)
+                batch = []
+        if batch:
+            yield self.score_batch(batch, weights)
+
+    @property
+    def weights(self) -> np.ndarray:
+        """关键词权重向量（与关键词列表顺序一致）"""
+        return np.array([kw_data['weight'] for kw_data in self.keywords], dtype=np.float64)
+
     def is_relevant(self, text: str, threshold: float = 1.0) -> bool:
         """
         判断文本是否与业务相关
@@ -69,6 +277,160 @@ class KeywordMatcher:
         return score >= threshold
 
 
+class MultiProfileMatcher:
+    """
+    多订阅方案匹配器
+
+    所有方案的关键词合并为一个词表，由一个共享的 KeywordMatcher（自动机）扫描文本一次，
+    再通过 关键词 × 方案 的权重矩阵同时算出每个方案的分数。扫描成本只与词表大小有关，不随方案数增长
+    """
+
+    def __init__(self, profiles: List[Dict], engine: str = MATCHER_ENGINE,
+                 field_weights: Optional[Dict[str, float]] = None):
+        """
+        初始化匹配器
+
+        :param profiles: 方案列表，每个元素至少包含 {'id': str, 'keywords': [{'keyword': str, 'weight': float}]}
+        :param engine: 匹配引擎，auto、aho_corasick 或 regex
+        :param field_weights: 字段权重 {字段名: 权重}，默认读取 MATCHER_FIELD_WEIGHTS
+        """
+        self.profiles = profiles
+        self.field_weights = parse_field_weights(MATCHER_FIELD_WEIGHTS) if field_weights is None else field_weights
+        vocabulary: Dict[str, int] = {}
+        entries = []
+        for profile_index, profile in enumerate(profiles):
+            for kw_data in profile['keywords']:
+                index = vocabulary.setdefault(kw_data['keyword'], len(vocabulary))
+                entries.append((index, profile_index, kw_data['weight']))
+
+        self.keywords = list(vocabulary)
+        # weight_matrix[关键词, 方案]：关键词在该方案中的权重；membership标记关键词是否属于该方案
+        self.weight_matrix = np.zeros((len(self.keywords), len(profiles)))
+        self.membership = np.zeros((len(self.keywords), len(profiles)), dtype=bool)
+        for index, profile_index, weight in entries:
+            self.weight_matrix[index, profile_index] += weight
+            self.membership[index, profile_index] = True
+
+        self.matcher = KeywordMatcher([{'keyword': keyword, 'weight': 1.0} for keyword in self.keywords], engine)
+        logger.info(f"多方案匹配器初始化完成，共 {len(profiles)} 个方案，合并词表 {len(self.keywords)} 个关键词")
+
+    def score_profiles(self, text: str) -> Dict[str, Tuple[float, Dict[str, int]]]:
+        """
+        扫描一次文本，计算每个方案的匹配分数
+
+        :param text: 待匹配的文本（标题+正文）
+        :return: {方案ID: (总分数, 该方案各关键词出现次数字典)}
+        """
+        counts = self.matcher.count_keywords(text) if text else {}
+        return self._score_counts(counts, counts)
+
+    def score_fields(self, fields: Dict[str, Optional[str]]
+                     ) -> Tuple[Dict[str, Tuple[float, Dict[str, int]]], Dict[str, Dict[str, int]]]:
+        """
+        按字段加权计算每个方案的匹配分数，每个字段只扫描一次
+
+        关键词的计分次数为各字段出现次数按字段权重折算后的和，再按 weight × (1 + 0.5 × (次数 - 1)) 计分；
+        字段权重作用于次数而不是分数，例如标题权重为2时标题命中一次得1.5分（正文命中一次得1分）。
+        未配置权重的字段不参与计分，但仍记录命中明细
+
+        :param fields: {字段名: 文本}，如 {'title': ..., 'body': ..., 'owner_unit': ...}
+        :return: ({方案ID: (总分数, 该方案各关键词在计分字段中的出现次数)}, {关键词: {字段名: 出现次数}})
+        """
+        field_counts = {name: self.matcher.count_keywords(text) for name, text in fields.items() if text}
+
+        effective: Dict[int, float] = {}
+        details: Dict[int, int] = {}
+        for name, field_weight in self.field_weights.items():
+            if not field_weight or name not in field_counts:
+                continue
+            for index, count in field_counts[name].items():
+                effective[index] = effective.get(index, 0.0) + field_weight * count
+                details[index] = details.get(index, 0) + count
+
+        hits: Dict[str, Dict[str, int]] = {}
+        for name, counts in field_counts.items():
+            for index, count in counts.items():
+                hits.setdefault(self.keywords[index], {})[name] = count
+
+        return self._score_counts(effective, details), hits
+
+    def _score_counts(self, effective: Dict[int, float], details: Dict[int, int]
+                      ) -> Dict[str, Tuple[float, Dict[str, int]]]:
+        """
+        按关键词计分次数计算每个方案的分数
+
+        :param effective: {关键词下标: 计分次数}
+        :param details: {关键词下标: 出现次数}，用于匹配详情
+        :return: {方案ID: (总分数, 该方案各关键词出现次数字典)}
+        """
+        hits = sorted(index for index, count in effective.items() if count > 0)
+        scores = np.zeros(len(self.profiles))
+        # 按词表顺序逐个关键词累加（对所有方案同时计算），与单方案逐个匹配的结果一致
+        for index in hits:
+            scores += (1 + 0.5 * (effective[index] - 1)) * self.weight_matrix[index]
+
+        results = {}
+        for profile_index, profile in enumerate(self.profiles):
+            profile_details = {self.keywords[index]: details[index] for index in hits
+                               if self.membership[index, profile_index]}
+            results[profile['id']] = (round(float(scores[profile_index]), 2), profile_details)
+        return results
+
+    def calculate_match_score(self, text: str) -> Tuple[float, Dict[str, int]]:
+        """
+        计算文本在所有方案中的最高分数，与 KeywordMatcher.calculate_match_score 接口一致
+
+        :param text: 待匹配的文本
+        :return: (各方案最高分数, 所有命中关键词出现次数字典)
+        """
+        results = self.score_profiles(text)
+        if not results:
+            return 0.0, {}
+        details = {}
+        for _, profile_details in results.values():
+            details.update(profile_details)
+        return max(score for score, _ in results.values()), details
+
+    def score_batch(self, texts: Iterable[str]) -> np.ndarray:
+        """
+        批量计算每篇文本在每个方案中的分数
+
+        :param texts: 文本
+        :return: 分数矩阵（文档 × 方案，列顺序与方案列表一致，保留两位小数）
+        """
+        matrix = self.matcher.count_matrix(texts)
+        contributions = (1 + 0.5 * (matrix.data - 1))[:, None] * self.weight_matrix[matrix.indices]
+        totals = np.zeros((matrix.shape[0], len(self.profiles)))
+        np.add.at(totals, matrix.row_ids, contributions)
+        return round_scores(totals)
+
+    def score_batch_fields(self, documents: Sequence[Dict[str, Optional[str]]]) -> np.ndarray:
+        """
+        批量按字段加权计算每篇文档在每个方案中的分数，结果与逐篇调用 score_fields 一致
+
+        :param documents: 文档列表，每个元素为 {字段名: 文本}
+        :return: 分数矩阵（文档 × 方案，列顺序与方案列表一致，保留两位小数）
+        """
+        totals = np.zeros((len(documents), len(self.profiles)))
+        vocabulary_size = len(self.keywords)
+        rows, cols, values = [], [], []
+        for name, field_weight in self.field_weights.items():
+            if not field_weight or not vocabulary_size:
+                continue
+            matrix = self.matcher.count_matrix(document.get(name) for document in documents)
+            rows.append(matrix.row_ids)
+            cols.append(matrix.indices)
+            values.append(field_weight * matrix.data)
+        if not rows:
+            return totals
+
+        # 合并各字段中同一(文档, 关键词)的折算次数，按文档、关键词顺序排列
+        keys, inverse = np.unique(np.concatenate(rows) * vocabulary_size + np.concatenate(cols), return_inverse=True)
+        effective = np.bincount(inverse.ravel(), weights=np.concatenate(values))
+        contributions = (1 + 0.5 * (effective - 1))[:, None] * self.weight_matrix[keys % vocabulary_size]
+        np.add.at(totals, keys // vocabulary_size, contributions)
+        return round_scores(totals)
+
 if __name__ == "__main__":
     # 测试代码
     test_keywords = [
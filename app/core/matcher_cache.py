@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+@Time    : 2026/10/18 21:30
+@Author  : Manus AI
+@File    : matcher_cache.py
+@Desc    : 进程内已编译匹配器缓存：按关键词配置版本号判断是否重建，关键词未变更时直接复用
+"""
+
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from loguru import logger
+
+from app.core.matcher import MultiProfileMatcher
+from app.crud.keyword_profile_crud import get_active_profiles, get_keyword_version
+
+# 检查关键词配置版本号的最小间隔（秒），关键词修改在该时间内生效
+MATCHER_CACHE_CHECK_INTERVAL = float(os.getenv('MATCHER_CACHE_CHECK_INTERVAL', '5'))
+
+
+@dataclass(frozen=True)
+class CompiledMatcher:
+    """已编译的匹配器及其对应的关键词配置版本"""
+
+    version: Optional[int]
+    profiles: List[Dict]
+    matcher: MultiProfileMatcher
+    built_at: float
+
+
+class MatcherCache:
+    """
+    已编译匹配器缓存
+
+    读取时只比较版本号（单行查询，且每个检查间隔最多一次），版本号变化时在锁内重建匹配器，
+    构建完成后整体替换引用，其他线程看到的始终是完整的旧匹配器或新匹配器
+    """
+
+    def __init__(self, default_threshold: float = 2.0, check_interval: float = MATCHER_CACHE_CHECK_INTERVAL):
+        """
+        :param default_threshold: 默认方案（全局关键词表）的预警阈值
+        :param check_interval: 检查版本号的最小间隔（秒）
+        """
+        self.default_threshold = default_threshold
+        self.check_interval = check_interval
+        self.rebuilds = 0
+        self._compiled: Optional[CompiledMatcher] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, db: Session) -> Tuple[List[Dict], MultiProfileMatcher]:
+        """
+        获取当前关键词配置对应的匹配器
+
+        :param db: 数据库会话
+        :return: (订阅方案列表, 多方案匹配器)
+        """
+        compiled = self._compiled
+        if compiled is not None and time.monotonic() - self._checked_at < self.check_interval:
+            return compiled.profiles, compiled.matcher
+
+        with self._lock:
+            # 等锁期间其他线程可能已完成检查
+            compiled = self._compiled
+            if compiled is not None and time.monotonic() - self._checked_at < self.check_interval:
+                return compiled.profiles, compiled.matcher
+
+            version = get_keyword_version(db)
+            self._checked_at = time.monotonic()
+            # 版本表未初始化时无法判断是否变更，每次检查都重建
+            if compiled is not None and version is not None and version == compiled.version:
+                return compiled.profiles, compiled.matcher
+
+            start = time.perf_counter()
+            profiles = get_active_profiles(db, self.default_threshold)
+            compiled = CompiledMatcher(version, profiles, MultiProfileMatcher(profiles), time.time())
+            self._compiled = compiled
+            self.rebuilds += 1
+            logger.info(f"关键词配置版本 {version}，匹配器重建完成，耗时 {time.perf_counter() - start:.3f}s")
+            return compiled.profiles, compiled.matcher
+
+    def invalidate(self):
+        """丢弃缓存，下次获取时重建"""
+        with self._lock:
+            self._compiled = None
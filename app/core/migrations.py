@@ -0,0 +1,323 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+@Time    : 2026/10/18 23:00
+@Author  : Manus AI
+@File    : migrations.py
+@Desc    : 数据库迁移：全文检索向量改由数据库触发器生成，并分批回填历史数据
+"""
+
+import os
+import re
+from typing import Optional
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import Connection, Engine
+from loguru import logger
+
+from app.core.raw_store import compress_html
+from app.models.bid_project import BidProjectRaw
+
+# 全文检索配置名：chinese 需要安装 zhparser 扩展；配置不存在时回退到二元分词（simple + 汉字二元组）
+FTS_CONFIG = os.getenv('FTS_CONFIG', 'chinese')
+
+# 二元分词模式的名称（记录在已安装函数的注释中）
+FTS_MODE_BIGRAM = 'bigram'
+
+# 回填全文检索向量时每批更新的行数
+FTS_BACKFILL_BATCH_SIZE = int(os.getenv('FTS_BACKFILL_BATCH_SIZE', '2000'))
+
+# 迁移原始HTML到压缩表时每批处理的行数（HTML较大，批次比回填检索向量小）
+RAW_MIGRATION_BATCH_SIZE = int(os.getenv('RAW_MIGRATION_BATCH_SIZE', '500'))
+
+# 二元分词：汉字按相邻两字切分（"标识标牌" -> "标识 识标 标牌"），查询时同样切分，不依赖分词扩展
+_BIGRAM_FUNCTION_SQL = r"""
+CREATE OR REPLACE FUNCTION bid_fts_bigrams(doc text) RETURNS text AS $$
+    SELECT coalesce(string_agg(substr(doc, i, 2), ' ' ORDER BY i), '')
+    FROM generate_series(1, char_length(coalesce(doc, '')) - 1) AS i
+    WHERE substr(doc, i, 2) ~ '^[一-鿿]{2}$'
+$$ LANGUAGE sql IMMUTABLE;
+"""
+
+_TRIGGER_SQL = """
+CREATE OR REPLACE FUNCTION bid_projects_fts_trigger() RETURNS trigger AS $$
+BEGIN
+    NEW.content_tsvector := bid_fts_document(NEW.title, NEW.content_text);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+def validate_config_name(config: str) -> str:
+    """
+    校验全文检索配置名（会拼接进函数定义，只允许标识符）
+
+    :param config: 配置名
+    :return: 配置名
+    """
+    if not re.fullmatch(r'[a-z_][a-z0-9_]*', config):
+        raise ValueError(f"无效的全文检索配置名: {config}")
+    return config
+
+
+def build_fts_function_sql(config: str, bigram: bool) -> str:
+    """
+    构建文档向量函数和查询函数的定义
+
+    标题权重为A、正文为B，排序时标题命中优先
+
+    :param config: 全文检索配置名
+    :param bigram: 是否使用二元分词
+    :return: SQL语句
+    """
+    config = validate_config_name(config)
+    if bigram:
+        document = ("setweight(to_tsvector('simple', coalesce(title, '')) "
+                    "|| to_tsvector('simple', bid_fts_bigrams(title)), 'A') || "
+                    "setweight(to_tsvector('simple', coalesce(content, '')) "
+                    "|| to_tsvector('simple', bid_fts_bigrams(content)), 'B')")
+        query = ("plainto_tsquery('simple', CASE WHEN bid_fts_bigrams(q) = '' THEN q "
+                 "ELSE bid_fts_bigrams(q) END)")
+    else:
+        document = (f"setweight(to_tsvector('{config}', coalesce(title, '')), 'A') || "
+                    f"setweight(to_tsvector('{config}', coalesce(content, '')), 'B')")
+        query = f"plainto_tsquery('{config}', q)"
+
+    return f"""
+CREATE OR REPLACE FUNCTION bid_fts_document(title text, content text) RETURNS tsvector AS $$
+    SELECT {document}
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION bid_fts_query(q text) RETURNS tsquery AS $$
+    SELECT {query}
+$$ LANGUAGE sql IMMUTABLE;
+"""
+
+
+def resolve_fts_mode(conn: Connection, config: str = FTS_CONFIG) -> str:
+    """
+    确定实际使用的分词方式：配置存在时使用该配置，否则回退到二元分词
+
+    :param conn: 数据库连接
+    :param config: 全文检索配置名
+    :return: 配置名或 'bigram'
+    """
+    config = validate_config_name(config)
+    exists = conn.execute(text("SELECT 1 FROM pg_ts_config WHERE cfgname = :config"), {'config': config}).first()
+    return config if exists is not None else FTS_MODE_BIGRAM
+
+
+def get_installed_fts_mode(conn: Connection) -> Optional[str]:
+    """
+    读取已安装的分词方式（安装时记录在 bid_fts_document 函数的注释中）
+
+    :param conn: 数据库连接
+    :return: 函数或触发器缺失时返回None；已安装但未记录分词方式（旧版本安装）时返回空字符串
+    """
+    row = conn.execute(text("""
+        SELECT
+            to_regprocedure('bid_fts_document(text, text)') IS NOT NULL
+            AND to_regprocedure('bid_fts_query(text)') IS NOT NULL
+            AND to_regprocedure('bid_projects_fts_trigger()') IS NOT NULL
+            AND EXISTS (
+                SELECT 1 FROM pg_trigger
+                WHERE tgname = 'trg_bid_projects_fts' AND tgrelid = to_regclass('bid_projects')
+            ) AS installed,
+            obj_description(to_regprocedure('bid_fts_document(text, text)'), 'pg_proc') AS comment
+    """)).one()
+    if not row.installed:
+        return None
+    return parse_fts_mode_comment(row.comment)
+
+
+def parse_fts_mode_comment(comment: Optional[str]) -> str:
+    """
+    从函数注释中解析分词方式
+
+    :param comment: 函数注释，格式为 fts_mode=<分词方式>
+    :return: 分词方式，注释缺失或格式不符时返回空字符串
+    """
+    match = re.fullmatch(r'fts_mode=([a-z_][a-z0-9_]*)', comment or '')
+    return match.group(1) if match else ''
+
+
+def plan_fts_install(installed_mode: Optional[str], mode: str) -> str:
+    """
+    根据已安装和应使用的分词方式决定启动时的处理
+
+    :param installed_mode: 已安装的分词方式（见 get_installed_fts_mode）
+    :param mode: 当前配置对应的分词方式
+    :return: 'install'（未安装）、'ok'（已是最新）或 'mismatch'（分词方式变化，需重装并回填）
+    """
+    if installed_mode is None:
+        return 'install'
+    if installed_mode == mode:
+        return 'ok'
+    return 'mismatch'
+
+
+def install_fts(conn: Connection, config: str = FTS_CONFIG) -> str:
+    """
+    安装全文检索函数和触发器：插入或修改标题、正文时由数据库生成 content_tsvector
+
+    会重建触发器（短暂持有表的排他锁），日常启动请使用 ensure_fts
+
+    :param conn: 数据库连接
+    :param config: 全文检索配置名
+    :return: 实际使用的分词方式（配置名或 'bigram'）
+    """
+    mode = resolve_fts_mode(conn, config)
+    bigram = mode == FTS_MODE_BIGRAM
+    if bigram:
+        logger.warning(f"全文检索配置 {config} 不存在（未安装zhparser？），使用二元分词")
+
+    conn.execute(text(_BIGRAM_FUNCTION_SQL))
+    conn.execute(text(build_fts_function_sql(config, bigram)))
+    conn.execute(text(f"COMMENT ON FUNCTION bid_fts_document(text, text) IS 'fts_mode={mode}';"))
+    conn.execute(text(_TRIGGER_SQL))
+    conn.execute(text("DROP TRIGGER IF EXISTS trg_bid_projects_fts ON bid_projects;"))
+    conn.execute(text("""
+        CREATE TRIGGER trg_bid_projects_fts
+        BEFORE INSERT OR UPDATE OF title, content_text ON bid_projects
+        FOR EACH ROW EXECUTE PROCEDURE bid_projects_fts_trigger();
+    """))
+    conn.commit()
+
+    logger.info(f"全文检索触发器安装完成，分词方式: {mode}")
+    return mode
+
+
+def ensure_fts(conn: Connection, config: str = FTS_CONFIG) -> str:
+    """
+    启动时检查全文检索函数和触发器：缺失时安装，已安装则不做任何修改
+
+    函数为IMMUTABLE，已生成的向量依赖安装时的分词方式；分词方式变化时只换函数会使历史向量与查询不一致，
+    因此不自动重装，而是报错提示运行迁移脚本重装并回填
+
+    :param conn: 数据库连接
+    :param config: 全文检索配置名
+    :return: 实际使用的分词方式
+    """
+    installed_mode = get_installed_fts_mode(conn)
+    mode = resolve_fts_mode(conn, config)
+    action = plan_fts_install(installed_mode, mode)
+    if action == 'install':
+        return install_fts(conn, config)
+    if action == 'mismatch':
+        raise RuntimeError(
+            f"已安装的全文检索分词方式（{installed_mode or '未知'}）与当前配置（{mode}）不一致，"
+            f"请运行 python migrate_database.py fts 重装触发器并回填历史数据"
+        )
+    return mode
+
+
+def backfill_fts(engine: Engine, batch_size: int = FTS_BACKFILL_BATCH_SIZE) -> int:
+    """
+    按project_id顺序分批重新生成所有项目的 content_tsvector，每批单独提交，不长时间锁表
+
+    :param engine: 数据库引擎
+    :param batch_size: 每批行数
+    :return: 更新的行数
+    """
+    statement = text("""
+        WITH batch AS (
+            SELECT project_id FROM bid_projects
+            WHERE project_id > :last_project_id
+            ORDER BY project_id
+            LIMIT :batch_size
+        )
+        UPDATE bid_projects AS p
+        SET content_tsvector = bid_fts_document(p.title, p.content_text)
+        FROM batch
+        WHERE p.project_id = batch.project_id
+        RETURNING p.project_id
+    """)
+
+    total = 0
+    last_project_id = ''
+    with engine.connect() as conn:
+        while True:
+            updated = [row[0] for row in conn.execute(
+                statement, {'last_project_id': last_project_id, 'batch_size': batch_size}
+            )]
+            conn.commit()
+            if not updated:
+                break
+            total += len(updated)
+            last_project_id = max(updated)
+            logger.info(f"全文检索向量回填 {total} 条，当前 {last_project_id}")
+
+    logger.info(f"全文检索向量回填完成，共 {total} 条")
+    return total
+
+
+def has_legacy_raw_column(conn: Connection) -> bool:
+    """
+    检查 bid_projects 是否还有旧版的 content_raw 字段
+
+    :param conn: 数据库连接
+    :return: 是否存在
+    """
+    return conn.execute(text("""
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = 'bid_projects' AND column_name = 'content_raw'
+    """)).first() is not None
+
+
+def move_raw_html(engine: Engine, batch_size: int = RAW_MIGRATION_BATCH_SIZE, drop_column: bool = True) -> int:
+    """
+    把 bid_projects.content_raw 中的原始HTML分批压缩写入 bid_project_raw，并清空原字段
+
+    每批单独提交，中断后重新运行会从剩余的行继续；全部迁移后删除原字段
+    （删除字段不会立即释放空间，需要在业务低峰执行 VACUUM FULL bid_projects）
+
+    :param engine: 数据库引擎
+    :param batch_size: 每批行数
+    :param drop_column: 迁移完成后是否删除 content_raw 字段
+    :return: 迁移的行数
+    """
+    select_batch = text("""
+        SELECT project_id, content_raw FROM bid_projects
+        WHERE content_raw IS NOT NULL AND project_id > :last_project_id
+        ORDER BY project_id
+        LIMIT :batch_size
+    """)
+    clear_batch = text("UPDATE bid_projects SET content_raw = NULL WHERE project_id = ANY(:project_ids)")
+
+    total = 0
+    raw_bytes = 0
+    stored_bytes = 0
+    last_project_id = ''
+    with engine.connect() as conn:
+        BidProjectRaw.__table__.create(conn, checkfirst=True)
+        conn.commit()
+        if not has_legacy_raw_column(conn):
+            logger.info("bid_projects 已无 content_raw 字段，无需迁移")
+            return 0
+
+        while True:
+            rows = conn.execute(select_batch, {'last_project_id': last_project_id, 'batch_size': batch_size}).all()
+            if not rows:
+                break
+
+            raw_rows = [{'project_id': project_id, **compress_html(html)} for project_id, html in rows]
+            conn.execute(insert(BidProjectRaw).values(raw_rows).on_conflict_do_nothing(index_elements=['project_id']))
+            conn.execute(clear_batch, {'project_ids': [row['project_id'] for row in raw_rows]})
+            conn.commit()
+
+            total += len(rows)
+            raw_bytes += sum(row['raw_size'] for row in raw_rows)
+            stored_bytes += sum(len(row['content']) for row in raw_rows)
+            last_project_id = rows[-1][0]
+            logger.info(f"原始HTML迁移 {total} 条，当前 {last_project_id}")
+
+        if drop_column:
+            conn.execute(text("ALTER TABLE bid_projects DROP COLUMN IF EXISTS content_raw"))
+            conn.commit()
+            logger.info("已删除 bid_projects.content_raw 字段")
+
+    ratio = raw_bytes / stored_bytes if stored_bytes else 0
+    logger.info(f"原始HTML迁移完成，共 {total} 条，{raw_bytes} 字节压缩为 {stored_bytes} 字节（{ratio:.1f}倍）")
+    return total
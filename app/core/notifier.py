@@ -10,33 +10,39 @@
 
 import os
 import requests
-from typing import Dict, List
+from typing import Dict, List, Optional
 from loguru import logger
 
 
 class Notifier:
     """消息推送器"""
 
-    def __init__(self):
-        """初始化推送器，从环境变量读取Webhook URL"""
-        self.wecom_webhook = os.getenv('WECOM_WEBHOOK_URL')
-        self.dingtalk_webhook = os.getenv('DINGTALK_WEBHOOK_URL')
+    def __init__(self, wecom_webhook: Optional[str] = None, dingtalk_webhook: Optional[str] = None):
+        """
+        初始化推送器
+
+        :param wecom_webhook: 企业微信Webhook URL，为空时从环境变量读取
+        :param dingtalk_webhook: 钉钉Webhook URL，为空时从环境变量读取
+        """
+        self.wecom_webhook = wecom_webhook or os.getenv('WECOM_WEBHOOK_URL')
+        self.dingtalk_webhook = dingtalk_webhook or os.getenv('DINGTALK_WEBHOOK_URL')
 
         if not self.wecom_webhook and not self.dingtalk_webhook:
             logger.warning("未配置任何推送渠道的Webhook URL")
 
-    def send_alert(self, project: Dict, match_details: Dict[str, int]) -> bool:
+    def send_alert(self, project: Dict, match_details: Dict[str, int], profile_name: Optional[str] = None) -> bool:
         """
         发送项目预警消息
 
         :param project: 项目数据字典
         :param match_details: 关键词匹配详情
+        :param profile_name: 命中的订阅方案名称
         :return: 是否发送成功
         """
         success = False
 
         # 构建消息内容
-        message = self._build_message(project, match_details)
+        message = self._build_message(project, match_details, profile_name)
 
         # 发送到企业微信
         if self.wecom_webhook:
@@ -52,23 +58,25 @@ class Notifier:
 
         return success
 
-    def _build_message(self, project: Dict, match_details: Dict[str, int]) -> str:
+    def _build_message(self, project: Dict, match_details: Dict[str, int], profile_name: Optional[str] = None) -> str:
         """
         构建消息内容
 
         :param project: 项目数据
         :param match_details: 匹配详情
+        :param profile_name: 订阅方案名称
         :return: 格式化的消息文本
         """
         # 格式化匹配关键词
         keywords_str = ", ".join([f"{kw}({count}次)" for kw, count in match_details.items()])
+        profile_line = f"**订阅方案**: {profile_name}\n" if profile_name else ""
 
         message = f"""
 🔔 **招标机会预警**
 
 **项目标题**: {project.get('title', '未知')}
 
-**匹配分数**: {project.get('match_score', 0):.2f}
+{profile_line}**匹配分数**: {project.get('match_score', 0):.2f}
 **匹配关键词**: {keywords_str}
 
 **业主单位**: {project.get('owner_unit', '未知')}
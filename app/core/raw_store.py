@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+@Time    : 2026/10/18 23:30
+@Author  : Manus AI
+@File    : raw_store.py
+@Desc    : 原始正文HTML压缩存储：优先使用zstd，未安装zstandard时回退到zlib
+"""
+
+import os
+import zlib
+from typing import Dict, Optional
+from loguru import logger
+
+# zstd压缩级别（1-22，越大压缩率越高、越慢；HTML一般在9附近性价比最好）
+RAW_HTML_ZSTD_LEVEL = int(os.getenv('RAW_HTML_ZSTD_LEVEL', '9'))
+
+# zlib压缩级别（未安装zstandard时使用）
+_ZLIB_LEVEL = 6
+
+CODEC_ZSTD = 'zstd'
+CODEC_ZLIB = 'zlib'
+
+_zstd = None
+_zstd_checked = False
+
+
+def _load_zstd():
+    """按需导入zstandard，未安装时返回None"""
+    global _zstd, _zstd_checked
+    if not _zstd_checked:
+        _zstd_checked = True
+        try:
+            import zstandard
+            _zstd = zstandard
+        except ImportError:
+            logger.warning("未安装zstandard，原始HTML改用zlib压缩（pip install zstandard）")
+    return _zstd
+
+
+def compress_html(html: str, codec: Optional[str] = None) -> Dict:
+    """
+    压缩原始HTML
+
+    :param html: 原始HTML
+    :param codec: 压缩方式，默认优先zstd
+    :return: {'codec', 'content', 'raw_size'}，可直接用于写入 bid_project_raw
+    """
+    data = html.encode('utf-8')
+    if codec is None:
+        codec = CODEC_ZSTD if _load_zstd() is not None else CODEC_ZLIB
+
+    if codec == CODEC_ZSTD:
+        zstd = _load_zstd()
+        if zstd is None:
+            raise RuntimeError("zstd压缩需要安装zstandard")
+        content = zstd.ZstdCompressor(level=RAW_HTML_ZSTD_LEVEL).compress(data)
+    elif codec == CODEC_ZLIB:
+        content = zlib.compress(data, _ZLIB_LEVEL)
+    else:
+        raise ValueError(f"不支持的压缩方式: {codec}")
+
+    return {'codec': codec, 'content': content, 'raw_size': len(data)}
+
+
+def decompress_html(codec: str, content: bytes) -> str:
+    """
+    解压原始HTML
+
+    :param codec: 压缩方式
+    :param content: 压缩后的数据
+    :return: 原始HTML
+    """
+    if codec == CODEC_ZSTD:
+        zstd = _load_zstd()
+        if zstd is None:
+            raise RuntimeError("读取zstd压缩的HTML需要安装zstandard")
+        data = zstd.ZstdDecompressor().decompress(content)
+    elif codec == CODEC_ZLIB:
+        data = zlib.decompress(content)
+    else:
+        raise ValueError(f"不支持的压缩方式: {codec}")
+    return data.decode('utf-8')
@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+@Time    : 2026/10/18 22:00
+@Author  : Manus AI
+@File    : rescorer.py
+@Desc    : 历史项目批量重新评分：服务端游标流式读取，按批 UPDATE ... FROM (VALUES ...) 写回，支持断点续跑
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from sqlalchemy import select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.sql.elements import TextClause
+from loguru import logger
+
+from app.core.matcher import MultiProfileMatcher
+from app.models.bid_project import BidProject
+
+# 每批读取和写回的项目数
+RESCORE_CHUNK_SIZE = int(os.getenv('RESCORE_CHUNK_SIZE', '2000'))
+# 断点文件：记录已写回的最后一个project_id，中断后从该位置继续
+RESCORE_CHECKPOINT_PATH = os.getenv('RESCORE_CHECKPOINT_PATH', '/tmp/bid_monitor_state/rescore_checkpoint.json')
+
+
+def load_checkpoint(path: Optional[str]) -> Dict:
+    """
+    读取断点
+
+    :param path: 断点文件路径，为空时不使用断点
+    :return: {'last_project_id': str或None, 'scanned': int, 'updated': int}
+    """
+    state = {'last_project_id': None, 'scanned': 0, 'updated': 0}
+    if path and os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            state.update(json.load(f))
+    return state
+
+
+def save_checkpoint(path: Optional[str], state: Dict):
+    """
+    原子写入断点（先写临时文件再替换），进程中途被杀也不会留下损坏的断点文件
+
+    :param path: 断点文件路径，为空时不保存
+    :param state: 断点状态
+    """
+    if not path:
+        return
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def score_rows(matcher: MultiProfileMatcher,
+               rows: Sequence[Tuple[str, Optional[str], Optional[str], Optional[str]]]) -> List[Tuple[str, float]]:
+    """
+    对一批项目评分，与调度器入库时的评分方式一致（按字段加权，取各方案最高分）
+
+    :param matcher: 多方案匹配器
+    :param rows: (project_id, title, content_text, owner_unit) 列表
+    :return: (project_id, match_score) 列表
+    """
+    documents = [{'title': title, 'body': content_text, 'owner_unit': owner_unit}
+                 for _, title, content_text, owner_unit in rows]
+    scores = matcher.score_batch_fields(documents)
+    best = scores.max(axis=1) if scores.shape[1] else np.zeros(len(rows))
+    return [(row[0], float(score)) for row, score in zip(rows, best)]
+
+
+def build_update_statement(scores: Sequence[Tuple[str, float]]) -> Tuple[TextClause, Dict]:
+    """
+    构建批量更新语句：一条 UPDATE ... FROM (VALUES ...) 更新整批项目，分数未变化的行不写
+
+    :param scores: (project_id, match_score) 列表
+    :return: (SQL语句, 绑定参数)
+    """
+    values = ', '.join(f"(:id_{i}, CAST(:score_{i} AS double precision))" for i in range(len(scores)))
+    params = {}
+    for i, (project_id, score) in enumerate(scores):
+        params[f'id_{i}'] = project_id
+        params[f'score_{i}'] = score
+
+    statement = text(f"""
+        UPDATE bid_projects AS p
+        SET match_score = v.match_score
+        FROM (VALUES {values}) AS v(project_id, match_score)
+        WHERE p.project_id = v.project_id
+          AND p.match_score IS DISTINCT FROM v.match_score
+    """)
+    return statement, params
+
+
+def iter_project_chunks(conn, last_project_id: Optional[str], chunk_size: int
+                        ) -> Iterable[List[Tuple[str, Optional[str], Optional[str], Optional[str]]]]:
+    """
+    通过服务端游标按project_id顺序流式读取项目，只取评分需要的列
+
+    :param conn: 只读数据库连接
+    :param last_project_id: 从该project_id之后开始读取，None表示从头开始
+    :param chunk_size: 每批行数
+    :return: 每批 (project_id, title, content_text, owner_unit) 的迭代器
+    """
+    query = select(BidProject.project_id, BidProject.title, BidProject.content_text, BidProject.owner_unit)
+    if last_project_id is not None:
+        query = query.where(BidProject.project_id > last_project_id)
+    query = query.order_by(BidProject.project_id)
+
+    result = conn.execution_options(stream_results=True, yield_per=chunk_size).execute(query)
+    for partition in result.partitions(chunk_size):
+        yield [tuple(row) for row in partition]
+
+
+def rescore_projects(engine: Engine, matcher: MultiProfileMatcher, chunk_size: int = RESCORE_CHUNK_SIZE,
+                     checkpoint_path: Optional[str] = RESCORE_CHECKPOINT_PATH, restart: bool = False,
+                     dry_run: bool = False) -> Dict:
+    """
+    按当前关键词配置重新计算所有项目的匹配分数
+
+    读写各用一个连接：读连接保持服务端游标，写连接每批提交一次并随后更新断点。
+    内存占用只与批大小有关，中断后从断点继续（最后一批可能重复计算，结果相同）
+
+    :param engine: 数据库引擎
+    :param matcher: 多方案匹配器
+    :param chunk_size: 每批行数
+    :param checkpoint_path: 断点文件路径，为空时不记录断点
+    :param restart: 忽略已有断点，从头开始
+    :param dry_run: 只计算不写回
+    :return: 统计信息 {'scanned', 'updated', 'last_project_id', 'elapsed_s'}
+    """
+    if restart:
+        state = {'last_project_id': None, 'scanned': 0, 'updated': 0}
+    else:
+        state = load_checkpoint(checkpoint_path)
+        if state['last_project_id'] is not None:
+            logger.info(f"从断点继续: {state['last_project_id']}，已处理 {state['scanned']} 条")
+
+    start = time.perf_counter()
+    with engine.connect() as read_conn, engine.connect() as write_conn:
+        for rows in iter_project_chunks(read_conn, state['last_project_id'], chunk_size):
+            scores = score_rows(matcher, rows)
+            if not dry_run:
+                statement, params = build_update_statement(scores)
+                state['updated'] += write_conn.execute(statement, params).rowcount
+                write_conn.commit()
+
+            state['scanned'] += len(rows)
+            state['last_project_id'] = rows[-1][0]
+            if not dry_run:
+                save_checkpoint(checkpoint_path, state)
+
+            logger.info(f"已处理 {state['scanned']} 条，更新 {state['updated']} 条，当前 {state['last_project_id']}")
+
+    # 全部完成后删除断点，下次运行从头开始
+    if checkpoint_path and not dry_run and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+
+    state['elapsed_s'] = round(time.perf_counter() - start, 1)
+    logger.info(f"重新评分完成，共处理 {state['scanned']} 条，更新 {state['updated']} 条，耗时 {state['elapsed_s']}s")
+    return state
@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+@Time    : 2026/10/18 19:00
+@Author  : Manus AI
+@File    : seen_urls.py
+@Desc    : 已抓取URL索引：seen_urls表按主键批量查询，抓取详情页前跳过已处理过的公告
+"""
+
+import hashlib
+from typing import Iterable, List, Set
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from sqlalchemy import or_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from loguru import logger
+
+from app.models.bid_project import SeenUrl
+
+# 规范化时去掉的跟踪参数
+TRACKING_PARAMS = ('utm_', 'spm')
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+# 单次IN查询的最大参数个数
+QUERY_BATCH_SIZE = 500
+
+STATUS_DONE = 'done'
+STATUS_FAILED = 'failed'
+
+
+def normalize_url(url: str) -> str:
+    """
+    规范化URL：协议和域名小写、去掉默认端口、片段和跟踪参数、查询参数排序
+
+    :param url: 原始URL
+    :return: 规范化URL
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith(TRACKING_PARAMS)
+    )
+    return urlunsplit((scheme, host, parts.path or '/', urlencode(query), ''))
+
+
+def url_hash(url: str) -> str:
+    """规范化URL的SHA1（十六进制）"""
+    return hashlib.sha1(normalize_url(url).encode('utf-8')).hexdigest()
+
+
+class SeenUrlIndex:
+    """
+    已抓取URL索引
+
+    列表页的URL按规范化哈希对 seen_urls 主键做批量IN查询（每次任务只有几百个URL，
+    走主键索引；不在进程内缓存全表，开销不随历史数据增长）。
+    抓取或解析失败的URL记录失败次数，连续失败达到上限后不再重试，避免一个失效页面卡住高水位
+    """
+
+    def __init__(self, max_failures: int = 3):
+        """
+        初始化索引
+
+        :param max_failures: 连续失败多少次后放弃该URL
+        """
+        self.max_failures = max_failures
+
+    def filter_unseen(self, db: Session, urls: List[str]) -> List[str]:
+        """
+        过滤出需要抓取的URL（未入库且未放弃）
+
+        :param db: 数据库会话
+        :param urls: 待检查的URL
+        :return: 需要抓取的URL（保持原顺序）
+        """
+        keys = {url: url_hash(url) for url in urls}
+        seen = self._query_existing(db, list(set(keys.values())))
+        return [url for url in urls if keys[url] not in seen]
+
+    def mark_seen(self, db: Session, urls: Iterable[str]):
+        """
+        记录已抓取的URL（已存在的忽略）
+
+        :param db: 数据库会话
+        :param urls: 已处理完成的URL
+        """
+        rows = {url_hash(url): normalize_url(url) for url in urls}
+        if not rows:
+            return
+        statement = insert(SeenUrl).values(
+            [{'url_hash': key, 'url': url, 'status': STATUS_DONE} for key, url in rows.items()]
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=['url_hash'], set_={'status': STATUS_DONE, 'failures': 0}
+        )
+        db.execute(statement)
+        db.commit()
+
+    def record_failures(self, db: Session, urls: Iterable[str]) -> Set[str]:
+        """
+        记录抓取或解析失败的URL，失败次数加一
+
+        :param db: 数据库会话
+        :param urls: 本次失败的URL
+        :return: 失败次数达到上限、从此放弃的URL
+        """
+        rows = {url_hash(url): (url, normalize_url(url)) for url in urls}
+        if not rows:
+            return set()
+        statement = build_failure_statement([{'url_hash': key, 'url': normalized}
+                                             for key, (_, normalized) in rows.items()])
+        returned = db.execute(statement).all()
+        db.commit()
+
+        retired = {rows[key][0] for key, failures in returned if failures >= self.max_failures}
+        for url in retired:
+            logger.warning(f"详情页连续失败 {self.max_failures} 次，不再重试: {url}")
+        return retired
+
+    def _query_existing(self, db: Session, keys: List[str]) -> Set[str]:
+        """分批查询数据库中已入库或已放弃的哈希"""
+        existing = set()
+        for start in range(0, len(keys), QUERY_BATCH_SIZE):
+            batch = keys[start:start + QUERY_BATCH_SIZE]
+            query = db.query(SeenUrl.url_hash).filter(
+                SeenUrl.url_hash.in_(batch),
+                or_(SeenUrl.status == STATUS_DONE, SeenUrl.failures >= self.max_failures)
+            )
+            existing.update(key for (key,) in query)
+        return existing
+
+
+def build_failure_statement(rows: List[dict]):
+    """
+    构建失败计数语句：新URL记为失败一次，已有的失败记录次数加一（已入库的不变）
+
+    :param rows: [{'url_hash', 'url'}]
+    :return: SQL语句，返回 url_hash 和更新后的失败次数
+    """
+    statement = insert(SeenUrl).values([{**row, 'status': STATUS_FAILED, 'failures': 1} for row in rows])
+    statement = statement.on_conflict_do_update(
+        index_elements=['url_hash'],
+        set_={'failures': SeenUrl.failures + 1},
+        where=SeenUrl.status == STATUS_FAILED
+    )
+    return statement.returning(SeenUrl.url_hash, SeenUrl.failures)
@@ -8,12 +8,18 @@
 @Desc    : 招标项目的数据库操作
 """
 
-from typing import List, Optional
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from functools import reduce
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy.dialects.postgresql import REAL, insert
 from sqlalchemy.orm import Session
-from sqlalchemy import text, func
+from sqlalchemy import bindparam, cast, func, literal, literal_column, select, tuple_
+from sqlalchemy.sql import Select
 from loguru import logger
 
-from app.models.bid_project import BidProject, Keyword
+from app.core.raw_store import compress_html
+from app.models.bid_project import BidProject, BidProjectRaw, Keyword, ProjectKeywordHit
 
 
 def create_bid_project(db: Session, project_data: dict) -> Optional[BidProject]:
@@ -34,10 +40,6 @@ def create_bid_project(db: Session, project_data: dict) -> Optional[BidProject]:
             logger.warning(f"项目已存在: {project_data['project_id']}")
             return existing
 
-        # 创建tsvector（全文检索向量）
-        if project_data.get('content_text'):
-            project_data['content_tsvector'] = func.to_tsvector('chinese', project_data['content_text'])
-
         # 创建新项目
         project = BidProject(**project_data)
         db.add(project)
@@ -53,6 +55,143 @@ def create_bid_project(db: Session, project_data: dict) -> Optional[BidProject]:
         return None
 
 
+@dataclass
+class BulkUpsertResult:
+    """批量写入结果"""
+
+    inserted: List[str] = field(default_factory=list)  # 新增的项目ID
+    existing: List[str] = field(default_factory=list)  # 已存在的项目ID
+    failed: List[str] = field(default_factory=list)  # 写入失败的项目ID
+
+
+# 由数据库维护的字段（content_tsvector由触发器根据标题和正文生成）
+_SERVER_COLUMNS = ('created_at', 'updated_at', 'content_tsvector')
+
+
+def _prepare_rows(projects: List[dict]) -> List[dict]:
+    """
+    整理批量写入的行：按project_id去重（后出现的覆盖先出现的），统一各行字段
+
+    多行INSERT要求每行字段相同；同一语句中同一主键出现两次时 ON CONFLICT DO UPDATE 会报错
+
+    :param projects: 项目数据字典列表
+    :return: 整理后的行
+    """
+    columns = BidProject.__table__.columns
+    unique = {}
+    for project in projects:
+        unique[project['project_id']] = project
+
+    keys = [column.name for column in columns
+            if column.name not in _SERVER_COLUMNS and any(column.name in project for project in unique.values())]
+    rows = []
+    for project in unique.values():
+        row = {}
+        for key in keys:
+            if key in project:
+                row[key] = project[key]
+            else:
+                default = columns[key].default
+                row[key] = default.arg if default is not None and default.is_scalar else None
+        rows.append(row)
+    return rows
+
+
+def _collect_raw_html(projects: List[dict]) -> Dict[str, str]:
+    """
+    取出各项目的原始HTML（不属于 bid_projects 的字段，压缩后写入 bid_project_raw）
+
+    :param projects: 项目数据字典列表
+    :return: {project_id: 原始HTML}，同一项目以后出现的为准
+    """
+    raw_html = {}
+    for project in projects:
+        raw_html[project['project_id']] = project.get('content_raw')
+    return {project_id: html for project_id, html in raw_html.items() if html is not None}
+
+
+def build_raw_upsert_statement(raw_rows: List[dict], update_existing: bool = False):
+    """
+    构建原始HTML批量写入语句
+
+    :param raw_rows: bid_project_raw 行（project_id、codec、content、raw_size）
+    :param update_existing: 已存在的记录是否覆盖
+    :return: SQL语句
+    """
+    statement = insert(BidProjectRaw).values(raw_rows)
+    if update_existing:
+        return statement.on_conflict_do_update(
+            index_elements=['project_id'],
+            set_={key: statement.excluded[key] for key in ('codec', 'content', 'raw_size')}
+        )
+    return statement.on_conflict_do_nothing(index_elements=['project_id'])
+
+
+def build_upsert_statement(rows: List[dict], update_existing: bool = False):
+    """
+    构建批量写入语句：一条多行 INSERT ... ON CONFLICT (project_id) ... RETURNING
+
+    :param rows: 整理后的行（见 _prepare_rows）
+    :param update_existing: 已存在的项目是否用新数据覆盖
+    :return: SQL语句，返回 project_id 和 inserted（xmax = 0 表示本次新插入的行）
+    """
+    statement = insert(BidProject).values(rows)
+    if update_existing:
+        statement = statement.on_conflict_do_update(
+            index_elements=['project_id'],
+            set_={
+                **{key: statement.excluded[key] for key in rows[0] if key != 'project_id'},
+                'updated_at': func.now()
+            }
+        )
+    else:
+        statement = statement.on_conflict_do_nothing(index_elements=['project_id'])
+    return statement.returning(BidProject.project_id, literal_column('xmax = 0').label('inserted'))
+
+
+def bulk_upsert_bid_projects(db: Session, projects: List[dict], update_existing: bool = False,
+                             batch_size: int = 500) -> BulkUpsertResult:
+    """
+    批量写入招标项目，每批一条语句、一次提交
+
+    :param db: 数据库会话
+    :param projects: 项目数据字典列表
+    :param update_existing: 已存在的项目是否用新数据覆盖（默认保留原记录）
+    :param batch_size: 每批行数
+    :return: 新增、已存在和写入失败的项目ID
+    """
+    result = BulkUpsertResult()
+    rows = _prepare_rows(projects)
+    raw_html = _collect_raw_html(projects)
+
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        try:
+            returned = db.execute(build_upsert_statement(batch, update_existing)).all()
+            # DO NOTHING 不返回冲突的行，未返回的即为已存在
+            inserted = {project_id for project_id, is_new in returned if is_new}
+
+            # 原始HTML与项目在同一事务中写入 bid_project_raw；不覆盖已有项目时只写新增项目的
+            raw_rows = [{'project_id': row['project_id'], **compress_html(raw_html[row['project_id']])}
+                        for row in batch
+                        if row['project_id'] in raw_html and (update_existing or row['project_id'] in inserted)]
+            if raw_rows:
+                db.execute(build_raw_upsert_statement(raw_rows, update_existing))
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"项目批量写入失败: {e}")
+            result.failed.extend(row['project_id'] for row in batch)
+            continue
+
+        for row in batch:
+            (result.inserted if row['project_id'] in inserted else result.existing).append(row['project_id'])
+
+    logger.info(f"项目批量写入完成，新增 {len(result.inserted)} 条，已存在 {len(result.existing)} 条，"
+                f"失败 {len(result.failed)} 条")
+    return result
+
+
 def get_bid_project(db: Session, project_id: str) -> Optional[BidProject]:
     """
     根据ID获取项目
@@ -64,6 +203,18 @@ def get_bid_project(db: Session, project_id: str) -> Optional[BidProject]:
     return db.query(BidProject).filter(BidProject.project_id == project_id).first()
 
 
+def get_project_raw_html(db: Session, project_id: str) -> Optional[str]:
+    """
+    获取项目的原始正文HTML（只读取压缩表，不加载项目行）
+
+    :param db: 数据库会话
+    :param project_id: 项目ID
+    :return: 原始HTML，不存在时返回None
+    """
+    raw = db.get(BidProjectRaw, project_id)
+    return raw.html if raw is not None else None
+
+
 def get_projects_by_score(db: Session, min_score: float = 0.0, limit: int = 100) -> List[BidProject]:
     """
     根据匹配分数获取项目列表
@@ -89,12 +240,16 @@ def search_projects_by_keywords(db: Session, keywords: List[str], limit: int = 1
     :param limit: 返回数量限制
     :return: 项目列表
     """
+    if not keywords:
+        return []
+
     try:
-        # 构建搜索查询
-        query_str = ' | '.join(keywords)  # 使用OR逻辑
+        # 构建搜索查询：各关键词分别生成tsquery后用OR合并，关键词作为绑定参数传入
+        ts_query = reduce(lambda left, right: left.op('||')(right),
+                          [func.bid_fts_query(keyword) for keyword in keywords])
 
         results = db.query(BidProject).filter(
-            text(f"content_tsvector @@ to_tsquery('chinese', '{query_str}')")
+            BidProject.content_tsvector.op('@@')(ts_query)
         ).order_by(
             BidProject.created_at.desc()
         ).limit(limit).all()
@@ -138,3 +293,214 @@ def update_match_score(db: Session, project_id: str, score: float) -> bool:
         db.rollback()
         logger.error(f"匹配分数更新失败: {e}")
         return False
+
+
+def save_keyword_hits(db: Session, project_id: str, hits: Dict[str, Dict[str, int]]) -> bool:
+    """
+    保存项目的关键词命中明细（覆盖该项目已有的明细）
+
+    :param db: 数据库会话
+    :param project_id: 项目ID
+    :param hits: {关键词: {字段名: 出现次数}}，字段名为 title / body / owner_unit
+    :return: 是否成功
+    """
+    return bulk_save_keyword_hits(db, {project_id: hits})
+
+
+def bulk_save_keyword_hits(db: Session, project_hits: Dict[str, Dict[str, Dict[str, int]]]) -> bool:
+    """
+    批量保存多个项目的关键词命中明细：一条DELETE、一条多行INSERT、一次提交
+
+    :param db: 数据库会话
+    :param project_hits: {项目ID: {关键词: {字段名: 出现次数}}}
+    :return: 是否成功
+    """
+    if not project_hits:
+        return True
+
+    rows = [
+        {
+            'project_id': project_id,
+            'keyword': keyword,
+            'title_count': field_counts.get('title', 0),
+            'body_count': field_counts.get('body', 0),
+            'owner_unit_count': field_counts.get('owner_unit', 0)
+        }
+        for project_id, hits in project_hits.items()
+        for keyword, field_counts in hits.items()
+    ]
+    try:
+        db.query(ProjectKeywordHit).filter(
+            ProjectKeywordHit.project_id.in_(list(project_hits))
+        ).delete(synchronize_session=False)
+        if rows:
+            db.execute(insert(ProjectKeywordHit), rows)
+        db.commit()
+        return True
+
+    except Exception as e:
+        db.rollback()
+        logger.error(f"关键词命中明细保存失败: {e}")
+        return False
+
+
+def get_projects_by_keyword(db: Session, keyword: str, limit: int = 100) -> List[BidProject]:
+    """
+    获取命中指定关键词的项目（走关键词命中表索引，不扫描正文）
+
+    :param db: 数据库会话
+    :param keyword: 关键词
+    :param limit: 返回数量限制
+    :return: 项目列表，按抓取时间倒序
+    """
+    return db.query(BidProject).join(
+        ProjectKeywordHit, ProjectKeywordHit.project_id == BidProject.project_id
+    ).filter(
+        ProjectKeywordHit.keyword == keyword
+    ).order_by(
+        BidProject.created_at.desc()
+    ).limit(limit).all()
+
+
+def build_keyword_trend_statement(keyword: str, since: datetime) -> Select:
+    """
+    构建关键词趋势查询：按项目的抓取时间分天统计
+
+    命中明细在重新计分时会删除重写，明细行的记录时间不代表项目入库时间，因此关联项目表取抓取时间
+
+    :param keyword: 关键词
+    :param since: 统计起始时间
+    :return: 查询语句，列为 day、count
+    """
+    day = func.date(BidProject.created_at)
+    return (
+        select(day.label('day'), func.count().label('count'))
+        .select_from(ProjectKeywordHit)
+        .join(BidProject, BidProject.project_id == ProjectKeywordHit.project_id)
+        .where(ProjectKeywordHit.keyword == keyword, BidProject.created_at >= since)
+        .group_by(day)
+        .order_by(day)
+    )
+
+
+def get_keyword_trend(db: Session, keyword: str, days: int = 30) -> List[Tuple[date, int]]:
+    """
+    统计关键词每天命中的项目数
+
+    :param db: 数据库会话
+    :param keyword: 关键词
+    :param days: 统计最近天数
+    :return: [(日期, 项目数)]，按项目抓取日期升序，没有命中的日期不返回
+    """
+    since = datetime.now(timezone.utc) - timedelta(days=days)
+    rows = db.execute(build_keyword_trend_statement(keyword, since)).all()
+    return [(row.day, row.count) for row in rows]
+
+
+# 搜索结果列表展示的字段（不包含正文和原始HTML）
+SEARCH_LIST_COLUMNS = (
+    BidProject.project_id,
+    BidProject.title,
+    BidProject.owner_unit,
+    BidProject.procurement_type,
+    BidProject.budget,
+    BidProject.registration_end,
+    BidProject.bidding_time,
+    BidProject.location,
+    BidProject.match_score,
+    BidProject.source_url,
+    BidProject.created_at,
+)
+
+
+@dataclass(frozen=True)
+class SearchCursor:
+    """搜索分页游标：上一页最后一条记录的排序键"""
+
+    rank: float
+    created_at: datetime
+    project_id: str
+
+
+@dataclass
+class SearchPage:
+    """搜索结果页"""
+
+    items: List[Dict[str, Any]]
+    next_cursor: Optional[SearchCursor]  # 为None表示没有下一页
+
+
+def build_search_statement(query: Optional[str] = None,
+                           min_score: Optional[float] = None, max_score: Optional[float] = None,
+                           deadline_from: Optional[datetime] = None, deadline_to: Optional[datetime] = None,
+                           min_budget: Optional[float] = None, max_budget: Optional[float] = None,
+                           after: Optional[SearchCursor] = None, limit: int = 20) -> Select:
+    """
+    构建搜索语句：按 (相关度, 抓取时间, project_id) 倒序，游标分页
+
+    :param query: 搜索词，为空时不做全文检索，按抓取时间倒序
+    :param min_score: 最低匹配分数
+    :param max_score: 最高匹配分数
+    :param deadline_from: 报名截止时间下限
+    :param deadline_to: 报名截止时间上限
+    :param min_budget: 最低预算（万元）
+    :param max_budget: 最高预算（万元）
+    :param after: 上一页返回的游标
+    :param limit: 每页数量
+    :return: 查询语句，结果列为 SEARCH_LIST_COLUMNS 加 rank
+    """
+    if query:
+        ts_query = func.bid_fts_query(bindparam('query', query))
+        rank = func.ts_rank_cd(BidProject.content_tsvector, ts_query)
+    else:
+        rank = cast(literal(0.0), REAL)
+
+    statement = select(*SEARCH_LIST_COLUMNS, rank.label('rank'))
+    if query:
+        statement = statement.where(BidProject.content_tsvector.op('@@')(ts_query))
+
+    filters = (
+        (min_score, lambda value: BidProject.match_score >= value),
+        (max_score, lambda value: BidProject.match_score <= value),
+        (deadline_from, lambda value: BidProject.registration_end >= value),
+        (deadline_to, lambda value: BidProject.registration_end <= value),
+        (min_budget, lambda value: BidProject.budget >= value),
+        (max_budget, lambda value: BidProject.budget <= value),
+    )
+    for value, condition in filters:
+        if value is not None:
+            statement = statement.where(condition(value))
+
+    # 游标分页：只取排在上一页最后一条之后的记录，翻到第N页的代价与第一页相同
+    if after is not None:
+        statement = statement.where(
+            tuple_(rank, BidProject.created_at, BidProject.project_id)
+            < tuple_(cast(literal(after.rank), REAL), literal(after.created_at, BidProject.created_at.type),
+                     literal(after.project_id, BidProject.project_id.type))
+        )
+
+    return statement.order_by(
+        rank.desc(), BidProject.created_at.desc(), BidProject.project_id.desc()
+    ).limit(limit)
+
+
+def search_projects(db: Session, query: Optional[str] = None, after: Optional[SearchCursor] = None,
+                    limit: int = 20, **filters) -> SearchPage:
+    """
+    全文检索项目，按相关度排序并分页
+
+    :param db: 数据库会话
+    :param query: 搜索词
+    :param after: 上一页返回的游标，None表示第一页
+    :param limit: 每页数量
+    :param filters: 可选过滤条件 min_score / max_score / deadline_from / deadline_to / min_budget / max_budget
+    :return: 搜索结果页，items为列表字段字典（含rank）
+    """
+    rows = db.execute(build_search_statement(query, after=after, limit=limit, **filters)).mappings().all()
+    items = [dict(row) for row in rows]
+
+    next_cursor = None
+    if len(items) == limit:
+        last = items[-1]
+        next_cursor = SearchCursor(float(last['rank']), last['created_at'], last['project_id'])
+    return SearchPage(items, next_cursor)
@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+@Time    : 2026/10/18 19:30
+@Author  : Manus AI
+@File    : crawl_watermark_crud.py
+@Desc    : 列表页抓取高水位的数据库操作
+"""
+
+from typing import Optional
+from sqlalchemy.orm import Session
+from loguru import logger
+
+from app.models.bid_project import CrawlWatermark
+
+
+def get_watermark(db: Session, source: str) -> Optional[CrawlWatermark]:
+    """
+    获取来源的高水位
+
+    :param db: 数据库会话
+    :param source: 来源（列表页URL）
+    :return: 高水位记录，首次抓取时返回None
+    """
+    return db.query(CrawlWatermark).filter(CrawlWatermark.source == source).first()
+
+
+def update_watermark(db: Session, source: str, last_url: Optional[str], last_publish_date: Optional[str]) -> bool:
+    """
+    更新来源的高水位
+
+    :param db: 数据库会话
+    :param source: 来源（列表页URL）
+    :param last_url: 最新公告URL，为空时只按发布日期停止翻页
+    :param last_publish_date: 最新公告发布日期
+    :return: 是否成功
+    """
+    try:
+        watermark = get_watermark(db, source)
+        if watermark is None:
+            watermark = CrawlWatermark(source=source)
+            db.add(watermark)
+        watermark.last_url = last_url
+        watermark.last_publish_date = last_publish_date
+        db.commit()
+        logger.info(f"高水位已更新: {source} -> {last_url} ({last_publish_date})")
+        return True
+
+    except Exception as e:
+        db.rollback()
+        logger.error(f"高水位更新失败: {e}")
+        return False
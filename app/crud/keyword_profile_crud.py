@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+@Time    : 2026/10/18 21:00
+@Author  : Manus AI
+@File    : keyword_profile_crud.py
+@Desc    : 关键词订阅方案的数据库操作
+"""
+
+from typing import Dict, List, Optional
+from sqlalchemy.orm import Session
+
+from app.crud.bid_project_crud import get_all_keywords
+from app.models.bid_project import KeywordProfile, KeywordVersion, ProfileKeyword
+
+# 未配置任何订阅方案时，全局关键词表作为默认方案
+DEFAULT_PROFILE_ID = 'default'
+
+# keyword_versions表中关键词配置版本号的行ID
+KEYWORD_VERSION_ID = 'keywords'
+
+
+def get_active_profiles(db: Session, default_threshold: float = 2.0) -> List[Dict]:
+    """
+    获取所有启用的订阅方案及其关键词
+
+    :param db: 数据库会话
+    :param default_threshold: 默认方案（全局关键词表）的预警阈值
+    :return: 方案列表，每个元素包含 {'id', 'name', 'alert_threshold', 'wecom_webhook',
+             'dingtalk_webhook', 'keywords': [{'keyword': str, 'weight': float}]}
+    """
+    profiles = db.query(KeywordProfile).filter(
+        KeywordProfile.is_active == 'true'
+    ).order_by(KeywordProfile.name).all()
+
+    if not profiles:
+        keywords = get_all_keywords(db)
+        return [{
+            'id': DEFAULT_PROFILE_ID,
+            'name': DEFAULT_PROFILE_ID,
+            'alert_threshold': default_threshold,
+            'wecom_webhook': None,
+            'dingtalk_webhook': None,
+            'keywords': [{'keyword': kw.keyword, 'weight': kw.weight} for kw in keywords]
+        }]
+
+    keywords_by_profile: Dict[str, List[Dict]] = {profile.id: [] for profile in profiles}
+    rows = db.query(ProfileKeyword).filter(
+        ProfileKeyword.profile_id.in_(list(keywords_by_profile)),
+        ProfileKeyword.is_active == 'true'
+    ).order_by(ProfileKeyword.profile_id, ProfileKeyword.id).all()
+    for row in rows:
+        keywords_by_profile[row.profile_id].append({'keyword': row.keyword, 'weight': row.weight})
+
+    return [{
+        'id': profile.id,
+        'name': profile.name,
+        'alert_threshold': profile.alert_threshold if profile.alert_threshold is not None else default_threshold,
+        'wecom_webhook': profile.wecom_webhook,
+        'dingtalk_webhook': profile.dingtalk_webhook,
+        'keywords': keywords_by_profile[profile.id]
+    } for profile in profiles]
+
+
+def get_keyword_version(db: Session) -> Optional[int]:
+    """
+    获取关键词配置的版本号
+
+    :param db: 数据库会话
+    :return: 版本号，版本表未初始化时返回None
+    """
+    return db.query(KeywordVersion.version).filter(KeywordVersion.id == KEYWORD_VERSION_ID).scalar()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+@Time    : 2026/10/18 23:50
+@Author  : Manus AI
+@File    : project_queries.py
+@Desc    : 看板等只读场景的查询：只选取展示需要的列，直接返回元组或DataFrame，不构造ORM对象
+"""
+
+from datetime import date, datetime
+from typing import Dict, List, Optional
+from sqlalchemy import Row, func, select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+from app.models.bid_project import BidProject, CrawlLog
+
+# 项目列表展示的列（不含正文、检索向量和原始HTML，查询耗时与文档大小无关）
+RECENT_PROJECT_COLUMNS = (
+    BidProject.title,
+    BidProject.match_score,
+    BidProject.owner_unit,
+    BidProject.budget,
+    BidProject.registration_end,
+    BidProject.created_at,
+    BidProject.source_url,
+)
+
+# 爬取日志展示的列
+CRAWL_LOG_COLUMNS = (
+    CrawlLog.task_id,
+    CrawlLog.start_time,
+    CrawlLog.end_time,
+    CrawlLog.success_count,
+    CrawlLog.failed_count,
+    CrawlLog.status,
+)
+
+
+def build_recent_projects_statement(limit: int = 20, min_score: float = 0.0) -> Select:
+    """
+    构建最近项目查询
+
+    :param limit: 返回数量
+    :param min_score: 最低匹配分数
+    :return: 查询语句
+    """
+    return (
+        select(*RECENT_PROJECT_COLUMNS)
+        .where(BidProject.match_score >= min_score)
+        .order_by(BidProject.created_at.desc())
+        .limit(limit)
+    )
+
+
+def build_crawl_logs_statement(limit: int = 10) -> Select:
+    """
+    构建最近爬取日志查询
+
+    :param limit: 返回数量
+    :return: 查询语句
+    """
+    return select(*CRAWL_LOG_COLUMNS).order_by(CrawlLog.start_time.desc()).limit(limit)
+
+
+def build_statistics_statement(today: date, high_score: float = 3.0) -> Select:
+    """
+    构建看板统计查询：一条语句同时返回总数、今日新增、高分项目数和最近爬取时间
+
+    :param today: 今日日期
+    :param high_score: 高分项目的分数线
+    :return: 查询语句，列为 total、today、high_score、last_crawl
+    """
+    last_crawl = select(func.max(CrawlLog.start_time)).scalar_subquery()
+    return select(
+        func.count().label('total'),
+        # 按数据库会话时区取抓取日期，与原看板统计口径一致
+        func.count().filter(func.date(BidProject.created_at) == today).label('today'),
+        func.count().filter(BidProject.match_score >= high_score).label('high_score'),
+        last_crawl.label('last_crawl'),
+    ).select_from(BidProject)
+
+
+def get_recent_projects(db: Session, limit: int = 20, min_score: float = 0.0) -> List[Row]:
+    """
+    获取最近项目（只含列表展示字段）
+
+    :param db: 数据库会话
+    :param limit: 返回数量
+    :param min_score: 最低匹配分数
+    :return: (title, match_score, owner_unit, budget, registration_end, created_at, source_url) 列表
+    """
+    return db.execute(build_recent_projects_statement(limit, min_score)).all()
+
+
+def get_statistics(db: Session, today: Optional[date] = None, high_score: float = 3.0) -> Dict:
+    """
+    获取看板统计数据
+
+    :param db: 数据库会话
+    :param today: 今日日期，默认取当前日期
+    :param high_score: 高分项目的分数线
+    :return: {'total', 'today', 'high_score', 'last_crawl'}
+    """
+    row = db.execute(build_statistics_statement(today or datetime.now().date(), high_score)).mappings().one()
+    return {
+        'total': row['total'] or 0,
+        'today': row['today'] or 0,
+        'high_score': row['high_score'] or 0,
+        'last_crawl': row['last_crawl']
+    }
+
+
+def read_frame(db: Session, statement: Select):
+    """
+    执行查询并直接返回DataFrame（pandas按需导入，非看板进程不依赖pandas）
+
+    :param db: 数据库会话
+    :param statement: 查询语句
+    :return: pandas.DataFrame，列名与查询列一致
+    """
+    import pandas as pd
+    return pd.read_sql(statement, db.connection())
+
+
+def read_recent_projects(db: Session, limit: int = 20, min_score: float = 0.0):
+    """
+    以DataFrame返回最近项目（列同 get_recent_projects）
+
+    :param db: 数据库会话
+    :param limit: 返回数量
+    :param min_score: 最低匹配分数
+    :return: pandas.DataFrame
+    """
+    return read_frame(db, build_recent_projects_statement(limit, min_score))
+
+
+def read_crawl_logs(db: Session, limit: int = 10):
+    """
+    以DataFrame返回最近爬取日志
+
+    :param db: 数据库会话
+    :param limit: 返回数量
+    :return: pandas.DataFrame，列为 task_id、start_time、end_time、success_count、failed_count、status
+    """
+    return read_frame(db, build_crawl_logs_statement(limit))
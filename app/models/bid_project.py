@@ -8,9 +8,16 @@
 @Desc    : 招标项目数据库模型
 """
 
-from sqlalchemy import Column, String, Text, Numeric, TIMESTAMP, Float, func
-from sqlalchemy.dialects.postgresql import TSVECTOR
+from typing import Optional
+from sqlalchemy import (
+    BigInteger, Column, ForeignKey, Index, Integer, LargeBinary, String, Text, Numeric, TIMESTAMP, Float,
+    UniqueConstraint, func
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR, JSONB
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import deferred, relationship
+
+from app.core.raw_store import compress_html, decompress_html
 
 Base = declarative_base()
 
@@ -30,17 +37,68 @@ class BidProject(Base):
     registration_end = Column(TIMESTAMP(timezone=True), comment='报名截止时间')
     bidding_time = Column(TIMESTAMP(timezone=True), comment='开标时间')
     location = Column(Text, comment='实施地址')
-    content_raw = Column(Text, comment='原始正文HTML')
-    content_text = Column(Text, comment='提取后的纯文本正文')
-    content_tsvector = Column(TSVECTOR, comment='全文检索向量')
+    # 正文和检索向量体积大，列表查询不需要，访问时再加载；原始HTML压缩后存放在 bid_project_raw
+    content_text = deferred(Column(Text, comment='提取后的纯文本正文'))
+    content_tsvector = deferred(Column(TSVECTOR, comment='全文检索向量（由触发器根据标题和正文生成）'))
     match_score = Column(Float, default=0.0, comment='关键词匹配度评分')
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), comment='抓取时间')
     updated_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now(), comment='更新时间')
 
+    raw = relationship('BidProjectRaw', uselist=False, lazy='select', passive_deletes=True,
+                       cascade='all, delete-orphan')
+
+    @property
+    def content_raw(self) -> Optional[str]:
+        """原始正文HTML（首次访问时从 bid_project_raw 读取并解压）"""
+        return self.raw.html if self.raw is not None else None
+
+    @content_raw.setter
+    def content_raw(self, html: Optional[str]):
+        self.raw = BidProjectRaw(**compress_html(html)) if html is not None else None
+
     def __repr__(self):
         return f"<BidProject(project_id='{self.project_id}', title='{self.title}')>"
 
 
+class BidProjectRaw(Base):
+    """项目原始正文表：详情页HTML压缩后单独存放，不拖慢 bid_projects 的扫描和列表查询"""
+
+    __tablename__ = 'bid_project_raw'
+
+    project_id = Column(String(100), ForeignKey('bid_projects.project_id', ondelete='CASCADE'), primary_key=True,
+                        comment='项目ID')
+    codec = Column(String(10), nullable=False, comment='压缩方式（zstd/zlib）')
+    content = Column(LargeBinary, nullable=False, comment='压缩后的原始正文HTML')
+    raw_size = Column(Integer, nullable=False, comment='压缩前字节数')
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), comment='写入时间')
+
+    @property
+    def html(self) -> str:
+        """解压后的原始HTML"""
+        return decompress_html(self.codec, self.content)
+
+    def __repr__(self):
+        return f"<BidProjectRaw(project_id='{self.project_id}', codec='{self.codec}', raw_size={self.raw_size})>"
+
+
+class ProjectKeywordHit(Base):
+    """项目关键词命中表：每个项目命中的每个关键词一行，按字段记录出现次数"""
+
+    __tablename__ = 'project_keyword_hits'
+    __table_args__ = (Index('idx_keyword_hits_keyword', 'keyword', 'created_at'),)
+
+    project_id = Column(String(100), ForeignKey('bid_projects.project_id', ondelete='CASCADE'), primary_key=True,
+                        comment='项目ID')
+    keyword = Column(String(50), primary_key=True, comment='关键词')
+    title_count = Column(Integer, nullable=False, default=0, comment='标题中出现次数')
+    body_count = Column(Integer, nullable=False, default=0, comment='正文中出现次数')
+    owner_unit_count = Column(Integer, nullable=False, default=0, comment='业主单位中出现次数')
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), comment='记录时间')
+
+    def __repr__(self):
+        return f"<ProjectKeywordHit(project_id='{self.project_id}', keyword='{self.keyword}')>"
+
+
 class Keyword(Base):
     """关键词配置表"""
 
@@ -57,6 +115,83 @@ class Keyword(Base):
         return f"<Keyword(keyword='{self.keyword}', weight={self.weight})>"
 
 
+class KeywordProfile(Base):
+    """关键词订阅方案表：每个销售团队一套关键词、预警阈值和推送渠道"""
+
+    __tablename__ = 'keyword_profiles'
+
+    id = Column(String(50), primary_key=True)
+    name = Column(String(100), nullable=False, unique=True, comment='方案名称')
+    alert_threshold = Column(Float, default=2.0, comment='预警阈值')
+    wecom_webhook = Column(Text, comment='企业微信Webhook URL（为空时使用全局配置）')
+    dingtalk_webhook = Column(Text, comment='钉钉Webhook URL（为空时使用全局配置）')
+    is_active = Column(String(10), default='true', comment='是否启用')
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<KeywordProfile(name='{self.name}', alert_threshold={self.alert_threshold})>"
+
+
+class ProfileKeyword(Base):
+    """订阅方案关键词表"""
+
+    __tablename__ = 'profile_keywords'
+    __table_args__ = (UniqueConstraint('profile_id', 'keyword', name='uq_profile_keyword'),)
+
+    id = Column(String(50), primary_key=True)
+    profile_id = Column(String(50), nullable=False, index=True, comment='订阅方案ID')
+    keyword = Column(String(50), nullable=False, comment='关键词')
+    weight = Column(Float, default=1.0, comment='权重')
+    is_active = Column(String(10), default='true', comment='是否启用')
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<ProfileKeyword(profile_id='{self.profile_id}', keyword='{self.keyword}', weight={self.weight})>"
+
+
+class KeywordVersion(Base):
+    """关键词配置版本表：keywords / keyword_profiles / profile_keywords 变更时由触发器递增版本号"""
+
+    __tablename__ = 'keyword_versions'
+
+    id = Column(String(50), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0, comment='版本号')
+    updated_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now(), comment='更新时间')
+
+    def __repr__(self):
+        return f"<KeywordVersion(id='{self.id}', version={self.version})>"
+
+
+class SeenUrl(Base):
+    """已抓取详情页URL索引表"""
+
+    __tablename__ = 'seen_urls'
+
+    url_hash = Column(String(40), primary_key=True, comment='规范化URL的SHA1')
+    url = Column(Text, nullable=False, comment='规范化URL')
+    status = Column(String(10), nullable=False, default='done', server_default='done',
+                    comment='状态：done-已入库，failed-抓取或解析失败待重试')
+    failures = Column(Integer, nullable=False, default=0, server_default='0', comment='连续失败次数')
+    first_seen = Column(TIMESTAMP(timezone=True), server_default=func.now(), comment='首次抓取时间')
+
+    def __repr__(self):
+        return f"<SeenUrl(url='{self.url}')>"
+
+
+class CrawlWatermark(Base):
+    """列表页抓取高水位表：记录每个来源上次抓取到的最新公告"""
+
+    __tablename__ = 'crawl_watermarks'
+
+    source = Column(String(200), primary_key=True, comment='来源（列表页URL）')
+    last_url = Column(Text, comment='最新公告URL')
+    last_publish_date = Column(String(10), comment='最新公告发布日期（YYYY-MM-DD）')
+    updated_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now(), comment='更新时间')
+
+    def __repr__(self):
+        return f"<CrawlWatermark(source='{self.source}', last_url='{self.last_url}')>"
+
+
 class CrawlLog(Base):
     """爬取日志表"""
 
@@ -70,6 +205,7 @@ class CrawlLog(Base):
     success_count = Column(String(10), default='0', comment='成功数')
     failed_count = Column(String(10), default='0', comment='失败数')
     error_message = Column(Text, comment='错误信息')
+    metrics = Column(JSONB, comment='运行指标（资源拦截、抓取层命中等）')
     status = Column(String(20), default='running', comment='状态')
 
     def __repr__(self):
@@ -0,0 +1,9 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+@Time    : 2026/10/18 18:00
+@Author  : Manus AI
+@File    : __init__.py
+@Desc    : 性能基准测试
+"""
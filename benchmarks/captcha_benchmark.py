@@ -0,0 +1,342 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+@Time    : 2026/10/18 18:00
+@Author  : Manus AI
+@File    : captcha_benchmark.py
+@Desc    : 验证码识别基准测试：在已标注的本地样本集上统计各识别层的准确率、延迟、模型加载时间和峰值内存
+"""
+
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from crawler.captcha_archive import CaptchaArchive
+
+# 可测试的识别层
+#   auto     - 与线上一致：按环境变量配置的模板匹配 → OCR服务 → 本地PaddleOCR
+#   paddle   - 仅本地PaddleOCR
+#   service  - 仅OCR服务（服务不可用时CaptchaSolver会回退到本地PaddleOCR）
+#   template - 仅模板匹配，置信度不足时视为未作答
+TIERS = ('auto', 'paddle', 'service', 'template')
+
+# 标注文件名：CSV两列 "文件名,答案"
+LABELS_FILE = 'labels.csv'
+
+# 不计入延迟统计的预热样本数（首次识别包含按需加载模型等开销）
+DEFAULT_WARMUP = 1
+
+
+def load_corpus(directory: str) -> List[Tuple[Path, int]]:
+    """
+    加载已标注的验证码样本集
+
+    支持两种格式：
+    1. 目录下有 labels.csv（每行 "文件名,答案"，文件名相对于该目录）
+    2. CaptchaArchive归档目录，仅使用验证通过的样本，答案即标注
+
+    :param directory: 样本目录
+    :return: (图片路径, 正确答案) 列表
+    """
+    root = Path(directory)
+    labels_path = root / LABELS_FILE
+    samples = []
+
+    if labels_path.exists():
+        with labels_path.open(encoding='utf-8', newline='') as f:
+            for row in csv.reader(f):
+                if len(row) < 2 or row[0].startswith('#'):
+                    continue
+                try:
+                    samples.append((root / row[0].strip(), int(row[1])))
+                except ValueError:
+                    # 表头或无效行
+                    continue
+        return samples
+
+    for image_path, meta in CaptchaArchive(directory).iter_samples():
+        if meta.get('verified') and meta.get('answer') is not None:
+            samples.append((image_path, int(meta['answer'])))
+    return samples
+
+
+def summarize_latencies(latencies: List[float]) -> Dict[str, Optional[float]]:
+    """
+    统计延迟分位数
+
+    :param latencies: 单张识别耗时列表（秒）
+    :return: 毫秒为单位的 mean/p50/p95/p99/max
+    """
+    if not latencies:
+        return {'mean': None, 'p50': None, 'p95': None, 'p99': None, 'max': None}
+    values = np.array(latencies) * 1000
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        'mean': round(float(values.mean()), 3),
+        'p50': round(float(p50), 3),
+        'p95': round(float(p95), 3),
+        'p99': round(float(p99), 3),
+        'max': round(float(values.max()), 3),
+    }
+
+
+def _peak_rss_mb() -> float:
+    """当前进程的峰值常驻内存（MB），Linux下ru_maxrss单位为KB，macOS为字节"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def _create_solver(tier: str, template_model: Optional[str], service_socket: Optional[str]):
+    """
+    按识别层创建识别器
+
+    :param tier: 识别层名称
+    :param template_model: 模板文件路径
+    :param service_socket: OCR服务Socket路径
+    :return: CaptchaSolver实例
+    """
+    from crawler.captcha_solver import CaptchaSolver, CAPTCHA_TEMPLATE_MODEL
+    from crawler.ocr_service import OCR_SERVICE_SOCKET, DEFAULT_SOCKET_PATH
+
+    if tier == 'auto':
+        return CaptchaSolver(
+            service_socket=service_socket if service_socket is not None else OCR_SERVICE_SOCKET,
+            template_model=template_model if template_model is not None else CAPTCHA_TEMPLATE_MODEL,
+            cache_path='',
+        )
+    if tier == 'paddle':
+        return CaptchaSolver(service_socket='', template_model='', cache_path='')
+    if tier == 'service':
+        return CaptchaSolver(service_socket=service_socket or OCR_SERVICE_SOCKET or DEFAULT_SOCKET_PATH,
+                             template_model='', cache_path='')
+    if tier == 'template':
+        model = template_model or CAPTCHA_TEMPLATE_MODEL
+        if not model or not os.path.exists(model):
+            raise ValueError("template识别层需要模板文件（--template-model 或 CAPTCHA_TEMPLATE_MODEL）")
+
+        class TemplateOnlySolver(CaptchaSolver):
+            """只使用模板匹配，置信度不足时不交给PaddleOCR"""
+
+            def _recognize(self, image: bytes, array: Optional[np.ndarray] = None,
+                           use_template: bool = True) -> Optional[str]:
+                text, confidence = self.template_solver.recognize(self._decode(image, array))
+                return text if confidence >= self.template_min_confidence else None
+
+        return TemplateOnlySolver(service_socket='', template_model=model, cache_path='')
+    raise ValueError(f"未知识别层: {tier}")
+
+
+def run_tier(tier: str, samples: List[Tuple[str, int]], template_model: Optional[str] = None,
+             service_socket: Optional[str] = None, warmup: int = DEFAULT_WARMUP) -> Dict:
+    """
+    在当前进程中测试一个识别层
+
+    :param tier: 识别层名称
+    :param samples: (图片路径, 正确答案) 列表
+    :param template_model: 模板文件路径
+    :param service_socket: OCR服务Socket路径
+    :param warmup: 不计入延迟统计的预热样本数
+    :return: 测试结果
+    """
+    # 先读入全部图片，避免磁盘IO计入识别延迟
+    images = [(Path(path).read_bytes(), answer) for path, answer in samples]
+    rss_before = _peak_rss_mb()
+
+    start = time.perf_counter()
+    solver = _create_solver(tier, template_model, service_socket)
+    load_time = time.perf_counter() - start
+
+    latencies = []
+    correct = wrong = unanswered = 0
+    failures = []
+    for index, (image, expected) in enumerate(images):
+        start = time.perf_counter()
+        answer = solver.solve_image(image)
+        elapsed = time.perf_counter() - start
+        if index >= warmup:
+            latencies.append(elapsed)
+
+        if answer is None:
+            unanswered += 1
+        elif answer == expected:
+            correct += 1
+        else:
+            wrong += 1
+        if answer != expected:
+            failures.append({'file': Path(samples[index][0]).name, 'expected': expected, 'answer': answer})
+
+    total = len(images)
+    return {
+        'samples': total,
+        'correct': correct,
+        'wrong': wrong,
+        'unanswered': unanswered,
+        'accuracy': round(correct / total, 4) if total else None,
+        # 作答样本中的正确率：模板层置信度不足时不作答，由下一层兜底
+        'precision': round(correct / (correct + wrong), 4) if correct + wrong else None,
+        'model_load_s': round(load_time, 3),
+        'latency_ms': summarize_latencies(latencies),
+        'peak_rss_mb': _peak_rss_mb(),
+        'rss_before_load_mb': rss_before,
+        'failures': failures[:50],
+    }
+
+
+def _run_tier_quietly(*args, **kwargs) -> Dict:
+    """子进程入口：识别日志会淹没报告，只保留警告以上"""
+    from loguru import logger
+    logger.remove()
+    logger.add(sys.stderr, level='WARNING')
+    return run_tier(*args, **kwargs)
+
+
+def run_tier_isolated(tier: str, samples: List[Tuple[str, int]], **kwargs) -> Dict:
+    """
+    在独立子进程中测试一个识别层，使峰值内存和模型加载时间互不干扰
+
+    :param tier: 识别层名称
+    :param samples: (图片路径, 正确答案) 列表
+    :return: 测试结果，失败时包含 error
+    """
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(1) as pool:
+        try:
+            return pool.apply(_run_tier_quietly, (tier, samples), kwargs)
+        except Exception as e:
+            return {'error': f"{type(e).__name__}: {e}"}
+
+
+def compare_results(current: Dict, baseline: Dict, max_accuracy_drop: float = 0.01,
+                    max_latency_increase: float = 0.2) -> List[str]:
+    """
+    与基线结果对比，找出回退项
+
+    :param current: 本次结果
+    :param baseline: 基线结果
+    :param max_accuracy_drop: 允许的准确率下降（绝对值）
+    :param max_latency_increase: 允许的p95延迟增幅（比例）
+    :return: 回退描述列表，为空表示无回退
+    """
+    regressions = []
+    for tier, result in current.get('tiers', {}).items():
+        base = baseline.get('tiers', {}).get(tier)
+        if not base or 'error' in result or 'error' in base:
+            continue
+
+        if result['accuracy'] is not None and base['accuracy'] is not None:
+            if base['accuracy'] - result['accuracy'] > max_accuracy_drop:
+                regressions.append(f"{tier}: 准确率 {base['accuracy']:.2%} -> {result['accuracy']:.2%}")
+
+        p95, base_p95 = result['latency_ms']['p95'], base['latency_ms']['p95']
+        if p95 is not None and base_p95 and p95 > base_p95 * (1 + max_latency_increase):
+            regressions.append(f"{tier}: p95延迟 {base_p95:.1f}ms -> {p95:.1f}ms")
+    return regressions
+
+
+def _git_revision() -> Optional[str]:
+    """当前代码版本"""
+    try:
+        return subprocess.check_output(
+            ['git', 'describe', '--always', '--dirty'],
+            cwd=os.path.dirname(os.path.abspath(__file__)), stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _print_report(report: Dict):
+    """打印结果表格"""
+    print(f"\n样本集: {report['corpus']}（{report['samples']} 张）  版本: {report['revision']}")
+    print(f"{'识别层':<10}{'准确率':>8}{'未作答':>8}{'加载(s)':>9}{'p50(ms)':>10}"
+          f"{'p95(ms)':>10}{'p99(ms)':>10}{'峰值内存(MB)':>14}")
+    for tier, result in report['tiers'].items():
+        if 'error' in result:
+            print(f"{tier:<10}失败: {result['error']}")
+            continue
+        latency = result['latency_ms']
+        fmt = lambda value: f"{value:.1f}" if value is not None else '-'
+        accuracy = f"{result['accuracy']:.2%}" if result['accuracy'] is not None else '-'
+        print(f"{tier:<10}{accuracy:>8}{result['unanswered']:>8}{result['model_load_s']:>9.2f}"
+              f"{fmt(latency['p50']):>10}{fmt(latency['p95']):>10}{fmt(latency['p99']):>10}"
+              f"{result['peak_rss_mb']:>14.1f}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="验证码识别基准测试")
+    parser.add_argument('corpus', help="已标注样本目录（含labels.csv，或CaptchaArchive归档目录）")
+    parser.add_argument('--tiers', default='auto', help=f"逗号分隔的识别层: {','.join(TIERS)}")
+    parser.add_argument('--template-model', default=None, help="模板文件路径，默认读取CAPTCHA_TEMPLATE_MODEL")
+    parser.add_argument('--service-socket', default=None, help="OCR服务Socket路径，默认读取OCR_SERVICE_SOCKET")
+    parser.add_argument('--limit', type=int, default=0, help="最多使用的样本数（0为全部）")
+    parser.add_argument('--warmup', type=int, default=DEFAULT_WARMUP, help="不计入延迟统计的预热样本数")
+    parser.add_argument('--output', default=None, help="JSON结果输出路径")
+    parser.add_argument('--baseline', default=None, help="基线JSON结果，存在回退时返回非零退出码")
+    args = parser.parse_args(argv)
+
+    tiers = [tier.strip() for tier in args.tiers.split(',') if tier.strip()]
+    unknown = [tier for tier in tiers if tier not in TIERS]
+    if unknown:
+        parser.error(f"未知识别层: {','.join(unknown)}")
+
+    samples = load_corpus(args.corpus)
+    if args.limit:
+        samples = samples[:args.limit]
+    if not samples:
+        print(f"样本集为空: {args.corpus}")
+        return 1
+    samples = [(str(path), answer) for path, answer in samples]
+
+    report = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'revision': _git_revision(),
+        'python': platform.python_version(),
+        'corpus': os.path.abspath(args.corpus),
+        'samples': len(samples),
+        'tiers': {},
+    }
+    for tier in tiers:
+        report['tiers'][tier] = run_tier_isolated(
+            tier, samples,
+            template_model=args.template_model,
+            service_socket=args.service_socket,
+            warmup=args.warmup,
+        )
+
+    _print_report(report)
+
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding='utf-8')
+        print(f"\n结果已保存: {args.output}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding='utf-8'))
+        regressions = compare_results(report, baseline)
+        if regressions:
+            print("\n与基线相比存在回退:")
+            for line in regressions:
+                print(f"  - {line}")
+            return 2
+        print("\n与基线相比无回退")
+
+    return 0
+
+
+if __name__ == "__main__":
+    # 用法: python -m benchmarks.captcha_benchmark <样本目录> --tiers template,paddle --output result.json
+    sys.exit(main())
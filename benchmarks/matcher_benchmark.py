@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+@Time    : 2026/10/18 20:00
+@Author  : Manus AI
+@File    : matcher_benchmark.py
+@Desc    : 关键词匹配基准测试：对比正则逐个匹配与Aho-Corasick自动机在不同关键词规模下的耗时
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.captcha_benchmark import summarize_latencies
+from app.core.matcher import KeywordMatcher
+
+DEFAULT_SIZES = (10, 1000, 50000)
+
+# 合成文本使用的常用汉字
+CHARSET = (
+    '的一是在不了有和人这中大为上个国我以要他时来用们生到作地于出就分对成会可主发年动同工也能下过子说产种面而方后多定行学法'
+    '所民得经十三之进着等部度家电力里如水化高自二理起小物现实加量都两体制机当使点从业本去把性好应开它合还因由其些然前外天政'
+    '四日那社义事平形相全表间样与关各重新线内数正心反你明看原又么利比或但质气第向道命此变条只没结解问意建月公无系军很情者最'
+    '立代想已通并提直题党程展五果料象员革位入常文总次品式活设及管特件长求老头基资边流路级少图山统接知较将组见计别她手角期根'
+    '论运农指几九区强放决西被干做必战先回则任取据处队南给色光门即保治北造百规热领七海口东导器压志世金增争济阶油思术极交受联'
+    '什认六共权收证改清己美再采转更单风切打白教速花带安场身车例真务具万每目至达走积示议声报斗完类八离华名确才科张信马节话米'
+    '整空元况今集温传土许步群广石记需段研界拉林律叫且究观越织装影算低持音众书布复容儿须际商非验连断深难近矿千周委素技备半办'
+    '标识牌宣传栏文化广告标志项目招标采购公告制作安装'
+)
+
+
+def make_keywords(count: int, rng: random.Random) -> List[Dict]:
+    """
+    生成指定数量的不重复关键词（2~4个字）
+
+    :param count: 关键词数量
+    :param rng: 随机数生成器
+    :return: 关键词列表
+    """
+    keywords = set()
+    while len(keywords) < count:
+        keywords.add(''.join(rng.choice(CHARSET) for _ in range(rng.randint(2, 4))))
+    return [{'keyword': keyword, 'weight': round(rng.uniform(0.5, 2.0), 1)} for keyword in sorted(keywords)]
+
+
+def make_documents(count: int, length: int, keywords: List[Dict], rng: random.Random) -> List[str]:
+    """
+    生成合成公告文本，随机插入部分关键词
+
+    :param count: 文本数量
+    :param length: 每篇文本的大致长度（字）
+    :param keywords: 关键词列表
+    :param rng: 随机数生成器
+    :return: 文本列表
+    """
+    documents = []
+    for _ in range(count):
+        chars = [rng.choice(CHARSET) for _ in range(length)]
+        for _ in range(20):
+            keyword = rng.choice(keywords)['keyword']
+            position = rng.randrange(len(chars))
+            chars[position:position] = list(keyword)
+        documents.append(''.join(chars))
+    return documents
+
+
+def run_engine(engine: str, keywords: List[Dict], documents: List[str]) -> Dict:
+    """
+    测试一种匹配引擎
+
+    :param engine: 匹配引擎（regex / aho_corasick / auto）
+    :param keywords: 关键词列表
+    :param documents: 文本列表
+    :return: 构建耗时、单篇耗时统计和全部评分结果
+    """
+    start = time.perf_counter()
+    matcher = KeywordMatcher(keywords, engine=engine)
+    build_time = time.perf_counter() - start
+
+    latencies, results = [], []
+    for document in documents:
+        start = time.perf_counter()
+        results.append(matcher.calculate_match_score(document))
+        latencies.append(time.perf_counter() - start)
+
+    return {
+        'build_s': round(build_time, 4),
+        'latency_ms': summarize_latencies(latencies),
+        'docs_per_s': round(len(documents) / sum(latencies), 1) if sum(latencies) else None,
+        'results': results,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="关键词匹配基准测试")
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)), help="逗号分隔的关键词数量")
+    parser.add_argument('--docs', type=int, default=20, help="每种规模的文本数量")
+    parser.add_argument('--length', type=int, default=3000, help="每篇文本的长度（字）")
+    parser.add_argument('--seed', type=int, default=42, help="随机种子")
+    parser.add_argument('--output', default=None, help="JSON结果输出路径")
+    args = parser.parse_args(argv)
+
+    # 匹配日志会淹没报告
+    from loguru import logger
+    logger.remove()
+    logger.add(sys.stderr, level='WARNING')
+
+    report = {'timestamp': datetime.now().isoformat(timespec='seconds'), 'docs': args.docs,
+              'length': args.length, 'sizes': {}}
+    print(f"{'关键词数':>8}{'引擎':>14}{'构建(s)':>10}{'p50(ms)':>10}{'p95(ms)':>10}{'篇/秒':>10}")
+
+    for size in (int(value) for value in args.sizes.split(',')):
+        rng = random.Random(args.seed)
+        keywords = make_keywords(size, rng)
+        documents = make_documents(args.docs, args.length, keywords, rng)
+
+        engines = {engine: run_engine(engine, keywords, documents) for engine in ('regex', 'aho_corasick', 'auto')}
+        results = [result.pop('results') for result in engines.values()]
+        consistent = all(result == results[0] for result in results)
+        report['sizes'][size] = {**engines, 'consistent': consistent,
+                                 'speedup': round(engines['regex']['latency_ms']['mean']
+                                                  / engines['aho_corasick']['latency_ms']['mean'], 1)}
+
+        for engine, result in engines.items():
+            latency = result['latency_ms']
+            print(f"{size:>8}{engine:>14}{result['build_s']:>10.3f}{latency['p50']:>10.2f}"
+                  f"{latency['p95']:>10.2f}{result['docs_per_s']:>10}")
+        print(f"{'':>8}自动机加速比 {report['sizes'][size]['speedup']}x，结果一致: {consistent}")
+        if not consistent:
+            print("各引擎评分结果不一致！")
+            return 2
+
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding='utf-8')
+        print(f"\n结果已保存: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    # 用法: python -m benchmarks.matcher_benchmark --sizes 10,1000,50000 --docs 20
+    sys.exit(main())
@@ -0,0 +1,362 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+@Time    : 2026/10/18 10:00
+@Author  : Manus AI
+@File    : async_engine.py
+@Desc    : 异步并发爬虫引擎，基于playwright.async_api和页面池并发抓取详情页
+"""
+
+import asyncio
+import math
+import time
+from typing import Dict, List, Optional
+from playwright.async_api import async_playwright, Page, BrowserContext, Route
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+from loguru import logger
+from tenacity import retry, stop_after_attempt, wait_exponential
+
+from crawler.engine import CrawlerEngine, BROWSER_ARGS, CONTEXT_OPTIONS, IMAGES_LOADED_JS
+from crawler.page_checks import CAPTCHA_TITLE_KEYWORD, CAPTCHA_INPUT_SELECTOR
+
+
+class AsyncCrawlerEngine(CrawlerEngine):
+    """
+    异步并发爬虫引擎
+
+    在多个浏览器上下文中预先创建固定数量的页面组成页面池，
+    每次抓取从池中借出一个页面，抓取结束后归还，从而限制最大并发数。
+    对外同时提供同步接口（start/stop/fetch_page/fetch_pages），
+    内部在引擎自有的事件循环中运行，调度器无需感知asyncio。
+    """
+
+    def __init__(self, headless: bool = True, concurrency: int = 5, contexts: int = 1, **kwargs):
+        """
+        初始化异步爬虫引擎
+
+        :param headless: 是否使用无头模式
+        :param concurrency: 页面池大小，即最大并发抓取数
+        :param contexts: 浏览器上下文数量，页面平均分配到各上下文
+        :param kwargs: 其余参数同CrawlerEngine（页面/内存预算、会话状态路径等）
+        """
+        super().__init__(headless=headless, **kwargs)
+        self.concurrency = max(1, concurrency)
+        self.context_count = max(1, min(contexts, self.concurrency))
+        self.contexts: List[BrowserContext] = []
+        self._page_pool: Optional[asyncio.Queue] = None
+        self._captcha_lock: Optional[asyncio.Lock] = None
+        self._captcha_epoch = 0
+        self._loop = asyncio.new_event_loop()
+
+    # ------------------------------------------------------------------
+    # 同步接口
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """启动浏览器并创建页面池"""
+        self._loop.run_until_complete(self.start_async())
+
+    def stop(self):
+        """关闭页面池和浏览器"""
+        self._loop.run_until_complete(self.stop_async())
+
+    def is_alive(self) -> bool:
+        """
+        健康检查：浏览器连接正常且各上下文都能新建页面
+
+        :return: True表示浏览器可用
+        """
+        if not self.browser or not self.contexts:
+            return False
+        return self._loop.run_until_complete(self._is_alive_async())
+
+    def export_cookies(self) -> List[Dict]:
+        """
+        导出所有浏览器上下文的Cookie，供HTTP快速通道复用
+
+        :return: Playwright格式的Cookie列表
+        """
+        cookies = []
+        for context in self.contexts:
+            cookies.extend(self._loop.run_until_complete(context.cookies()))
+        return cookies
+
+    def fetch_page(self, url: str) -> Optional[str]:
+        """
+        获取单个页面内容，自动处理验证码
+
+        :param url: 目标URL
+        :return: 页面HTML内容，失败返回None
+        """
+        return self._loop.run_until_complete(self.fetch_page_async(url))
+
+    def fetch_pages(self, urls: List[str]) -> Dict[str, Optional[str]]:
+        """
+        并发获取多个页面内容
+
+        :param urls: 目标URL列表
+        :return: {URL: 页面HTML}，失败的URL对应None
+        """
+        return self._loop.run_until_complete(self.fetch_pages_async(urls))
+
+    # ------------------------------------------------------------------
+    # 异步接口
+    # ------------------------------------------------------------------
+
+    async def start_async(self):
+        """启动浏览器，创建上下文和页面池"""
+        try:
+            self.playwright = await async_playwright().start()
+            self.browser = await self.playwright.chromium.launch(
+                headless=self.headless,
+                args=BROWSER_ARGS
+            )
+
+            self._page_pool = asyncio.Queue()
+            self._captcha_lock = asyncio.Lock()
+
+            pages_per_context = math.ceil(self.concurrency / self.context_count)
+            remaining = self.concurrency
+            storage_state = self.session_store.load()
+            for _ in range(self.context_count):
+                context = await self.browser.new_context(**CONTEXT_OPTIONS, storage_state=storage_state)
+                if self.resource_policy.enabled:
+                    await context.route('**/*', self._route_request)
+                self.contexts.append(context)
+                for _ in range(min(pages_per_context, remaining)):
+                    self._page_pool.put_nowait(await context.new_page())
+                    remaining -= 1
+
+            self.context = self.contexts[0]
+            self.pages_served = 0
+            logger.info(f"异步浏览器启动成功，上下文数: {self.context_count}，页面池大小: {self.concurrency}")
+        except Exception as e:
+            logger.error(f"异步浏览器启动失败: {e}")
+            raise
+
+    async def stop_async(self):
+        """关闭所有上下文和浏览器"""
+        try:
+            for context in self.contexts:
+                await context.close()
+            if self.browser:
+                await self.browser.close()
+            if self.playwright:
+                await self.playwright.stop()
+            logger.info("异步浏览器已关闭")
+        except Exception as e:
+            logger.error(f"异步浏览器关闭异常: {e}")
+        finally:
+            self.contexts = []
+            self.context = None
+            self.browser = None
+            self.playwright = None
+            self._page_pool = None
+
+    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=2, min=2, max=10))
+    async def fetch_page_async(self, url: str) -> Optional[str]:
+        """
+        从页面池借出页面抓取内容，自动处理验证码
+
+        :param url: 目标URL
+        :return: 页面HTML内容，失败返回None
+        """
+        page = await self._page_pool.get()
+        try:
+            self.pages_served += 1
+
+            # 按域名限速，速率随验证码率/错误率自适应调整
+            await self.rate_limiter.acquire_async(url)
+            logger.info(f"正在访问: {url}")
+
+            # 访问页面
+            await page.goto(url, wait_until='domcontentloaded', timeout=30000)
+
+            # 检查是否有验证码
+            captcha_seen = await self._has_captcha(page)
+            if captcha_seen:
+                self.rate_limiter.record_captcha(url)
+                epoch = self._captcha_epoch
+                async with self._captcha_lock:
+                    # 等锁期间其他页面或其他进程可能已通过验证码，注入最新Cookie后重新访问
+                    if self._captcha_epoch != epoch or self.session_store.has_newer():
+                        await self._apply_shared_session(page.context)
+                        await self.rate_limiter.acquire_async(url)
+                        await page.goto(url, wait_until='domcontentloaded', timeout=30000)
+
+                    if await self._has_captcha(page):
+                        self.session_store.invalidate()
+                        logger.info("检测到验证码，开始识别...")
+                        success = await self._solve_captcha(page)
+                        if not success:
+                            logger.error("验证码识别失败")
+                            return None
+                        self._captcha_epoch += 1
+                        self.session_store.save(await page.context.storage_state())
+
+                        # 验证码通过后，等待页面加载
+                        await page.wait_for_load_state('domcontentloaded', timeout=10000)
+
+            # 获取页面内容
+            content = await page.content()
+            if not captcha_seen:
+                self.rate_limiter.record_success(url)
+            logger.info(f"页面获取成功: {url}")
+            return content
+
+        except Exception as e:
+            logger.error(f"页面获取失败: {url}, 错误: {e}")
+            self.rate_limiter.record_error(url)
+            page = await self._renew_page(page)
+            raise  # 让retry装饰器处理重试
+
+        finally:
+            self._page_pool.put_nowait(page)
+
+    async def fetch_pages_async(self, urls: List[str]) -> Dict[str, Optional[str]]:
+        """
+        并发抓取多个页面，并发度受页面池大小限制
+
+        :param urls: 目标URL列表
+        :return: {URL: 页面HTML}，失败的URL对应None
+        """
+        async def _fetch(url: str):
+            try:
+                return url, await self.fetch_page_async(url)
+            except Exception as e:
+                logger.error(f"页面多次重试后仍失败: {url}, 错误: {e}")
+                return url, None
+
+        start = time.monotonic()
+        results = await asyncio.gather(*(_fetch(url) for url in urls))
+        logger.info(f"并发抓取 {len(urls)} 个页面完成，耗时 {time.monotonic() - start:.1f}s")
+        return dict(results)
+
+    async def _is_alive_async(self) -> bool:
+        """异步健康检查"""
+        try:
+            if not self.browser.is_connected():
+                return False
+            for context in self.contexts:
+                page = await context.new_page()
+                await page.close()
+            return True
+        except Exception as e:
+            logger.warning(f"浏览器健康检查失败: {e}")
+            return False
+
+    async def _renew_page(self, page: Page) -> Page:
+        """
+        抓取异常后用同一上下文中的新页面替换旧页面，避免坏页面回到池中
+
+        :param page: 出错的页面
+        :return: 新页面，创建失败时返回原页面
+        """
+        try:
+            context = page.context
+            await page.close()
+            return await context.new_page()
+        except Exception as e:
+            logger.warning(f"页面重建失败: {e}")
+            return page
+
+    async def _route_request(self, route: Route):
+        """按拦截策略放行或拦截请求"""
+        request = route.request
+        if self.resource_policy.should_block(request.resource_type, request.url):
+            self.resource_policy.record_blocked(request.resource_type)
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def _apply_shared_session(self, context: BrowserContext) -> bool:
+        """
+        将磁盘上最新的会话状态Cookie注入浏览器上下文
+
+        :param context: 浏览器上下文
+        :return: True表示已注入
+        """
+        state = self.session_store.load()
+        if not state or not state.get('cookies'):
+            return False
+        await context.add_cookies(state['cookies'])
+        logger.info("已复用共享会话状态")
+        return True
+
+    async def _has_captcha(self, page: Page) -> bool:
+        """
+        检测页面是否包含验证码
+
+        :param page: Playwright页面对象
+        :return: True表示有验证码
+        """
+        try:
+            title = await page.title()
+            if CAPTCHA_TITLE_KEYWORD in title:
+                return True
+
+            captcha_input = await page.locator(CAPTCHA_INPUT_SELECTOR).count()
+            return captcha_input > 0
+
+        except Exception as e:
+            logger.warning(f"验证码检测异常: {e}")
+            return False
+
+    async def _solve_captcha(self, page: Page) -> bool:
+        """
+        识别并提交验证码，OCR在线程池中执行以免阻塞事件循环
+
+        :param page: Playwright页面对象
+        :return: True表示验证成功
+        """
+        unblocked = False
+        try:
+            # 验证码图片被拦截时，为当前页面放行全部请求并重新加载
+            if self.resource_policy.enabled and not await page.evaluate(IMAGES_LOADED_JS):
+                await page.route('**/*', lambda route: route.continue_())
+                unblocked = True
+                await page.reload(wait_until='load', timeout=30000)
+
+            captcha_img = page.locator('img').first
+
+            if await captcha_img.count() == 0:
+                logger.error("未找到验证码图片")
+                return False
+
+            # 截取验证码图片，字节直接交给OCR，不落盘
+            image = await captcha_img.screenshot()
+
+            # OCR识别及结果回传（缓存写SQLite、样本归档写文件）都放到线程池，不阻塞事件循环
+            loop = asyncio.get_running_loop()
+            answer = await loop.run_in_executor(None, self.captcha_solver.solve_image, image)
+            if answer is None:
+                logger.error("验证码识别失败")
+                await loop.run_in_executor(None, self.captcha_solver.report, image, None, False)
+                return False
+
+            # 填写答案并提交，等待提交后的页面跳转
+            await page.locator('input[type="text"]').first.fill(str(answer))
+            try:
+                async with page.expect_navigation(wait_until='domcontentloaded', timeout=10000):
+                    await page.locator('input[type="submit"]').first.click()
+            except PlaywrightTimeoutError:
+                logger.debug("验证码提交后页面未跳转")
+
+            verified = not await self._has_captcha(page)
+            await loop.run_in_executor(None, self.captcha_solver.report, image, answer, verified)
+            if not verified:
+                logger.error("验证码提交后仍在验证页面，可能答案错误")
+                return False
+
+            logger.info("验证码验证成功")
+            return True
+
+        except Exception as e:
+            logger.error(f"验证码处理异常: {e}")
+            return False
+
+        finally:
+            # 页面会回到页面池复用，恢复上下文级的拦截策略
+            if unblocked:
+                await page.unroute('**/*')
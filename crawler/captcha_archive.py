@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+@Time    : 2026/10/18 15:00
+@Author  : Manus AI
+@File    : captcha_archive.py
+@Desc    : 验证码样本归档（可选），按数量上限滚动保存图片和识别结果，用于排查和训练
+"""
+
+import json
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+from loguru import logger
+
+
+class CaptchaArchive:
+    """
+    验证码样本归档
+
+    每个样本保存为一张PNG图片和一个同名JSON文件（识别文本、答案、是否验证通过）。
+    文件名以纳秒时间戳开头，超过数量上限时删除最旧的样本。
+    """
+
+    def __init__(self, directory: Optional[str], max_samples: int = 1000):
+        """
+        初始化样本归档
+
+        :param directory: 归档目录，为空时禁用
+        :param max_samples: 最多保留的样本数
+        """
+        self.directory = Path(directory) if directory else None
+        self.max_samples = max_samples
+
+    @property
+    def enabled(self) -> bool:
+        """是否启用归档"""
+        return self.directory is not None and self.max_samples > 0
+
+    def save(self, image: bytes, text: Optional[str], answer: Optional[int], verified: bool) -> Optional[Path]:
+        """
+        保存一个样本
+
+        :param image: 验证码图片字节（PNG）
+        :param text: OCR识别出的原始文本
+        :param answer: 计算得到的答案
+        :param verified: 提交后是否验证通过
+        :return: 图片路径，未启用或保存失败时返回None
+        """
+        if not self.enabled:
+            return None
+
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            stem = f"captcha_{time.time_ns()}_{uuid.uuid4().hex[:8]}"
+            image_path = self.directory / f"{stem}.png"
+            image_path.write_bytes(image)
+            meta = {'text': text, 'answer': answer, 'verified': verified}
+            (self.directory / f"{stem}.json").write_text(json.dumps(meta, ensure_ascii=False), encoding='utf-8')
+            self._prune()
+            logger.debug(f"验证码样本已归档: {image_path}")
+            return image_path
+        except OSError as e:
+            logger.warning(f"验证码样本归档失败: {e}")
+            return None
+
+    def iter_samples(self) -> Iterator[Tuple[Path, Dict]]:
+        """
+        按时间顺序遍历样本
+
+        :return: (图片路径, 元数据) 迭代器
+        """
+        if not self.directory or not self.directory.exists():
+            return
+        for image_path in sorted(self.directory.glob('captcha_*.png')):
+            meta_path = image_path.with_suffix('.json')
+            try:
+                meta = json.loads(meta_path.read_text(encoding='utf-8'))
+            except (OSError, ValueError):
+                meta = {}
+            yield image_path, meta
+
+    def _prune(self):
+        """删除超出上限的最旧样本"""
+        images = sorted(self.directory.glob('captcha_*.png'))
+        for image_path in images[:max(0, len(images) - self.max_samples)]:
+            image_path.unlink(missing_ok=True)
+            image_path.with_suffix('.json').unlink(missing_ok=True)
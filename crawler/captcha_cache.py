@@ -0,0 +1,219 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+@Time    : 2026/10/18 18:30
+@Author  : Manus AI
+@File    : captcha_cache.py
+@Desc    : 验证码答案缓存：以图片感知哈希为键，记录验证通过的答案和已知错误的答案，SQLite持久化 + LRU淘汰
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Optional, Set
+import cv2
+import numpy as np
+from loguru import logger
+
+
+# 感知哈希边长：16 → 256位。算术验证码之间往往只差一个字符，
+# 64位哈希（8x8）的分辨率不足以区分，会把不同题目映射到同一个键
+HASH_SIZE = 16
+
+
+def dhash(image: np.ndarray, hash_size: int = HASH_SIZE) -> int:
+    """
+    计算差值哈希（dHash）：缩放到 (hash_size+1) x hash_size 的灰度图，比较相邻像素亮度
+
+    重新编码、轻微噪点不会改变哈希，同一张验证码的多次截图得到相同的键
+
+    :param image: BGR或灰度ndarray
+    :param hash_size: 哈希边长，结果为 hash_size² 位
+    :return: 哈希值（整数）
+    """
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    resized = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = (resized[:, 1:] > resized[:, :-1]).ravel()
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+@dataclass
+class CacheEntry:
+    """缓存条目"""
+    answer: Optional[int] = None
+    text: Optional[str] = None
+    wrong: Set[int] = field(default_factory=set)
+
+
+class CaptchaAnswerCache:
+    """
+    验证码答案缓存
+
+    - 正向条目：提交后验证通过的答案，再次遇到同一张图片时直接使用，不再OCR
+    - 负向条目：提交后仍停留在验证页面的答案，再次识别出该答案时视为错误
+
+    内存中用OrderedDict做LRU，写入时同步到SQLite，重启后按最近写入顺序加载。
+    命中只调整内存中的顺序，不写盘，查询开销在微秒级。
+    """
+
+    def __init__(self, path: Optional[str], max_entries: int = 5000, max_distance: int = 0):
+        """
+        初始化缓存
+
+        :param path: SQLite文件路径，为空时仅缓存在内存中
+        :param max_entries: 最多缓存的图片数，为0时禁用
+        :param max_distance: 允许的哈希汉明距离，为0时只做精确匹配
+        """
+        self.max_entries = max_entries
+        self.max_distance = max_distance
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[int, CacheEntry]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+        if self.enabled and path:
+            try:
+                Path(path).parent.mkdir(parents=True, exist_ok=True)
+                self._db = sqlite3.connect(path, check_same_thread=False)
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS captcha_answers ("
+                    "phash TEXT PRIMARY KEY, answer INTEGER, text TEXT, wrong TEXT, updated_at REAL)"
+                )
+                self._db.commit()
+                self._load()
+            except sqlite3.Error as e:
+                logger.warning(f"验证码缓存文件不可用，仅使用内存缓存: {path}, 错误: {e}")
+                self._db = None
+
+    @property
+    def enabled(self) -> bool:
+        """是否启用缓存"""
+        return self.max_entries > 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, key: int) -> Optional[CacheEntry]:
+        """
+        查找图片对应的缓存条目
+
+        :param key: 图片感知哈希
+        :return: 缓存条目，未命中返回None
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry_key = self._find(key)
+            if entry_key is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(entry_key)
+            self.hits += 1
+            return self._entries[entry_key]
+
+    def record(self, key: int, answer: int, verified: bool, text: Optional[str] = None):
+        """
+        记录提交结果
+
+        :param key: 图片感知哈希
+        :param answer: 提交的答案
+        :param verified: 提交后是否验证通过
+        :param text: OCR识别文本
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            entry_key = self._find(key)
+            if entry_key is None:
+                entry_key = key
+                self._entries[key] = CacheEntry()
+            entry = self._entries[entry_key]
+            self._entries.move_to_end(entry_key)
+
+            if verified:
+                entry.answer = answer
+                entry.text = text or entry.text
+                entry.wrong.discard(answer)
+            else:
+                entry.wrong.add(answer)
+                if entry.answer == answer:
+                    # 曾经正确的答案失效（站点更换了题目但图片相近）
+                    entry.answer = None
+
+            self._persist(entry_key, entry)
+            self._evict()
+
+    def get_stats(self) -> Dict:
+        """缓存统计"""
+        total = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 4) if total else 0.0,
+        }
+
+    def close(self):
+        """关闭SQLite连接"""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def _find(self, key: int) -> Optional[int]:
+        """查找精确或在汉明距离内最近的键（需持有锁）"""
+        if key in self._entries:
+            return key
+        if self.max_distance <= 0:
+            return None
+
+        best_key, best_distance = None, self.max_distance + 1
+        for candidate in self._entries:
+            distance = bin(candidate ^ key).count('1')
+            if distance < best_distance:
+                best_key, best_distance = candidate, distance
+        return best_key
+
+    def _load(self):
+        """从SQLite加载最近写入的条目"""
+        rows = self._db.execute(
+            "SELECT phash, answer, text, wrong FROM captcha_answers ORDER BY updated_at DESC LIMIT ?",
+            (self.max_entries,)
+        ).fetchall()
+        for phash, answer, text, wrong in reversed(rows):
+            self._entries[int(phash, 16)] = CacheEntry(answer, text, set(json.loads(wrong or '[]')))
+        if rows:
+            logger.info(f"已加载验证码答案缓存: {len(rows)} 条")
+
+    def _persist(self, key: int, entry: CacheEntry):
+        """写入SQLite（需持有锁）"""
+        if self._db is None:
+            return
+        try:
+            self._db.execute(
+                "INSERT OR REPLACE INTO captcha_answers (phash, answer, text, wrong, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (f"{key:x}", entry.answer, entry.text, json.dumps(sorted(entry.wrong)), time.time())
+            )
+            self._db.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"验证码缓存写入失败: {e}")
+
+    def _evict(self):
+        """淘汰最久未使用的条目（需持有锁）"""
+        evicted = []
+        while len(self._entries) > self.max_entries:
+            key, _ = self._entries.popitem(last=False)
+            evicted.append((f"{key:x}",))
+        if evicted and self._db is not None:
+            try:
+                self._db.executemany("DELETE FROM captcha_answers WHERE phash = ?", evicted)
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"验证码缓存淘汰失败: {e}")
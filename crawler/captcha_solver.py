@@ -8,54 +8,129 @@
 @Desc    : 验证码识别模块 - 使用PaddleOCR识别算术验证码
 """
 
+import os
 import re
-from typing import Optional
-from paddleocr import PaddleOCR
+import hashlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Union
+import cv2
+import numpy as np
 from loguru import logger
 
+from crawler.captcha_archive import CaptchaArchive
+from crawler.captcha_cache import CaptchaAnswerCache, dhash
+from crawler.captcha_templates import TemplateCaptchaSolver
+from crawler.ocr_service import OcrClient, OCR_SERVICE_SOCKET, create_paddle_ocr, decode_image, run_ocr
+
+# 验证码样本归档目录（为空时不归档）及最多保留的样本数
+CAPTCHA_ARCHIVE_DIR = os.getenv('CAPTCHA_ARCHIVE_DIR', '')
+CAPTCHA_ARCHIVE_MAX = int(os.getenv('CAPTCHA_ARCHIVE_MAX', '1000'))
+
+# 模板匹配识别：模板文件路径（为空或不存在时不启用）及采用其结果的最低置信度
+CAPTCHA_TEMPLATE_MODEL = os.getenv('CAPTCHA_TEMPLATE_MODEL', '')
+CAPTCHA_TEMPLATE_MIN_CONFIDENCE = float(os.getenv('CAPTCHA_TEMPLATE_MIN_CONFIDENCE', '0.85'))
+
+# 验证码答案缓存：SQLite文件路径（为空时仅缓存在内存中）、最多缓存的图片数（为0时禁用）、允许的哈希汉明距离
+CAPTCHA_CACHE_PATH = os.getenv('CAPTCHA_CACHE_PATH', '/tmp/bid_monitor_state/captcha_cache.db')
+CAPTCHA_CACHE_SIZE = int(os.getenv('CAPTCHA_CACHE_SIZE', '5000'))
+CAPTCHA_CACHE_MAX_DISTANCE = int(os.getenv('CAPTCHA_CACHE_MAX_DISTANCE', '0'))
+
 
 class CaptchaSolver:
     """算术验证码识别器"""
 
-    def __init__(self):
-        """初始化PaddleOCR"""
-        try:
-            self.ocr = PaddleOCR(
-                use_angle_cls=True,
-                lang='ch',
-                use_gpu=False,
-                show_log=False
-            )
-            logger.info("PaddleOCR初始化成功")
-        except Exception as e:
-            logger.error(f"PaddleOCR初始化失败: {e}")
-            raise
+    # 记录最近识别文本的图片数量，供提交结果回传时归档使用
+    RECENT_TEXTS_SIZE = 32
+
+    def __init__(self, service_socket: Optional[str] = OCR_SERVICE_SOCKET,
+                 template_model: Optional[str] = CAPTCHA_TEMPLATE_MODEL,
+                 template_min_confidence: float = CAPTCHA_TEMPLATE_MIN_CONFIDENCE,
+                 cache_path: Optional[str] = CAPTCHA_CACHE_PATH,
+                 cache_size: int = CAPTCHA_CACHE_SIZE):
+        """
+        初始化识别器
+
+        :param service_socket: OCR服务的Unix Socket路径。配置后作为瘦客户端请求共享的OCR进程池，
+                               服务不可用时才在本进程加载PaddleOCR；未配置时直接加载本地PaddleOCR
+        :param template_model: 模板匹配识别的模板文件(.npz)，存在时优先使用模板匹配
+        :param template_min_confidence: 模板匹配结果的最低置信度，低于该值时交给PaddleOCR
+        :param cache_path: 答案缓存的SQLite文件路径，为空时仅缓存在内存中
+        :param cache_size: 最多缓存的图片数，为0时禁用答案缓存
+        """
+        self.archive = CaptchaArchive(CAPTCHA_ARCHIVE_DIR, CAPTCHA_ARCHIVE_MAX)
+        self.cache = CaptchaAnswerCache(cache_path, cache_size, CAPTCHA_CACHE_MAX_DISTANCE)
+        self._recent_texts: OrderedDict = OrderedDict()
+        self._ocr = None
+        self.client = OcrClient(service_socket) if service_socket else None
+        self.template_min_confidence = template_min_confidence
+        self.template_solver = None
+
+        if template_model and os.path.exists(template_model):
+            self.template_solver = TemplateCaptchaSolver.load(template_model)
+            logger.info(f"模板匹配识别已启用: {template_model}")
+            # 模板匹配覆盖常见情况，PaddleOCR仅在兜底时按需加载
+            return
+
+        if self.client:
+            logger.info(f"使用OCR服务: {service_socket}")
+        else:
+            self._get_local_ocr()
 
     def solve(self, image_path: str) -> Optional[int]:
         """
-        识别验证码图片并计算结果
+        识别验证码图片文件并计算结果
 
         :param image_path: 验证码图片路径
         :return: 计算结果（整数），识别失败返回None
         """
         try:
-            # OCR识别
-            result = self.ocr.ocr(image_path, cls=True)
+            image = Path(image_path).read_bytes()
+        except OSError as e:
+            logger.error(f"验证码图片读取失败: {image_path}, 错误: {e}")
+            return None
+        return self.solve_image(image)
 
-            if not result or not result[0]:
-                logger.warning(f"OCR未识别到文字: {image_path}")
-                return None
+    def solve_image(self, image: Union[bytes, np.ndarray]) -> Optional[int]:
+        """
+        识别内存中的验证码图片并计算结果，不经过磁盘
 
-            # 提取识别的文字
-            text = " ".join([line[1][0] for line in result[0]])
-            logger.debug(f"OCR识别原始文本: {text}")
+        同一张图片曾验证通过时直接返回缓存的答案；识别出的答案曾提交失败时，
+        跳过模板匹配重新OCR一次，仍是已知错误答案则返回None
 
-            # 解析算术表达式
-            answer = self._parse_expression(text)
-            if answer is not None:
-                logger.info(f"验证码识别成功: {text} = {answer}")
+        :param image: 图片字节（如Playwright截图返回的PNG）或BGR格式ndarray
+        :return: 计算结果（整数），识别失败返回None
+        """
+        try:
+            if isinstance(image, np.ndarray):
+                array = image
+                ok, buffer = cv2.imencode('.png', image)
+                if not ok:
+                    logger.error("验证码图片编码失败")
+                    return None
+                image = buffer.tobytes()
             else:
-                logger.warning(f"验证码解析失败: {text}")
+                image = bytes(image)
+                array = None
+
+            # 答案缓存
+            entry = None
+            if self.cache.enabled:
+                array = decode_image(image) if array is None else array
+                entry = self.cache.lookup(dhash(array)) if array is not None else None
+            if entry and entry.answer is not None:
+                logger.info(f"验证码答案缓存命中: {entry.answer}")
+                self._remember_text(self._digest(image), entry.text)
+                return entry.answer
+
+            # OCR识别
+            answer = self._recognize_answer(image, array)
+            if answer is not None and entry and answer in entry.wrong and self.template_solver:
+                logger.warning(f"识别结果 {answer} 曾提交失败，跳过模板匹配重新识别")
+                answer = self._recognize_answer(image, array, use_template=False)
+            if answer is not None and entry and answer in entry.wrong:
+                logger.warning(f"识别结果 {answer} 曾提交失败，放弃本次验证码")
+                return None
 
             return answer
 
@@ -63,6 +138,106 @@ class CaptchaSolver:
             logger.error(f"验证码识别异常: {e}")
             return None
 
+    def report(self, image: bytes, answer: Optional[int], verified: bool):
+        """
+        回传验证码提交结果：更新答案缓存，启用归档时保存样本
+
+        :param image: 验证码图片字节
+        :param answer: 提交的答案
+        :param verified: 提交后是否验证通过
+        """
+        text = self._recent_texts.pop(self._digest(image), None)
+        self.archive.save(bytes(image), text, answer, verified)
+
+        if answer is not None and self.cache.enabled:
+            array = decode_image(bytes(image))
+            if array is not None:
+                self.cache.record(dhash(array), answer, verified, text)
+
+    def _recognize_answer(self, image: bytes, array: Optional[np.ndarray],
+                          use_template: bool = True) -> Optional[int]:
+        """
+        识别图片文本并解析算术表达式
+
+        :param image: 图片字节
+        :param array: 解码后的图片，为空时按需从字节解码
+        :param use_template: 是否先尝试模板匹配
+        :return: 计算结果，识别失败返回None
+        """
+        text = self._recognize(image, array, use_template)
+        if not text:
+            logger.warning(f"OCR未识别到文字: <内存图片 {self._digest(image)[:8]}>")
+            return None
+
+        logger.debug(f"OCR识别原始文本: {text}")
+        self._remember_text(self._digest(image), text)
+
+        # 解析算术表达式
+        answer = self._parse_expression(text)
+        if answer is not None:
+            logger.info(f"验证码识别成功: {text} = {answer}")
+        else:
+            logger.warning(f"验证码解析失败: {text}")
+        return answer
+
+    def _recognize(self, image: bytes, array: Optional[np.ndarray] = None,
+                   use_template: bool = True) -> Optional[str]:
+        """
+        识别图片文本：置信度足够时直接采用模板匹配结果，
+        否则优先请求OCR服务，服务不可用时回退到本地PaddleOCR
+
+        :param image: 图片字节
+        :param array: 解码后的图片，为空时按需从字节解码
+        :param use_template: 是否先尝试模板匹配
+        :return: 识别文本
+        """
+        if self.template_solver and use_template:
+            array = self._decode(image, array)
+            text, confidence = self.template_solver.recognize(array)
+            if text and confidence >= self.template_min_confidence and self._parse_expression(text) is not None:
+                logger.debug(f"模板匹配识别: {text}，置信度 {confidence:.2f}")
+                return text
+            logger.debug(f"模板匹配置信度不足({confidence:.2f})，使用PaddleOCR识别")
+
+        if self.client:
+            try:
+                return self.client.recognize(image)
+            except (OSError, RuntimeError, ValueError) as e:
+                logger.warning(f"OCR服务不可用，回退到本地识别: {e}")
+
+        return run_ocr(self._get_local_ocr(), self._decode(image, array))
+
+    @staticmethod
+    def _decode(image: bytes, array: Optional[np.ndarray]) -> np.ndarray:
+        """返回已解码的图片，未解码时从字节解码"""
+        if array is None:
+            array = decode_image(image)
+            if array is None:
+                raise ValueError("验证码图片解码失败")
+        return array
+
+    def _get_local_ocr(self):
+        """按需加载本地PaddleOCR"""
+        if self._ocr is None:
+            try:
+                self._ocr = create_paddle_ocr()
+                logger.info("PaddleOCR初始化成功")
+            except Exception as e:
+                logger.error(f"PaddleOCR初始化失败: {e}")
+                raise
+        return self._ocr
+
+    def _remember_text(self, digest: str, text: str):
+        """记录最近图片的识别文本（有界）"""
+        self._recent_texts[digest] = text
+        while len(self._recent_texts) > self.RECENT_TEXTS_SIZE:
+            self._recent_texts.popitem(last=False)
+
+    @staticmethod
+    def _digest(image: bytes) -> str:
+        """图片字节摘要"""
+        return hashlib.sha1(image).hexdigest()
+
     def _parse_expression(self, text: str) -> Optional[int]:
         """
         解析算术表达式
@@ -0,0 +1,236 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+@Time    : 2026/10/18 17:00
+@Author  : Manus AI
+@File    : captcha_templates.py
+@Desc    : 轻量级算术验证码识别：字符切分 + NumPy模板匹配，置信度不足时由PaddleOCR兜底
+"""
+
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from loguru import logger
+
+
+# 字符归一化尺寸（高, 宽）
+GLYPH_SHAPE = (20, 14)
+
+# OCR文本到模板标签的映射，与CaptchaSolver._parse_expression的运算符替换一致
+LABEL_MAP = {
+    '×': '*', 'X': '*', 'x': '*', '乘': '*',
+    '÷': '/', '除': '/',
+    '加': '+', '减': '-',
+    '？': '?',
+}
+LABEL_CHARS = set('0123456789+-*/=?')
+
+# 列投影中少于该像素数的列视为噪点
+MIN_COLUMN_PIXELS = 1
+# 少于该像素数的连通列段视为噪点
+MIN_GLYPH_PIXELS = 4
+
+
+def to_label(text: str) -> str:
+    """
+    将OCR文本转换为模板标签序列（每个字符对应一个字形）
+
+    :param text: OCR识别文本，如 "3 × 5 = ?"
+    :return: 标签序列，如 "3*5=?"
+    """
+    chars = [LABEL_MAP.get(char, char) for char in text if not char.isspace()]
+    return ''.join(char for char in chars if char in LABEL_CHARS)
+
+
+def binarize(image: np.ndarray) -> np.ndarray:
+    """
+    灰度化并用Otsu阈值二值化，前景（文字）为True
+
+    :param image: BGR或灰度ndarray
+    :return: 布尔掩码
+    """
+    gray = image.mean(axis=2) if image.ndim == 3 else image.astype(np.float64)
+    hist, _ = np.histogram(gray, bins=256, range=(0, 256))
+    total = gray.size
+    cum_count = np.cumsum(hist)
+    cum_sum = np.cumsum(hist * np.arange(256))
+    background = cum_count
+    foreground = total - cum_count
+    valid = (background > 0) & (foreground > 0)
+    mean_b = np.where(valid, cum_sum / np.maximum(background, 1), 0)
+    mean_f = np.where(valid, (cum_sum[-1] - cum_sum) / np.maximum(foreground, 1), 0)
+    between = np.where(valid, background * foreground * (mean_b - mean_f) ** 2, 0)
+    threshold = int(np.argmax(between))
+
+    mask = gray <= threshold
+    # 文字像素应占少数，否则说明是浅色文字深色背景
+    if mask.mean() > 0.5:
+        mask = ~mask
+    return mask
+
+
+def segment(mask: np.ndarray) -> List[np.ndarray]:
+    """
+    按列投影切分字符
+
+    :param mask: 二值化掩码
+    :return: 按从左到右顺序的字符掩码列表（已裁剪到包围盒）
+    """
+    columns = mask.sum(axis=0) >= MIN_COLUMN_PIXELS
+    glyphs = []
+    start = None
+    for x, filled in enumerate(np.append(columns, False)):
+        if filled and start is None:
+            start = x
+        elif not filled and start is not None:
+            glyph = mask[:, start:x]
+            if glyph.sum() >= MIN_GLYPH_PIXELS:
+                rows = np.flatnonzero(glyph.any(axis=1))
+                glyphs.append(glyph[rows[0]:rows[-1] + 1])
+            start = None
+    return glyphs
+
+
+def glyph_vector(glyph: np.ndarray) -> np.ndarray:
+    """
+    将字符掩码缩放到固定尺寸并转为单位特征向量
+
+    :param glyph: 字符掩码
+    :return: 零均值、单位长度的特征向量
+    """
+    height, width = glyph.shape
+    # 保持宽高比：先补成正方形再缩放，避免"1"和"-"被拉伸成相同形状
+    side = max(height, width)
+    canvas = np.zeros((side, side), dtype=np.float32)
+    top, left = (side - height) // 2, (side - width) // 2
+    canvas[top:top + height, left:left + width] = glyph
+
+    rows = (np.arange(GLYPH_SHAPE[0]) + 0.5) * side / GLYPH_SHAPE[0]
+    cols = (np.arange(GLYPH_SHAPE[1]) + 0.5) * side / GLYPH_SHAPE[1]
+    resized = canvas[rows.astype(int)][:, cols.astype(int)].ravel()
+
+    resized -= resized.mean()
+    norm = np.linalg.norm(resized)
+    return resized / norm if norm else resized
+
+
+class TemplateCaptchaSolver:
+    """
+    模板匹配验证码识别器
+
+    每个字符类别的模板是训练样本特征向量的均值，识别时取余弦相似度最高的类别。
+    整张验证码的置信度为各字符最高相似度的最小值；最高与次高相似度过于接近时视为不可信。
+    """
+
+    def __init__(self, labels: List[str], templates: np.ndarray, min_margin: float = 0.05):
+        """
+        初始化识别器
+
+        :param labels: 模板对应的字符标签
+        :param templates: 模板矩阵（类别数 × 特征维度）
+        :param min_margin: 最高与次高相似度的最小差值
+        """
+        self.labels = list(labels)
+        self.templates = templates.astype(np.float32)
+        self.min_margin = min_margin
+
+    @classmethod
+    def train(cls, samples: Iterable[Tuple[np.ndarray, str]]) -> 'TemplateCaptchaSolver':
+        """
+        从已验证正确的样本训练模板
+
+        :param samples: (验证码图片, OCR文本) 迭代器
+        :return: 识别器
+        """
+        vectors: Dict[str, List[np.ndarray]] = {}
+        used = skipped = 0
+        for image, text in samples:
+            label = to_label(text or '')
+            glyphs = segment(binarize(image))
+            if not label or len(glyphs) != len(label):
+                skipped += 1
+                continue
+            for char, glyph in zip(label, glyphs):
+                vectors.setdefault(char, []).append(glyph_vector(glyph))
+            used += 1
+
+        if not vectors:
+            raise ValueError("没有可用于训练的样本（字符切分数与标签长度不一致）")
+
+        labels = sorted(vectors)
+        templates = []
+        for char in labels:
+            mean = np.mean(vectors[char], axis=0)
+            templates.append(mean / (np.linalg.norm(mean) or 1))
+
+        logger.info(f"模板训练完成，使用样本 {used} 个，跳过 {skipped} 个，字符类别: {''.join(labels)}")
+        return cls(labels, np.array(templates))
+
+    def save(self, path: str):
+        """保存模板到.npz文件"""
+        np.savez_compressed(path, labels=np.array(self.labels), templates=self.templates)
+
+    @classmethod
+    def load(cls, path: str) -> 'TemplateCaptchaSolver':
+        """从.npz文件加载模板"""
+        data = np.load(path)
+        return cls([str(label) for label in data['labels']], data['templates'])
+
+    def recognize(self, image: np.ndarray) -> Tuple[Optional[str], float]:
+        """
+        识别验证码文本
+
+        :param image: BGR或灰度ndarray
+        :return: (识别文本, 置信度)，无法切分时返回 (None, 0.0)
+        """
+        glyphs = segment(binarize(image))
+        if not glyphs:
+            return None, 0.0
+
+        features = np.stack([glyph_vector(glyph) for glyph in glyphs])
+        similarity = features @ self.templates.T
+        best = similarity.argmax(axis=1)
+        best_score = similarity[np.arange(len(glyphs)), best]
+
+        if len(self.labels) > 1:
+            second_score = np.partition(similarity, -2, axis=1)[:, -2]
+            if np.min(best_score - second_score) < self.min_margin:
+                return None, 0.0
+
+        text = ''.join(self.labels[index] for index in best)
+        return text, float(best_score.min())
+
+
+def train_from_archive(archive_dir: str, output_path: str) -> TemplateCaptchaSolver:
+    """
+    用验证码样本归档中验证通过的样本训练模板并保存
+
+    :param archive_dir: CaptchaArchive目录
+    :param output_path: 模板输出路径（.npz）
+    :return: 识别器
+    """
+    import cv2
+    from crawler.captcha_archive import CaptchaArchive
+
+    def _samples():
+        for image_path, meta in CaptchaArchive(archive_dir).iter_samples():
+            if meta.get('verified') and meta.get('text'):
+                image = cv2.imread(str(image_path), cv2.IMREAD_COLOR)
+                if image is not None:
+                    yield image, meta['text']
+
+    solver = TemplateCaptchaSolver.train(_samples())
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    solver.save(output_path)
+    logger.info(f"模板已保存: {output_path}")
+    return solver
+
+
+if __name__ == "__main__":
+    # 用法: python -m crawler.captcha_templates <样本归档目录> <模板输出路径.npz>
+    if len(sys.argv) != 3:
+        print("用法: python -m crawler.captcha_templates <样本归档目录> <模板输出路径.npz>")
+        sys.exit(1)
+    train_from_archive(sys.argv[1], sys.argv[2])
@@ -8,33 +8,102 @@
 @Desc    : 爬虫核心引擎，集成Playwright和OCR验证码识别
 """
 
-import time
-import random
+import os
 from pathlib import Path
-from typing import Optional
-from playwright.sync_api import sync_playwright, Page, Browser, BrowserContext
+from typing import Dict, List, Optional
+from playwright.sync_api import sync_playwright, Page, Browser, BrowserContext, Route
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
 from loguru import logger
 from tenacity import retry, stop_after_attempt, wait_exponential
 
 from crawler.captcha_solver import CaptchaSolver
+from crawler.page_checks import CAPTCHA_TITLE_KEYWORD, CAPTCHA_INPUT_SELECTOR
+from crawler.rate_limiter import AdaptiveRateLimiter
+from crawler.resource_policy import ResourcePolicy
+from crawler.session_state import SessionStateStore
+
+
+# 浏览器启动参数（同步/异步引擎共用）
+BROWSER_ARGS = ['--disable-blink-features=AutomationControlled']
+
+# 浏览器上下文参数，模拟真实用户
+CONTEXT_OPTIONS = {
+    'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/140.0.0.0 Safari/537.36',
+    'viewport': {'width': 1920, 'height': 1080},
+    'locale': 'zh-CN',
+    'timezone_id': 'Asia/Shanghai'
+}
+
+# 判断页面图片是否全部加载完成（拦截策略可能挡住验证码图片）
+IMAGES_LOADED_JS = "() => Array.from(document.images).every(img => img.complete && img.naturalWidth > 0)"
+
+# 会话状态持久化配置（为空时禁用）
+CRAWLER_STORAGE_STATE = os.getenv('CRAWLER_STORAGE_STATE', '/tmp/bid_monitor_state/storage_state.json')
+CRAWLER_STORAGE_STATE_MAX_AGE_HOURS = float(os.getenv('CRAWLER_STORAGE_STATE_MAX_AGE_HOURS', '12'))
+
+
+def _descendant_rss_mb() -> Optional[float]:
+    """
+    统计当前进程所有子孙进程（Playwright驱动和浏览器进程）的常驻内存，仅支持Linux
+
+    :return: 内存占用(MB)，无法统计时返回None
+    """
+    proc = Path('/proc')
+    if not proc.exists():
+        return None
+
+    parents = {}
+    rss_pages = {}
+    for stat_file in proc.glob('[0-9]*/stat'):
+        try:
+            # 进程名可能包含空格和括号，从最后一个')'之后开始解析
+            fields = stat_file.read_text().rsplit(')', 1)[1].split()
+            pid = int(stat_file.parent.name)
+            parents[pid] = int(fields[1])
+            rss_pages[pid] = int(fields[21])
+        except (OSError, IndexError, ValueError):
+            continue
+
+    total_pages = 0
+    pending = [os.getpid()]
+    while pending:
+        parent = pending.pop()
+        for pid, ppid in parents.items():
+            if ppid == parent:
+                total_pages += rss_pages.get(pid, 0)
+                pending.append(pid)
+
+    return total_pages * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
 
 
 class CrawlerEngine:
     """爬虫引擎，负责浏览器控制和验证码处理"""
 
-    def __init__(self, headless: bool = True):
+    def __init__(self, headless: bool = True, max_pages_per_browser: int = 0, max_browser_memory_mb: int = 0,
+                 storage_state_path: Optional[str] = CRAWLER_STORAGE_STATE,
+                 resource_policy: Optional[ResourcePolicy] = None,
+                 rate_limiter: Optional[AdaptiveRateLimiter] = None):
         """
         初始化爬虫引擎
 
         :param headless: 是否使用无头模式
+        :param max_pages_per_browser: 常驻模式下浏览器抓取多少页面后重启，0表示不限制
+        :param max_browser_memory_mb: 常驻模式下浏览器内存超过该值(MB)后重启，0表示不限制
+        :param storage_state_path: 验证码通过后的会话状态文件路径，为空时不持久化
+        :param resource_policy: 请求拦截策略，默认从环境变量读取
+        :param rate_limiter: 按域名的自适应限速器，默认从环境变量读取
         """
         self.headless = headless
+        self.max_pages_per_browser = max_pages_per_browser
+        self.max_browser_memory_mb = max_browser_memory_mb
+        self.pages_served = 0
         self.playwright = None
         self.browser: Optional[Browser] = None
         self.context: Optional[BrowserContext] = None
         self.captcha_solver = CaptchaSolver()
-        self.temp_dir = Path("/tmp/bid_monitor_captcha")
-        self.temp_dir.mkdir(exist_ok=True)
+        self.session_store = SessionStateStore(storage_state_path, CRAWLER_STORAGE_STATE_MAX_AGE_HOURS)
+        self.resource_policy = resource_policy or ResourcePolicy.from_env()
+        self.rate_limiter = rate_limiter or AdaptiveRateLimiter.from_env()
 
     def start(self):
         """启动浏览器"""
@@ -42,16 +111,17 @@ class CrawlerEngine:
             self.playwright = sync_playwright().start()
             self.browser = self.playwright.chromium.launch(
                 headless=self.headless,
-                args=['--disable-blink-features=AutomationControlled']
+                args=BROWSER_ARGS
             )
 
-            # 创建浏览器上下文，模拟真实用户
+            # 创建浏览器上下文，模拟真实用户；加载上次通过验证码的会话状态
             self.context = self.browser.new_context(
-                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/140.0.0.0 Safari/537.36',
-                viewport={'width': 1920, 'height': 1080},
-                locale='zh-CN',
-                timezone_id='Asia/Shanghai'
+                **CONTEXT_OPTIONS,
+                storage_state=self.session_store.load()
             )
+            if self.resource_policy.enabled:
+                self.context.route('**/*', self._route_request)
+            self.pages_served = 0
 
             logger.info("浏览器启动成功")
         except Exception as e:
@@ -70,6 +140,54 @@ class CrawlerEngine:
             logger.info("浏览器已关闭")
         except Exception as e:
             logger.error(f"浏览器关闭异常: {e}")
+        finally:
+            self.context = None
+            self.browser = None
+            self.playwright = None
+
+    def is_alive(self) -> bool:
+        """
+        健康检查：浏览器连接正常且能新建页面
+
+        :return: True表示浏览器可用
+        """
+        if not self.browser or not self.context:
+            return False
+        try:
+            if not self.browser.is_connected():
+                return False
+            page = self.context.new_page()
+            page.close()
+            return True
+        except Exception as e:
+            logger.warning(f"浏览器健康检查失败: {e}")
+            return False
+
+    def ensure_started(self):
+        """
+        常驻模式入口：浏览器未启动时启动，已崩溃或超出页面/内存预算时重启，
+        否则直接复用当前浏览器
+        """
+        if self.browser is None:
+            self.start()
+            return
+
+        reason = None
+        if not self.is_alive():
+            reason = "浏览器不可用"
+        elif self.max_pages_per_browser and self.pages_served >= self.max_pages_per_browser:
+            reason = f"已抓取 {self.pages_served} 个页面，超出预算"
+        elif self.max_browser_memory_mb:
+            memory_mb = _descendant_rss_mb()
+            if memory_mb is not None and memory_mb >= self.max_browser_memory_mb:
+                reason = f"浏览器内存 {memory_mb:.0f}MB，超出预算"
+
+        if reason:
+            logger.warning(f"{reason}，重启浏览器")
+            self.stop()
+            self.start()
+        else:
+            logger.info(f"复用常驻浏览器，已抓取 {self.pages_served} 个页面")
 
     @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=2, min=2, max=10))
     def fetch_page(self, url: str) -> Optional[str]:
@@ -82,39 +200,119 @@ class CrawlerEngine:
         page = None
         try:
             page = self.context.new_page()
+            self.pages_served += 1
+
+            # 按域名限速，速率随验证码率/错误率自适应调整
+            self.rate_limiter.acquire(url)
             logger.info(f"正在访问: {url}")
 
             # 访问页面
             page.goto(url, wait_until='domcontentloaded', timeout=30000)
 
-            # 随机等待，模拟人类行为
-            time.sleep(random.uniform(1, 3))
+            captcha_seen = self._has_captcha(page)
+            if captcha_seen:
+                self.rate_limiter.record_captcha(url)
+
+            # 其他进程已刷新会话状态时直接复用，避免重复识别验证码
+            if captcha_seen and self.session_store.has_newer():
+                if self._apply_shared_session(self.context):
+                    self.rate_limiter.acquire(url)
+                    page.goto(url, wait_until='domcontentloaded', timeout=30000)
 
             # 检查是否有验证码
-            if self._has_captcha(page):
+            if captcha_seen and self._has_captcha(page):
+                self.session_store.invalidate()
                 logger.info("检测到验证码，开始识别...")
                 success = self._solve_captcha(page)
                 if not success:
                     logger.error("验证码识别失败")
                     return None
+                self.session_store.save(self.context.storage_state())
 
                 # 验证码通过后，等待页面加载
                 page.wait_for_load_state('domcontentloaded', timeout=10000)
-                time.sleep(random.uniform(1, 2))
 
             # 获取页面内容
             content = page.content()
+            if not captcha_seen:
+                self.rate_limiter.record_success(url)
             logger.info(f"页面获取成功: {url}")
             return content
 
         except Exception as e:
             logger.error(f"页面获取失败: {url}, 错误: {e}")
+            self.rate_limiter.record_error(url)
             raise  # 让retry装饰器处理重试
 
         finally:
             if page:
                 page.close()
 
+    def fetch_pages(self, urls: List[str]) -> Dict[str, Optional[str]]:
+        """
+        批量获取页面内容（逐个顺序抓取）
+
+        :param urls: 目标URL列表
+        :return: {URL: 页面HTML}，失败的URL对应None
+        """
+        results = {}
+        for url in urls:
+            try:
+                results[url] = self.fetch_page(url)
+            except Exception as e:
+                logger.error(f"页面多次重试后仍失败: {url}, 错误: {e}")
+                results[url] = None
+        return results
+
+    def export_cookies(self) -> List[Dict]:
+        """
+        导出当前浏览器上下文的Cookie，供HTTP快速通道复用
+
+        :return: Playwright格式的Cookie列表
+        """
+        if not self.context:
+            return []
+        return self.context.cookies()
+
+    def get_metrics(self) -> Dict:
+        """
+        获取本次任务的抓取指标
+
+        :return: 指标字典
+        """
+        return {
+            'resources': self.resource_policy.get_stats(),
+            'rate_limiter': self.rate_limiter.get_metrics()
+        }
+
+    def reset_metrics(self):
+        """清空抓取指标，每次任务开始时调用（限速器保留已学习到的速率）"""
+        self.resource_policy.reset_stats()
+        self.rate_limiter.reset_stats()
+
+    def _route_request(self, route: Route):
+        """按拦截策略放行或拦截请求"""
+        request = route.request
+        if self.resource_policy.should_block(request.resource_type, request.url):
+            self.resource_policy.record_blocked(request.resource_type)
+            route.abort()
+        else:
+            route.continue_()
+
+    def _apply_shared_session(self, context: BrowserContext) -> bool:
+        """
+        将磁盘上最新的会话状态Cookie注入浏览器上下文
+
+        :param context: 浏览器上下文
+        :return: True表示已注入
+        """
+        state = self.session_store.load()
+        if not state or not state.get('cookies'):
+            return False
+        context.add_cookies(state['cookies'])
+        logger.info("已复用共享会话状态")
+        return True
+
     def _has_captcha(self, page: Page) -> bool:
         """
         检测页面是否包含验证码
@@ -125,11 +323,11 @@ class CrawlerEngine:
         try:
             # 检查标题或特定元素
             title = page.title()
-            if "验证码" in title:
+            if CAPTCHA_TITLE_KEYWORD in title:
                 return True
 
             # 检查验证码输入框
-            captcha_input = page.locator('input[placeholder*="验证"]').count()
+            captcha_input = page.locator(CAPTCHA_INPUT_SELECTOR).count()
             if captcha_input > 0:
                 return True
 
@@ -147,6 +345,11 @@ class CrawlerEngine:
         :return: True表示验证成功
         """
         try:
+            # 验证码图片被拦截时，为当前页面放行全部请求并重新加载
+            if self.resource_policy.enabled and not page.evaluate(IMAGES_LOADED_JS):
+                page.route('**/*', lambda route: route.continue_())
+                page.reload(wait_until='load', timeout=30000)
+
             # 定位验证码图片
             captcha_img = page.locator('img').first
 
@@ -154,30 +357,32 @@ class CrawlerEngine:
                 logger.error("未找到验证码图片")
                 return False
 
-            # 截取验证码图片
-            img_path = self.temp_dir / f"captcha_{int(time.time())}.png"
-            captcha_img.screenshot(path=str(img_path))
-            logger.debug(f"验证码图片已保存: {img_path}")
+            # 截取验证码图片，字节直接交给OCR，不落盘
+            image = captcha_img.screenshot()
 
             # OCR识别
-            answer = self.captcha_solver.solve(str(img_path))
+            answer = self.captcha_solver.solve_image(image)
             if answer is None:
                 logger.error("验证码识别失败")
+                self.captcha_solver.report(image, None, False)
                 return False
 
             # 填写答案
             input_box = page.locator('input[type="text"]').first
             input_box.fill(str(answer))
 
-            # 点击验证按钮
+            # 点击验证按钮，等待提交后的页面跳转
             submit_btn = page.locator('input[type="submit"]').first
-            submit_btn.click()
-
-            # 等待验证结果
-            time.sleep(2)
+            try:
+                with page.expect_navigation(wait_until='domcontentloaded', timeout=10000):
+                    submit_btn.click()
+            except PlaywrightTimeoutError:
+                logger.debug("验证码提交后页面未跳转")
 
             # 检查是否验证成功（如果还在验证码页面则失败）
-            if self._has_captcha(page):
+            verified = not self._has_captcha(page)
+            self.captcha_solver.report(image, answer, verified)
+            if not verified:
                 logger.error("验证码提交后仍在验证页面，可能答案错误")
                 return False
 
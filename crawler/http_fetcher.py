@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+@Time    : 2026/10/18 13:10
+@Author  : Manus AI
+@File    : http_fetcher.py
+@Desc    : 分层抓取器：优先使用连接池HTTP客户端，遇到验证码或JS渲染页面时回退到浏览器
+"""
+
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+import requests
+from requests.adapters import HTTPAdapter
+from loguru import logger
+
+from crawler.engine import CrawlerEngine, CONTEXT_OPTIONS
+from crawler.page_checks import is_captcha_html, needs_javascript
+
+
+class TieredFetcher:
+    """
+    分层抓取器
+
+    第一层：requests连接池直接请求，复用浏览器上下文导出的Cookie；
+    第二层：响应是验证码页、需要JS渲染或请求失败时，交给CrawlerEngine处理。
+    接口与CrawlerEngine的fetch_page/fetch_pages一致，可直接替换使用。
+    """
+
+    def __init__(self, engine: CrawlerEngine, pool_size: int = 10, timeout: float = 15):
+        """
+        初始化分层抓取器
+
+        :param engine: 回退使用的浏览器引擎
+        :param pool_size: HTTP连接池大小，也是HTTP层的并发数
+        :param timeout: HTTP请求超时时间（秒）
+        """
+        self.engine = engine
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.tier_counts: Counter = Counter()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({
+            'User-Agent': CONTEXT_OPTIONS['user_agent'],
+            'Accept-Language': 'zh-CN,zh;q=0.9',
+        })
+
+    def fetch_page(self, url: str) -> Optional[str]:
+        """
+        获取页面内容，HTTP层失败时回退到浏览器
+
+        :param url: 目标URL
+        :return: 页面HTML内容，失败返回None
+        """
+        return self.fetch_pages([url])[url]
+
+    def fetch_pages(self, urls: List[str]) -> Dict[str, Optional[str]]:
+        """
+        批量获取页面内容：HTTP层并发请求，未命中的URL统一交给浏览器引擎
+
+        :param urls: 目标URL列表
+        :return: {URL: 页面HTML}，失败的URL对应None
+        """
+        self.sync_cookies()
+
+        with ThreadPoolExecutor(max_workers=self.pool_size) as executor:
+            results = dict(zip(urls, executor.map(self._fetch_http, urls)))
+
+        fallback_urls = [url for url, content in results.items() if content is None]
+        self.tier_counts['http'] += len(urls) - len(fallback_urls)
+
+        if fallback_urls:
+            logger.info(f"HTTP快速通道未命中 {len(fallback_urls)} 个页面，回退到浏览器")
+            browser_results = self.engine.fetch_pages(fallback_urls)
+            for url, content in browser_results.items():
+                results[url] = content
+                self.tier_counts['browser' if content else 'failed'] += 1
+
+            # 浏览器可能刚通过了验证码，刷新Cookie供后续HTTP请求使用
+            self.sync_cookies()
+
+        return results
+
+    def sync_cookies(self):
+        """将浏览器上下文的Cookie同步到HTTP会话"""
+        try:
+            for cookie in self.engine.export_cookies():
+                self.session.cookies.set(
+                    cookie['name'], cookie['value'],
+                    domain=cookie.get('domain'), path=cookie.get('path', '/')
+                )
+        except Exception as e:
+            logger.warning(f"Cookie同步失败: {e}")
+
+    def get_metrics(self) -> Dict:
+        """
+        获取抓取指标（含浏览器引擎指标和各层命中情况）
+
+        :return: 指标字典
+        """
+        total = sum(self.tier_counts.values())
+        metrics = self.engine.get_metrics()
+        metrics['tiers'] = {
+            'http': self.tier_counts['http'],
+            'browser': self.tier_counts['browser'],
+            'failed': self.tier_counts['failed'],
+            'http_hit_rate': round(self.tier_counts['http'] / total, 4) if total else 0.0
+        }
+        return metrics
+
+    def reset_metrics(self):
+        """清空抓取指标"""
+        self.engine.reset_metrics()
+        self.tier_counts.clear()
+
+    def _fetch_http(self, url: str) -> Optional[str]:
+        """
+        HTTP层抓取
+
+        未命中的URL都会交给浏览器重新抓取，由浏览器记录该URL的验证码/错误结果；
+        HTTP层只记录成功，避免同一个页面计两次验证码或错误，使限速器过度退避
+
+        :param url: 目标URL
+        :return: 可直接解析的页面HTML；需要回退到浏览器时返回None
+        """
+        limiter = self.engine.rate_limiter
+        try:
+            limiter.acquire(url)
+            response = self.session.get(url, timeout=self.timeout)
+            if response.status_code != 200:
+                logger.debug(f"HTTP层响应异常: {url}, HTTP {response.status_code}")
+                return None
+
+            # 未声明编码时requests默认ISO-8859-1，中文页面需按内容推断
+            if not response.encoding or response.encoding.lower() == 'iso-8859-1':
+                response.encoding = response.apparent_encoding
+
+            html = response.text
+            if is_captcha_html(html):
+                logger.debug(f"HTTP层遇到验证码: {url}")
+                return None
+            if needs_javascript(html):
+                logger.debug(f"HTTP层页面需要JS渲染: {url}")
+                return None
+
+            limiter.record_success(url)
+            logger.info(f"页面获取成功(HTTP): {url}")
+            return html
+
+        except requests.RequestException as e:
+            logger.debug(f"HTTP层请求失败: {url}, 错误: {e}")
+            return None
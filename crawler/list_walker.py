@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+@Time    : 2026/10/18 19:30
+@Author  : Manus AI
+@File    : list_walker.py
+@Desc    : 增量翻页抓取列表页：从第一页向后翻，遇到上次抓取的高水位即停止
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+from loguru import logger
+
+from app.core.seen_urls import normalize_url
+from crawler.parsers.base_parser import BaseParser
+
+
+@dataclass
+class ListWalkResult:
+    """翻页抓取结果"""
+    items: List[Dict] = field(default_factory=list)  # 高水位之前的新公告（去重，按列表顺序）
+    pages: int = 0  # 成功抓取的列表页数
+    reached_watermark: bool = False  # 是否到达高水位
+    exhausted: bool = False  # 是否已翻到最后一页
+    newest: Optional[Dict] = None  # 本次看到的最新公告，作为新的高水位
+    first_run: bool = False  # 是否没有高水位（首次抓取）
+
+    @property
+    def complete(self) -> bool:
+        """是否覆盖了高水位之后的全部公告（首次抓取只看第一页，视为完整）"""
+        return self.reached_watermark or self.exhausted or self.first_run
+
+
+def pick_watermark(walk: ListWalkResult, pending: Set[str]) -> Optional[Dict]:
+    """
+    选取新的高水位：比它更早的公告都已处理完（已入库、已抓取过、预评分跳过或失败次数达到上限）
+
+    候选公告超出单次抓取上限或抓取失败待重试时，高水位推进到最早一条未处理公告之后的那条，
+    下次任务只翻到这里，积压的公告分几次任务抓完，不会每次都从原高水位重新翻页。
+    翻页中途失败或达到最大页数时，未翻到的公告状态未知，保持原高水位
+
+    :param walk: 翻页抓取结果
+    :param pending: 未处理完的公告URL（超出抓取上限的，以及失败待重试的）
+    :return: 新高水位 {'url', 'publish_date'}（url为空时按日期停止），None表示保持原高水位
+    """
+    if not walk.complete or walk.newest is None:
+        return None
+
+    pending_indexes = [index for index, item in enumerate(walk.items) if item['url'] in pending]
+    if not pending_indexes:
+        return {'url': walk.newest['url'], 'publish_date': walk.newest.get('publish_date')}
+
+    oldest = pending_indexes[-1]
+    if oldest + 1 < len(walk.items):
+        item = walk.items[oldest + 1]
+        return {'url': item['url'], 'publish_date': item.get('publish_date')}
+
+    # 最早一条就未处理完：已有高水位时保持不变；首次抓取时按其发布日期记录高水位，
+    # 下次翻到整页早于该日期为止，这些公告被挤到第二页也不会遗漏
+    if walk.first_run and walk.items[oldest].get('publish_date'):
+        return {'url': None, 'publish_date': walk.items[oldest]['publish_date']}
+    return None
+
+
+class ListWalker:
+    """
+    列表页增量翻页抓取
+
+    停止条件（满足其一）：
+    1. 遇到高水位URL（上次抓取时的最新公告）
+    2. 整页带日期的公告都早于高水位日期（高水位公告被删除时兜底）
+    3. 没有下一页，或达到最大页数
+    没有高水位（首次抓取）时只抓取第一页，不回溯历史。
+    """
+
+    def __init__(self, fetcher, parser: BaseParser, max_pages: int = 20):
+        """
+        初始化
+
+        :param fetcher: 页面抓取器（提供fetch_page）
+        :param parser: 列表页解析器
+        :param max_pages: 单次最多翻页数
+        """
+        self.fetcher = fetcher
+        self.parser = parser
+        self.max_pages = max_pages
+
+    def walk(self, start_url: str, watermark_url: Optional[str] = None,
+             watermark_date: Optional[str] = None) -> ListWalkResult:
+        """
+        从第一页开始翻页，收集高水位之前的公告
+
+        :param start_url: 列表第一页URL
+        :param watermark_url: 高水位公告URL
+        :param watermark_date: 高水位公告发布日期（YYYY-MM-DD）
+        :return: 翻页抓取结果，第一页抓取失败时 pages 为0
+        """
+        result = ListWalkResult()
+        watermark_key = normalize_url(watermark_url) if watermark_url else None
+        result.first_run = not (watermark_url or watermark_date)
+        max_pages = 1 if result.first_run else self.max_pages
+        seen_urls = set()
+        url = start_url
+
+        while url and result.pages < max_pages:
+            content = self.fetcher.fetch_page(url)
+            if not content:
+                logger.warning(f"列表页获取失败: {url}")
+                break
+            result.pages += 1
+
+            page_items = self.parser.get_list_items(content)
+            if result.pages == 1:
+                result.newest = self._pick_newest(page_items)
+
+            dates = [item['publish_date'] for item in page_items if item.get('publish_date')]
+            if watermark_date and dates and all(date < watermark_date for date in dates):
+                logger.info(f"第 {result.pages} 页公告均早于高水位日期 {watermark_date}，停止翻页")
+                result.reached_watermark = True
+                break
+
+            for item in page_items:
+                if watermark_key and normalize_url(item['url']) == watermark_key:
+                    result.reached_watermark = True
+                    break
+                # 翻页期间有新公告发布时，上一页的公告会被挤到下一页
+                if item['url'] not in seen_urls:
+                    seen_urls.add(item['url'])
+                    result.items.append(item)
+            if result.reached_watermark:
+                break
+
+            url = self.parser.get_next_page_url(content, url)
+            if not url:
+                result.exhausted = True
+
+        if result.pages and not result.complete:
+            logger.warning(f"翻页 {result.pages} 页仍未到达高水位，更早的公告可能遗漏，可调大最大翻页数")
+        logger.info(f"列表页翻页 {result.pages} 页，新公告 {len(result.items)} 条")
+        return result
+
+    @staticmethod
+    def _pick_newest(page_items: List[Dict]) -> Optional[Dict]:
+        """
+        选取第一页中发布日期最新的公告（同日取靠前的），避免把置顶的旧公告当作高水位
+
+        :param page_items: 第一页公告
+        :return: 最新公告，页面为空时返回None
+        """
+        if not page_items:
+            return None
+        dated = [item for item in page_items if item.get('publish_date')]
+        if not dated:
+            return page_items[0]
+        latest = max(item['publish_date'] for item in dated)
+        return next(item for item in dated if item['publish_date'] == latest)
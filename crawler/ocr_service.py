@@ -0,0 +1,280 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+@Time    : 2026/10/18 16:00
+@Author  : Manus AI
+@File    : ocr_service.py
+@Desc    : OCR工作进程池服务：每个工作进程只加载一次PaddleOCR，通过Unix Socket供所有爬虫进程共享
+"""
+
+import json
+import os
+import socket
+import socketserver
+import struct
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Optional
+import cv2
+import numpy as np
+from loguru import logger
+
+# OCR服务配置
+OCR_SERVICE_SOCKET = os.getenv('OCR_SERVICE_SOCKET', '')
+OCR_SERVICE_WORKERS = int(os.getenv('OCR_SERVICE_WORKERS', '2'))
+OCR_SERVICE_TIMEOUT = float(os.getenv('OCR_SERVICE_TIMEOUT', '10'))
+DEFAULT_SOCKET_PATH = '/tmp/bid_monitor_ocr.sock'
+
+# 消息格式：4字节大端长度 + 内容
+_HEADER = struct.Struct('>I')
+MAX_MESSAGE_SIZE = 10 * 1024 * 1024
+
+
+def create_paddle_ocr():
+    """创建PaddleOCR实例（算术验证码识别参数）"""
+    from paddleocr import PaddleOCR
+
+    return PaddleOCR(
+        use_angle_cls=True,
+        lang='ch',
+        use_gpu=False,
+        show_log=False
+    )
+
+
+def run_ocr(ocr, image) -> Optional[str]:
+    """
+    执行OCR并拼接识别出的文本
+
+    :param ocr: PaddleOCR实例
+    :param image: 图片路径或ndarray
+    :return: 识别文本，未识别到文字时返回None
+    """
+    result = ocr.ocr(image, cls=True)
+    if not result or not result[0]:
+        return None
+    return " ".join([line[1][0] for line in result[0]])
+
+
+def decode_image(image: bytes) -> Optional[np.ndarray]:
+    """将PNG/JPEG字节解码为BGR格式ndarray，失败返回None"""
+    return cv2.imdecode(np.frombuffer(image, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+
+# ----------------------------------------------------------------------
+# 工作进程
+# ----------------------------------------------------------------------
+
+_worker_ocr = None
+
+
+def _init_worker():
+    """工作进程初始化：加载一次PaddleOCR"""
+    global _worker_ocr
+    _worker_ocr = create_paddle_ocr()
+    logger.info(f"OCR工作进程就绪: pid={os.getpid()}")
+
+
+def _recognize_in_worker(image: bytes) -> Optional[str]:
+    """在工作进程中识别图片字节"""
+    array = decode_image(image)
+    if array is None:
+        raise ValueError("图片解码失败")
+    return run_ocr(_worker_ocr, array)
+
+
+class OcrWorkerPool:
+    """
+    OCR工作进程池
+
+    识别超时或工作进程异常退出时重建进程池：超时的任务无法取消，会一直占用工作进程；
+    工作进程崩溃后进程池不可再用。重建时终止旧的工作进程，新进程重新加载PaddleOCR
+    """
+
+    def __init__(self, workers: int = OCR_SERVICE_WORKERS, timeout: float = OCR_SERVICE_TIMEOUT,
+                 initializer: Callable = _init_worker, task: Callable = _recognize_in_worker):
+        """
+        初始化进程池，每个工作进程启动时加载PaddleOCR
+
+        :param workers: 工作进程数
+        :param timeout: 单张图片识别超时时间（秒）
+        :param initializer: 工作进程初始化函数
+        :param task: 在工作进程中执行的识别函数
+        """
+        self.workers = workers
+        self.timeout = timeout
+        self.initializer = initializer
+        self.task = task
+        self.restarts = 0
+        self._lock = threading.Lock()
+        self.executor = self._create_executor()
+        logger.info(f"OCR进程池已创建，工作进程数: {workers}")
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        """创建进程池"""
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=self.initializer)
+
+    @staticmethod
+    def _terminate(executor: ProcessPoolExecutor):
+        """关闭进程池并终止仍在运行的工作进程（含卡住的识别任务）"""
+        processes = list((getattr(executor, '_processes', None) or {}).values())
+        executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+    def _restart(self, executor: ProcessPoolExecutor, reason: str):
+        """
+        重建进程池（多个请求同时发现同一进程池异常时只重建一次）
+
+        :param executor: 发现异常的进程池
+        :param reason: 重建原因
+        """
+        with self._lock:
+            if self.executor is not executor:
+                return
+            logger.warning(f"OCR进程池重建: {reason}")
+            self._terminate(executor)
+            self.executor = self._create_executor()
+            self.restarts += 1
+
+    def recognize(self, image: bytes) -> Optional[str]:
+        """
+        识别图片文本
+
+        :param image: 图片字节
+        :return: 识别文本
+        :raises TimeoutError: 超时未完成
+        :raises BrokenProcessPool: 重建进程池后仍然失败
+        """
+        for attempt in range(2):
+            executor = self.executor
+            try:
+                future = executor.submit(self.task, image)
+                return future.result(timeout=self.timeout)
+            except FutureTimeoutError:
+                self._restart(executor, f"识别超时({self.timeout}s)")
+                raise TimeoutError(f"OCR识别超时({self.timeout}s)")
+            except RuntimeError as e:
+                # 工作进程异常退出，或进程池已被其他请求重建（提交到已关闭的进程池）
+                if not isinstance(e, BrokenProcessPool) and self.executor is executor:
+                    raise
+                self._restart(executor, f"工作进程异常: {e}")
+                if attempt:
+                    raise
+
+    def shutdown(self):
+        """关闭进程池"""
+        with self._lock:
+            self._terminate(self.executor)
+
+
+# ----------------------------------------------------------------------
+# Unix Socket服务端/客户端
+# ----------------------------------------------------------------------
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    """从套接字读取指定长度的数据"""
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 65536))
+        if not chunk:
+            raise ConnectionError("连接已关闭")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+def _send_message(sock: socket.socket, payload: bytes):
+    """发送一条带长度前缀的消息"""
+    sock.sendall(_HEADER.pack(len(payload)) + payload)
+
+
+def _recv_message(sock: socket.socket) -> bytes:
+    """接收一条带长度前缀的消息"""
+    (size,) = _HEADER.unpack(_recv_exact(sock, _HEADER.size))
+    if size > MAX_MESSAGE_SIZE:
+        raise ValueError(f"消息过大: {size} 字节")
+    return _recv_exact(sock, size)
+
+
+class _OcrRequestHandler(socketserver.BaseRequestHandler):
+    """处理单个连接：可连续收发多张图片"""
+
+    def handle(self):
+        while True:
+            try:
+                image = _recv_message(self.request)
+            except (ConnectionError, OSError, ValueError):
+                return
+
+            try:
+                response = {'text': self.server.pool.recognize(image)}
+            except Exception as e:
+                logger.warning(f"OCR识别失败: {e}")
+                response = {'text': None, 'error': str(e)}
+
+            _send_message(self.request, json.dumps(response, ensure_ascii=False).encode('utf-8'))
+
+
+class OcrService(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """基于Unix Socket的OCR服务，请求交给工作进程池处理"""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET_PATH, workers: int = OCR_SERVICE_WORKERS,
+                 timeout: float = OCR_SERVICE_TIMEOUT):
+        """
+        初始化OCR服务
+
+        :param socket_path: Unix Socket路径
+        :param workers: 工作进程数
+        :param timeout: 单张图片识别超时时间（秒）
+        """
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        self.pool = OcrWorkerPool(workers=workers, timeout=timeout)
+        super().__init__(socket_path, _OcrRequestHandler)
+        logger.info(f"OCR服务监听: {socket_path}")
+
+    def server_close(self):
+        """关闭服务和进程池"""
+        super().server_close()
+        self.pool.shutdown()
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+
+
+class OcrClient:
+    """OCR服务客户端"""
+
+    def __init__(self, socket_path: str, timeout: float = OCR_SERVICE_TIMEOUT):
+        """
+        初始化客户端
+
+        :param socket_path: OCR服务的Unix Socket路径
+        :param timeout: 请求超时时间（秒），应略大于服务端识别超时
+        """
+        self.socket_path = socket_path
+        self.timeout = timeout + 1
+
+    def recognize(self, image: bytes) -> Optional[str]:
+        """
+        请求OCR服务识别图片
+
+        :param image: 图片字节
+        :return: 识别文本，未识别到文字时返回None
+        :raises OSError: 服务不可用或超时
+        :raises RuntimeError: 服务端识别失败
+        """
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            _send_message(sock, image)
+            response = json.loads(_recv_message(sock).decode('utf-8'))
+
+        if response.get('error'):
+            raise RuntimeError(response['error'])
+        return response.get('text')
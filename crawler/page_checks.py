@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+@Time    : 2026/10/18 13:00
+@Author  : Manus AI
+@File    : page_checks.py
+@Desc    : 页面特征检测（验证码页、需要JS渲染的页面），浏览器引擎和HTTP抓取共用
+"""
+
+from selectolax.parser import HTMLParser
+
+
+# 验证码页面特征
+CAPTCHA_TITLE_KEYWORD = "验证码"
+CAPTCHA_INPUT_SELECTOR = 'input[placeholder*="验证"]'
+
+# 正文文本少于该长度且包含脚本时，认为页面依赖JS渲染
+MIN_STATIC_TEXT_LENGTH = 200
+
+
+def is_captcha_html(html: str) -> bool:
+    """
+    根据HTML判断是否为验证码页面，与CrawlerEngine._has_captcha的判断规则一致
+
+    :param html: 页面HTML
+    :return: True表示验证码页面
+    """
+    tree = HTMLParser(html)
+
+    title_node = tree.css_first('title')
+    if title_node and CAPTCHA_TITLE_KEYWORD in title_node.text():
+        return True
+
+    return tree.css_first(CAPTCHA_INPUT_SELECTOR) is not None
+
+
+def needs_javascript(html: str) -> bool:
+    """
+    判断页面是否需要浏览器执行JS才能得到正文（服务端只返回了脚本外壳）
+
+    :param html: 页面HTML
+    :return: True表示需要浏览器渲染
+    """
+    tree = HTMLParser(html)
+    has_script = tree.css_first('script') is not None
+
+    for node in tree.css('script, style, noscript'):
+        node.decompose()
+
+    body = tree.body
+    text = body.text(strip=True) if body else ''
+    return has_script and len(text) < MIN_STATIC_TEXT_LENGTH
@@ -9,7 +9,7 @@
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 class BaseParser(ABC):
     """所有网站解析器的抽象基类，定义了标准接口。"""
@@ -24,6 +24,29 @@ class BaseParser(ABC):
         """
         pass
 
+    def get_list_items(self, page_content: str) -> List[Dict[str, Any]]:
+        """
+        从列表页的HTML内容中解析出详情页记录（URL及列表页上可见的标题等信息）。
+
+        默认实现只包含URL，子类可覆盖以提供标题，供抓取详情页前按标题预评分。
+
+        :param page_content: 列表页的HTML字符串。
+        :return: 记录列表，每个元素至少包含 'url' 和 'title'（可为None）。
+        """
+        return [{'url': url, 'title': None} for url in self.get_list_urls(page_content)]
+
+    def get_next_page_url(self, page_content: str, current_url: str) -> Optional[str]:
+        """
+        从列表页的HTML内容中解析出下一页的URL。
+
+        默认实现不支持翻页，子类可覆盖以支持增量翻页抓取。
+
+        :param page_content: 列表页的HTML字符串。
+        :param current_url: 当前列表页URL，用于解析相对链接。
+        :return: 下一页URL，没有下一页时返回None。
+        """
+        return None
+
     @abstractmethod
     def parse_detail_page(self, page_content: str) -> Dict[str, Any]:
         """
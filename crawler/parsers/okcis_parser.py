@@ -10,7 +10,8 @@
 
 import re
 import hashlib
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from urllib.parse import urljoin
 from selectolax.parser import HTMLParser
 from loguru import logger
 
@@ -22,6 +23,9 @@ class OkcisParser(BaseParser):
 
     BASE_URL = "https://www.okcis.cn"
 
+    # 列表页翻页链接文字
+    NEXT_PAGE_TEXTS = ('下一页', '下页', '>', '»')
+
     def get_list_urls(self, page_content: str) -> List[str]:
         """
         从列表页解析所有详情页URL
@@ -29,7 +33,16 @@ class OkcisParser(BaseParser):
         :param page_content: 列表页HTML
         :return: 详情页URL列表
         """
-        urls = []
+        return [item['url'] for item in self.get_list_items(page_content)]
+
+    def get_list_items(self, page_content: str) -> List[Dict[str, Any]]:
+        """
+        从列表页解析详情页记录
+
+        :param page_content: 列表页HTML
+        :return: 记录列表，每个元素包含 url、title（hint属性中的公告标题）、publish_date（可能为None）
+        """
+        items = []
         try:
             tree = HTMLParser(page_content)
 
@@ -41,16 +54,66 @@ class OkcisParser(BaseParser):
                 href = link.attributes.get('href')
                 if href and href.startswith('/'):
                     full_url = self.BASE_URL + href
-                    urls.append(full_url)
                 elif href and href.startswith('http'):
-                    urls.append(href)
+                    full_url = href
+                else:
+                    continue
+
+                title = (link.attributes.get('hint') or '').strip() or link.text(strip=True) or None
+                items.append({
+                    'url': full_url,
+                    'title': title,
+                    'publish_date': self._extract_list_date(link, href)
+                })
 
-            logger.info(f"从列表页解析到 {len(urls)} 个URL")
+            logger.info(f"从列表页解析到 {len(items)} 个URL")
 
         except Exception as e:
             logger.error(f"列表页URL解析失败: {e}")
 
-        return urls
+        return items
+
+    def get_next_page_url(self, page_content: str, current_url: str) -> Optional[str]:
+        """
+        解析列表页的"下一页"链接
+
+        :param page_content: 列表页HTML
+        :param current_url: 当前列表页URL
+        :return: 下一页URL，没有下一页时返回None
+        """
+        try:
+            tree = HTMLParser(page_content)
+            for link in tree.css('a[href]'):
+                href = (link.attributes.get('href') or '').strip()
+                if not href or href.startswith(('javascript:', '#')):
+                    continue
+                if link.attributes.get('rel') == 'next' or link.text(strip=True) in self.NEXT_PAGE_TEXTS:
+                    next_url = urljoin(current_url, href)
+                    return next_url if next_url != current_url else None
+        except Exception as e:
+            logger.error(f"下一页链接解析失败: {e}")
+        return None
+
+    def _extract_list_date(self, link, href: str) -> Optional[str]:
+        """
+        提取列表项的发布日期：优先取所在行文本中的日期，其次取URL中的日期（如 /20260131-n1.html）
+
+        :param link: 链接节点
+        :param href: 链接地址
+        :return: 日期（YYYY-MM-DD），未找到时返回None
+        """
+        # 只有父节点是单条公告所在的行时才取其文本，避免取到其他公告的日期
+        row = link.parent
+        if row is not None and len(row.css('a[hint]')) == 1:
+            date_match = re.search(r'(\d{4})[-/年](\d{1,2})[-/月](\d{1,2})', row.text(strip=True))
+            if date_match:
+                year, month, day = date_match.groups()
+                return f"{year}-{int(month):02d}-{int(day):02d}"
+
+        date_match = re.search(r'(20\d{2})(\d{2})(\d{2})', href)
+        if date_match:
+            return '-'.join(date_match.groups())
+        return None
 
     def parse_detail_page(self, page_content: str) -> Dict[str, Any]:
         """
@@ -0,0 +1,210 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+@Time    : 2026/10/18 14:00
+@Author  : Manus AI
+@File    : rate_limiter.py
+@Desc    : 按域名的自适应限速器（令牌桶 + AIMD），替代固定的随机等待
+"""
+
+import asyncio
+import os
+import random
+import threading
+import time
+from collections import Counter, deque
+from typing import Callable, Dict
+from urllib.parse import urlsplit
+from loguru import logger
+
+
+class _HostState:
+    """单个域名的限速状态"""
+
+    def __init__(self, rate: float, burst: float, now: float, window: int):
+        self.rate = rate
+        self.tokens = burst
+        self.updated_at = now
+        self.last_decrease = float('-inf')
+        self.outcomes = deque(maxlen=window)
+        self.counts: Counter = Counter()
+
+
+class AdaptiveRateLimiter:
+    """
+    自适应限速器
+
+    每个域名一个令牌桶，速率按AIMD调整：
+    最近窗口内验证码率和错误率都低于阈值时，每次成功加性提升速率；
+    出现验证码或错误且比例超过阈值时，乘性降低速率（带冷却时间，避免并发失败时连续腰斩）。
+    """
+
+    def __init__(self, initial_rate: float = 0.5, min_rate: float = 0.05, max_rate: float = 5.0,
+                 increase: float = 0.05, decrease_factor: float = 0.5, burst: float = 2.0,
+                 window: int = 20, captcha_threshold: float = 0.1, error_threshold: float = 0.2,
+                 decrease_cooldown: float = 5.0, jitter: float = 0.2,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        初始化限速器
+
+        :param initial_rate: 初始速率（请求/秒）
+        :param min_rate: 最低速率
+        :param max_rate: 最高速率
+        :param increase: 每次成功的加性提升量
+        :param decrease_factor: 退避时的乘性系数
+        :param burst: 令牌桶容量
+        :param window: 统计验证码率/错误率的最近请求数
+        :param captcha_threshold: 验证码率阈值
+        :param error_threshold: 错误率阈值
+        :param decrease_cooldown: 两次降速之间的最短间隔（秒）
+        :param jitter: 等待时间的随机抖动比例，模拟人类行为
+        :param clock: 时钟函数，便于测试
+        """
+        self.initial_rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.burst = burst
+        self.window = window
+        self.captcha_threshold = captcha_threshold
+        self.error_threshold = error_threshold
+        self.decrease_cooldown = decrease_cooldown
+        self.jitter = jitter
+        self.clock = clock
+        self._hosts: Dict[str, _HostState] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> 'AdaptiveRateLimiter':
+        """从环境变量读取限速配置"""
+        return cls(
+            initial_rate=float(os.getenv('CRAWLER_RATE_INITIAL', '0.5')),
+            min_rate=float(os.getenv('CRAWLER_RATE_MIN', '0.05')),
+            max_rate=float(os.getenv('CRAWLER_RATE_MAX', '5.0'))
+        )
+
+    def reserve(self, url: str) -> float:
+        """
+        预约一个请求名额
+
+        :param url: 请求URL
+        :return: 发出请求前需要等待的秒数
+        """
+        with self._lock:
+            state = self._get_state(url)
+            now = self.clock()
+            state.tokens = min(self.burst, state.tokens + (now - state.updated_at) * state.rate)
+            state.updated_at = now
+
+            # 令牌不足时预支，等待时间为补足令牌所需时间
+            state.tokens -= 1
+            if state.tokens >= 0:
+                return 0.0
+            wait = -state.tokens / state.rate
+
+        return wait * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def acquire(self, url: str):
+        """
+        阻塞直到允许请求
+
+        :param url: 请求URL
+        """
+        wait = self.reserve(url)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, url: str):
+        """
+        异步等待直到允许请求
+
+        :param url: 请求URL
+        """
+        wait = self.reserve(url)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def record_success(self, url: str):
+        """记录一次正常响应"""
+        self._record(url, 'success')
+
+    def record_captcha(self, url: str):
+        """记录一次验证码拦截"""
+        self._record(url, 'captcha')
+
+    def record_error(self, url: str):
+        """记录一次请求失败"""
+        self._record(url, 'error')
+
+    def get_metrics(self) -> Dict[str, Dict]:
+        """
+        获取各域名当前速率和退避状态
+
+        :return: {域名: {'rate', 'backoff', 'captcha_rate', 'error_rate', 'success', 'captcha', 'error'}}
+        """
+        with self._lock:
+            metrics = {}
+            for host, state in self._hosts.items():
+                captcha_rate, error_rate = self._rates(state)
+                metrics[host] = {
+                    'rate': round(state.rate, 3),
+                    'backoff': captcha_rate > self.captcha_threshold or error_rate > self.error_threshold,
+                    'captcha_rate': round(captcha_rate, 3),
+                    'error_rate': round(error_rate, 3),
+                    'success': state.counts['success'],
+                    'captcha': state.counts['captcha'],
+                    'error': state.counts['error'],
+                }
+            return metrics
+
+    def reset_stats(self):
+        """清空各域名的计数（保留已学习到的速率）"""
+        with self._lock:
+            for state in self._hosts.values():
+                state.counts.clear()
+
+    def _record(self, url: str, outcome: str):
+        """记录请求结果并按AIMD调整速率"""
+        with self._lock:
+            state = self._get_state(url)
+            state.outcomes.append(outcome)
+            state.counts[outcome] += 1
+            captcha_rate, error_rate = self._rates(state)
+            healthy = captcha_rate <= self.captcha_threshold and error_rate <= self.error_threshold
+
+            if outcome == 'success':
+                if healthy:
+                    state.rate = min(self.max_rate, state.rate + self.increase)
+                return
+
+            now = self.clock()
+            if not healthy and now - state.last_decrease >= self.decrease_cooldown:
+                state.rate = max(self.min_rate, state.rate * self.decrease_factor)
+                state.last_decrease = now
+                logger.warning(
+                    f"限速退避: {self._host(url)} 验证码率 {captcha_rate:.0%}，错误率 {error_rate:.0%}，"
+                    f"速率降至 {state.rate:.2f} 次/秒"
+                )
+
+    def _rates(self, state: _HostState):
+        """最近窗口内的验证码率和错误率"""
+        total = len(state.outcomes)
+        if not total:
+            return 0.0, 0.0
+        return state.outcomes.count('captcha') / total, state.outcomes.count('error') / total
+
+    def _get_state(self, url: str) -> _HostState:
+        """获取（必要时创建）域名状态，调用方需持有锁"""
+        host = self._host(url)
+        state = self._hosts.get(host)
+        if state is None:
+            state = _HostState(self.initial_rate, self.burst, self.clock(), self.window)
+            self._hosts[host] = state
+        return state
+
+    @staticmethod
+    def _host(url: str) -> str:
+        """提取URL中的域名"""
+        return (urlsplit(url).hostname or url).lower()
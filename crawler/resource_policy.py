@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+@Time    : 2026/10/18 12:00
+@Author  : Manus AI
+@File    : resource_policy.py
+@Desc    : 请求拦截策略，按资源类型和域名屏蔽图片、字体、样式表和统计脚本
+"""
+
+import os
+from collections import Counter
+from typing import Dict, Iterable, Optional
+from urllib.parse import urlsplit
+
+
+# 默认屏蔽的资源类型（Playwright request.resource_type）
+DEFAULT_BLOCKED_TYPES = 'image,font,stylesheet,media'
+
+# 默认屏蔽的统计/广告域名
+DEFAULT_BLOCKED_DOMAINS = 'hm.baidu.com,cnzz.com,51.la,google-analytics.com,googletagmanager.com,doubleclick.net'
+
+# 被拦截资源的典型大小（字节），用于估算节省的流量
+ESTIMATED_RESOURCE_BYTES = {
+    'image': 30 * 1024,
+    'font': 60 * 1024,
+    'stylesheet': 20 * 1024,
+    'script': 40 * 1024,
+    'media': 500 * 1024,
+}
+ESTIMATED_OTHER_BYTES = 5 * 1024
+
+
+def _split(value: Optional[str]) -> set:
+    """解析逗号分隔的配置项"""
+    return {item.strip().lower() for item in (value or '').split(',') if item.strip()}
+
+
+def _match_domain(host: str, domains: Iterable[str]) -> bool:
+    """host是否等于某个域名或是其子域名"""
+    return any(host == domain or host.endswith('.' + domain) for domain in domains)
+
+
+class ResourcePolicy:
+    """请求拦截策略"""
+
+    def __init__(self, blocked_types: Optional[Iterable[str]] = None,
+                 blocked_domains: Optional[Iterable[str]] = None,
+                 allowed_domains: Optional[Iterable[str]] = None):
+        """
+        初始化拦截策略
+
+        :param blocked_types: 屏蔽的资源类型，如 image、font、stylesheet
+        :param blocked_domains: 屏蔽的域名（含子域名），无论资源类型
+        :param allowed_domains: 放行的域名（含子域名），优先级最高
+        """
+        self.blocked_types = set(blocked_types or [])
+        self.blocked_domains = set(blocked_domains or [])
+        self.allowed_domains = set(allowed_domains or [])
+        self.blocked_counts: Counter = Counter()
+
+    @classmethod
+    def from_env(cls) -> 'ResourcePolicy':
+        """从环境变量读取拦截策略"""
+        return cls(
+            blocked_types=_split(os.getenv('CRAWLER_BLOCK_RESOURCE_TYPES', DEFAULT_BLOCKED_TYPES)),
+            blocked_domains=_split(os.getenv('CRAWLER_BLOCK_DOMAINS', DEFAULT_BLOCKED_DOMAINS)),
+            allowed_domains=_split(os.getenv('CRAWLER_ALLOW_DOMAINS', ''))
+        )
+
+    @property
+    def enabled(self) -> bool:
+        """是否有需要拦截的规则"""
+        return bool(self.blocked_types or self.blocked_domains)
+
+    def should_block(self, resource_type: str, url: str) -> bool:
+        """
+        判断请求是否应被拦截
+
+        :param resource_type: 资源类型
+        :param url: 请求URL
+        :return: True表示拦截
+        """
+        # 页面本身（document）永远放行
+        if resource_type == 'document':
+            return False
+
+        host = (urlsplit(url).hostname or '').lower()
+        if _match_domain(host, self.allowed_domains):
+            return False
+        if _match_domain(host, self.blocked_domains):
+            return True
+        return resource_type in self.blocked_types
+
+    def record_blocked(self, resource_type: str):
+        """记录一次拦截"""
+        self.blocked_counts[resource_type] += 1
+
+    def get_stats(self) -> Dict:
+        """
+        获取拦截统计
+
+        :return: {'blocked_requests': 拦截数, 'bytes_saved': 估算节省字节数, 'by_type': 各类型拦截数}
+        """
+        bytes_saved = sum(
+            count * ESTIMATED_RESOURCE_BYTES.get(resource_type, ESTIMATED_OTHER_BYTES)
+            for resource_type, count in self.blocked_counts.items()
+        )
+        return {
+            'blocked_requests': sum(self.blocked_counts.values()),
+            'bytes_saved': bytes_saved,
+            'by_type': dict(self.blocked_counts)
+        }
+
+    def reset_stats(self):
+        """清空拦截统计"""
+        self.blocked_counts.clear()
@@ -8,35 +8,105 @@
 @Desc    : 定时任务调度器
 """
 
+import os
 import uuid
+from concurrent import futures
 from datetime import datetime
+from typing import Dict, List, Tuple
+from apscheduler.executors.pool import ThreadPoolExecutor
 from apscheduler.schedulers.blocking import BlockingScheduler
 from apscheduler.triggers.cron import CronTrigger
 from loguru import logger
 
 from crawler.engine import CrawlerEngine
+from crawler.async_engine import AsyncCrawlerEngine
+from crawler.http_fetcher import TieredFetcher
+from crawler.list_walker import ListWalker, pick_watermark
 from crawler.parsers.okcis_parser import OkcisParser
 from app.core.database import SessionLocal, init_database
-from app.crud.bid_project_crud import create_bid_project, get_all_keywords, update_match_score
-from app.core.matcher import KeywordMatcher
+from app.crud.bid_project_crud import bulk_save_keyword_hits, bulk_upsert_bid_projects
+from app.crud.crawl_watermark_crud import get_watermark, update_watermark
+from app.crud.keyword_profile_crud import DEFAULT_PROFILE_ID
+from app.core.matcher import MultiProfileMatcher
+from app.core.matcher_cache import MatcherCache
 from app.core.notifier import Notifier
+from app.core.seen_urls import SeenUrlIndex
 from app.models.bid_project import CrawlLog
 
+# 并发抓取配置（可通过环境变量覆盖）
+CRAWLER_CONCURRENCY = int(os.getenv('CRAWLER_CONCURRENCY', '1'))
+CRAWLER_CONTEXTS = int(os.getenv('CRAWLER_CONTEXTS', '1'))
+CRAWLER_MAX_DETAIL_PAGES = int(os.getenv('CRAWLER_MAX_DETAIL_PAGES', '10'))
+# 列表页单次最多翻页数（遇到上次抓取的最新公告即停止）
+CRAWLER_MAX_LIST_PAGES = int(os.getenv('CRAWLER_MAX_LIST_PAGES', '20'))
+
+# 常驻浏览器配置：任务间保持浏览器存活，超出页面数/内存预算时重启
+CRAWLER_PERSISTENT_BROWSER = os.getenv('CRAWLER_PERSISTENT_BROWSER', 'false').lower() == 'true'
+CRAWLER_BROWSER_MAX_PAGES = int(os.getenv('CRAWLER_BROWSER_MAX_PAGES', '1000'))
+CRAWLER_BROWSER_MAX_MEMORY_MB = int(os.getenv('CRAWLER_BROWSER_MAX_MEMORY_MB', '2048'))
+
+# HTTP快速通道：先用HTTP客户端抓取，遇到验证码/JS页面再回退到浏览器
+CRAWLER_HTTP_FAST_PATH = os.getenv('CRAWLER_HTTP_FAST_PATH', 'true').lower() == 'true'
+
+# 标题预评分阈值：列表页标题的关键词得分低于该值的公告不抓取详情页（0表示全部抓取，仅按预评分排序）
+CRAWLER_PRE_SCORE_THRESHOLD = float(os.getenv('CRAWLER_PRE_SCORE_THRESHOLD', '0'))
+
+# 跳过已抓取过的详情页URL（seen_urls表）
+CRAWLER_SKIP_SEEN_URLS = os.getenv('CRAWLER_SKIP_SEEN_URLS', 'true').lower() == 'true'
+# 详情页连续抓取或解析失败多少次后放弃（不再重试，也不再阻止高水位推进）
+CRAWLER_MAX_URL_FAILURES = int(os.getenv('CRAWLER_MAX_URL_FAILURES', '3'))
+
 
 class BidMonitorScheduler:
     """招投标监控调度器"""
 
-    def __init__(self, headless: bool = True):
+    def __init__(self, headless: bool = True, concurrency: int = CRAWLER_CONCURRENCY,
+                 contexts: int = CRAWLER_CONTEXTS, max_detail_pages: int = CRAWLER_MAX_DETAIL_PAGES,
+                 persistent_browser: bool = CRAWLER_PERSISTENT_BROWSER,
+                 http_fast_path: bool = CRAWLER_HTTP_FAST_PATH,
+                 pre_score_threshold: float = CRAWLER_PRE_SCORE_THRESHOLD,
+                 skip_seen_urls: bool = CRAWLER_SKIP_SEEN_URLS,
+                 max_list_pages: int = CRAWLER_MAX_LIST_PAGES):
         """
         初始化调度器
 
         :param headless: 是否使用无头浏览器
+        :param concurrency: 详情页并发抓取数，大于1时使用异步引擎
+        :param contexts: 异步引擎的浏览器上下文数量
+        :param max_detail_pages: 每次任务最多处理的详情页数量
+        :param persistent_browser: 是否在任务间保持浏览器常驻
+        :param http_fast_path: 是否优先使用HTTP快速通道抓取页面
+        :param pre_score_threshold: 列表页标题预评分阈值，低于该值的公告不抓取详情页
+        :param skip_seen_urls: 是否跳过已抓取过的详情页
+        :param max_list_pages: 列表页单次最多翻页数
         """
-        self.scheduler = BlockingScheduler()
-        self.crawler_engine = CrawlerEngine(headless=headless)
+        # Playwright同步API绑定创建它的线程：浏览器的启动、抓取和关闭都提交到同一个专用线程执行，
+        # 常驻浏览器才能跨任务复用，停止时也能在该线程中正常关闭
+        self.scheduler = BlockingScheduler(executors={'default': ThreadPoolExecutor(max_workers=1)})
+        self._browser_thread = futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix='browser')
+        budget = {
+            'max_pages_per_browser': CRAWLER_BROWSER_MAX_PAGES,
+            'max_browser_memory_mb': CRAWLER_BROWSER_MAX_MEMORY_MB
+        }
+        if concurrency > 1:
+            self.crawler_engine = AsyncCrawlerEngine(
+                headless=headless, concurrency=concurrency, contexts=contexts, **budget
+            )
+        else:
+            self.crawler_engine = CrawlerEngine(headless=headless, **budget)
+        # 页面抓取入口：HTTP快速通道 + 浏览器回退，或仅使用浏览器
+        self.fetcher = TieredFetcher(self.crawler_engine) if http_fast_path else self.crawler_engine
+        self.max_detail_pages = max_detail_pages
+        self.pre_score_threshold = pre_score_threshold
+        self.seen_urls = SeenUrlIndex(max_failures=CRAWLER_MAX_URL_FAILURES) if skip_seen_urls else None
+        self.persistent_browser = persistent_browser
         self.parser = OkcisParser()
+        self.list_walker = ListWalker(self.fetcher, self.parser, max_pages=max_list_pages)
         self.notifier = Notifier()
-        self.alert_threshold = 2.0  # 预警阈值
+        self.alert_threshold = 2.0  # 默认方案（全局关键词表）的预警阈值，订阅方案使用各自的阈值
+        # 已编译匹配器缓存：关键词未变更时跨任务复用，任务中途的关键词修改在检查间隔内生效
+        self.matcher_cache = MatcherCache(self.alert_threshold)
+        self._notifiers: Dict[Tuple[str, str], Notifier] = {}
 
         logger.info("调度器初始化完成")
 
@@ -48,7 +118,7 @@ class BidMonitorScheduler:
 
             # 添加定时任务（每小时执行一次）
             self.scheduler.add_job(
-                self.crawl_and_alert,
+                self._run_crawl_job,
                 trigger=CronTrigger(hour='*', minute='0'),  # 每小时整点执行
                 id='crawl_job',
                 name='招标信息爬取任务',
@@ -57,9 +127,14 @@ class BidMonitorScheduler:
 
             logger.info("定时任务已添加：每小时执行一次")
 
-            # 立即执行一次
+            # 立即执行一次（与定时任务在同一工作线程中执行）
             logger.info("执行首次爬取任务...")
-            self.crawl_and_alert()
+            self.scheduler.add_job(
+                self._run_crawl_job,
+                id='crawl_job_initial',
+                name='首次爬取任务',
+                next_run_time=datetime.now()
+            )
 
             # 启动调度器
             logger.info("调度器启动，等待定时任务...")
@@ -70,12 +145,17 @@ class BidMonitorScheduler:
             self.stop()
 
     def stop(self):
-        """停止调度器"""
+        """停止调度器：等待进行中的任务结束后，在浏览器线程中关闭浏览器"""
         if self.scheduler.running:
             self.scheduler.shutdown()
-        self.crawler_engine.stop()
+        self._browser_thread.submit(self.crawler_engine.stop).result()
+        self._browser_thread.shutdown(wait=True)
         logger.info("调度器已停止")
 
+    def _run_crawl_job(self):
+        """定时任务入口：在浏览器线程中执行爬取任务并等待完成"""
+        self._browser_thread.submit(self.crawl_and_alert).result()
+
     def crawl_and_alert(self):
         """爬取任务：抓取数据、匹配关键词、发送预警"""
         task_id = str(uuid.uuid4())
@@ -99,35 +179,62 @@ class BidMonitorScheduler:
         failed_count = 0
 
         try:
-            # 启动爬虫引擎
-            self.crawler_engine.start()
-
-            # 1. 获取列表页
+            # 启动爬虫引擎（常驻模式下复用已有浏览器）
+            if self.persistent_browser:
+                self.crawler_engine.ensure_started()
+            else:
+                self.crawler_engine.start()
+            self.fetcher.reset_metrics()
+
+            # 1. 从第一页开始翻页获取列表页，到上次抓取的最新公告（高水位）为止
             list_url = "https://www.okcis.cn/bn/"
-            list_content = self.crawler_engine.fetch_page(list_url)
+            watermark = get_watermark(db, list_url)
+            walk = self.list_walker.walk(
+                list_url,
+                watermark_url=watermark.last_url if watermark else None,
+                watermark_date=watermark.last_publish_date if watermark else None
+            )
 
-            if not list_content:
+            if not walk.pages:
                 logger.error("列表页获取失败")
                 crawl_log.status = 'failed'
                 crawl_log.error_message = '列表页获取失败'
                 db.commit()
                 return
 
-            # 2. 解析列表页，获取详情页URL
-            detail_urls = self.parser.get_list_urls(list_content)
-            total_fetched = len(detail_urls)
+            # 2. 高水位之前的详情页记录（URL + 标题）
+            list_items = walk.items
+            total_fetched = len(list_items)
             logger.info(f"从列表页解析到 {total_fetched} 个详情页URL")
 
-            # 3. 获取关键词配置
-            keywords = get_all_keywords(db)
-            keyword_data = [{'keyword': kw.keyword, 'weight': kw.weight} for kw in keywords]
-            matcher = KeywordMatcher(keyword_data)
-
-            # 4. 遍历详情页
-            for url in detail_urls[:10]:  # 限制每次处理10条（测试阶段）
+            # 跳过已抓取过的详情页（直接查询seen_urls表，包含其他进程写入的URL）
+            if self.seen_urls:
+                unseen = set(self.seen_urls.filter_unseen(db, [item['url'] for item in list_items]))
+                list_items = [item for item in list_items if item['url'] in unseen]
+            new_count = len(list_items)
+
+            # 3. 获取订阅方案和已编译的共享匹配器（关键词未变更时直接复用）
+            profiles, matcher = self.matcher_cache.get(db)
+
+            # 4. 按列表页标题预评分（取各方案最高分），只抓取达到阈值的详情页，高分优先
+            candidates = self._select_detail_items(list_items, matcher)
+            detail_urls = [item['url'] for item in candidates[:self.max_detail_pages]]
+            pre_filter = {
+                'list_pages': walk.pages,
+                'listed': total_fetched,
+                'seen': total_fetched - new_count,
+                'candidates': len(candidates),
+                'skipped': new_count - len(candidates),
+                'fetched': len(detail_urls)
+            }
+
+            # 5. 批量抓取详情页（HTTP层并发请求，浏览器回退在异步引擎下并发执行）
+            detail_pages = self.fetcher.fetch_pages(detail_urls)
+
+            # 6. 解析详情页并评分
+            parsed = []
+            for url, detail_content in detail_pages.items():
                 try:
-                    # 获取详情页内容
-                    detail_content = self.crawler_engine.fetch_page(url)
                     if not detail_content:
                         failed_count += 1
                         continue
@@ -141,48 +248,88 @@ class BidMonitorScheduler:
                         failed_count += 1
                         continue
 
-                    # 关键词匹配
-                    match_text = f"{project_data.get('title', '')} {project_data.get('content_text', '')}"
-                    score, match_details = matcher.calculate_match_score(match_text)
-                    project_data['match_score'] = score
-
-                    # 保存到数据库
-                    project = create_bid_project(db, project_data)
-                    if project:
-                        success_count += 1
-
-                        # 如果分数达到阈值，发送预警
-                        if score >= self.alert_threshold:
-                            logger.info(f"项目达到预警阈值，准备推送: {project.title}")
-                            self.notifier.send_alert(
-                                {
-                                    'title': project.title,
-                                    'match_score': project.match_score,
-                                    'owner_unit': project.owner_unit,
-                                    'budget': project.budget,
-                                    'registration_end': project.registration_end,
-                                    'bidding_time': project.bidding_time,
-                                    'location': project.location,
-                                    'source_url': project.source_url
-                                },
-                                match_details
-                            )
-                    else:
-                        failed_count += 1
+                    # 关键词匹配：各字段扫描一次，按字段权重得到每个方案的分数，项目分数取各方案最高分
+                    profiles, matcher = self.matcher_cache.get(db)
+                    profile_scores, keyword_hits = matcher.score_fields({
+                        'title': project_data.get('title'),
+                        'body': project_data.get('content_text'),
+                        'owner_unit': project_data.get('owner_unit')
+                    })
+                    project_data['match_score'] = max((score for score, _ in profile_scores.values()), default=0.0)
+                    parsed.append((project_data, profiles, profile_scores, keyword_hits))
 
                 except Exception as e:
                     logger.error(f"处理详情页失败: {url}, 错误: {e}")
                     failed_count += 1
 
+            # 7. 批量写入数据库，只对新增项目保存命中明细并发送预警
+            upsert = bulk_upsert_bid_projects(db, [project_data for project_data, _, _, _ in parsed])
+            inserted = set(upsert.inserted)
+            stored = inserted.union(upsert.existing)
+            success_count += len(stored)
+            failed_count += len(parsed) - len(stored)
+
+            processed_urls = [project_data['source_url'] for project_data, _, _, _ in parsed
+                              if project_data['project_id'] in stored]
+            new_projects = [entry for entry in parsed if entry[0]['project_id'] in inserted]
+            bulk_save_keyword_hits(db, {project_data['project_id']: keyword_hits
+                                        for project_data, _, _, keyword_hits in new_projects})
+            if len(stored) > len(inserted):
+                logger.info(f"{len(stored) - len(inserted)} 个项目已存在，不重复预警")
+            for project_data, profiles, profile_scores, _ in new_projects:
+                self._send_alerts(project_data, profiles, profile_scores)
+
+            # 记录已入库的详情页；抓取、解析或写入失败的URL累计失败次数，达到上限后放弃
+            failed_urls = set(detail_urls).difference(processed_urls)
+            retired_urls = set()
+            if self.seen_urls:
+                self.seen_urls.mark_seen(db, processed_urls)
+                retired_urls = self.seen_urls.record_failures(db, failed_urls)
+
+            # 推进高水位：推进到最早一条未处理公告（超出抓取上限或失败待重试）之后，积压的公告分几次任务抓完
+            capped_urls = {item['url'] for item in candidates[self.max_detail_pages:]}
+            pending = capped_urls.union(failed_urls.difference(retired_urls))
+            pre_filter['capped'] = len(capped_urls)
+            pre_filter['failed'] = len(failed_urls)
+            new_watermark = pick_watermark(walk, pending)
+            if new_watermark:
+                update_watermark(db, list_url, new_watermark['url'], new_watermark['publish_date'])
+            elif walk.newest:
+                logger.info(f"未翻到原高水位或最早的公告未处理完（超出上限 {len(capped_urls)} 条，"
+                            f"失败待重试 {len(pending) - len(capped_urls)} 条），高水位保持不变")
+
             # 更新日志
             crawl_log.end_time = datetime.now()
             crawl_log.total_fetched = str(total_fetched)
             crawl_log.success_count = str(success_count)
             crawl_log.failed_count = str(failed_count)
+            crawl_log.metrics = {**self.fetcher.get_metrics(), 'pre_filter': pre_filter}
             crawl_log.status = 'success'
             db.commit()
 
             logger.info(f"爬取任务完成，成功: {success_count}, 失败: {failed_count}")
+            logger.info(
+                f"列表 {pre_filter['list_pages']} 页 {pre_filter['listed']} 条，已抓取过 {pre_filter['seen']} 条，"
+                f"标题预评分跳过 {pre_filter['skipped']} 条，"
+                f"抓取详情页 {pre_filter['fetched']} 个"
+            )
+            resources = crawl_log.metrics['resources']
+            logger.info(
+                f"资源拦截 {resources['blocked_requests']} 个请求，"
+                f"估计节省流量 {resources['bytes_saved'] / 1024 / 1024:.1f}MB"
+            )
+            for host, limiter_state in crawl_log.metrics['rate_limiter'].items():
+                logger.info(
+                    f"限速状态 {host}: {limiter_state['rate']} 次/秒，"
+                    f"验证码率 {limiter_state['captcha_rate']:.0%}，错误率 {limiter_state['error_rate']:.0%}"
+                    f"{'，退避中' if limiter_state['backoff'] else ''}"
+                )
+            if 'tiers' in crawl_log.metrics:
+                tiers = crawl_log.metrics['tiers']
+                logger.info(
+                    f"HTTP快速通道命中 {tiers['http']} 个页面，浏览器回退 {tiers['browser']} 个，"
+                    f"HTTP命中率 {tiers['http_hit_rate']:.0%}"
+                )
 
         except Exception as e:
             logger.error(f"爬取任务异常: {e}")
@@ -193,7 +340,80 @@ class BidMonitorScheduler:
 
         finally:
             db.close()
-            self.crawler_engine.stop()
+            if not self.persistent_browser:
+                self.crawler_engine.stop()
+
+    def _send_alerts(self, project_data: Dict, profiles: List[Dict], profile_scores: Dict):
+        """
+        分数达到方案阈值时，推送到该方案的通知渠道
+
+        :param project_data: 项目数据
+        :param profiles: 订阅方案列表
+        :param profile_scores: {方案ID: (分数, 匹配详情)}
+        """
+        for profile in profiles:
+            score, match_details = profile_scores[profile['id']]
+            if score < profile['alert_threshold']:
+                continue
+            logger.info(f"项目达到方案 {profile['name']} 的预警阈值，准备推送: {project_data['title']}")
+            self._get_notifier(profile).send_alert(
+                {
+                    'title': project_data['title'],
+                    'match_score': score,
+                    'owner_unit': project_data.get('owner_unit'),
+                    'budget': project_data.get('budget'),
+                    'registration_end': project_data.get('registration_end'),
+                    'bidding_time': project_data.get('bidding_time'),
+                    'location': project_data.get('location'),
+                    'source_url': project_data['source_url']
+                },
+                match_details,
+                profile_name=None if profile['id'] == DEFAULT_PROFILE_ID else profile['name']
+            )
+
+    def _get_notifier(self, profile: Dict) -> Notifier:
+        """
+        获取订阅方案的推送器，未配置Webhook的方案使用全局推送器
+
+        :param profile: 订阅方案
+        :return: 推送器
+        """
+        webhooks = (profile['wecom_webhook'], profile['dingtalk_webhook'])
+        if not any(webhooks):
+            return self.notifier
+        if webhooks not in self._notifiers:
+            self._notifiers[webhooks] = Notifier(*webhooks)
+        return self._notifiers[webhooks]
+
+    def _select_detail_items(self, list_items: List[Dict], matcher: MultiProfileMatcher) -> List[Dict]:
+        """
+        按列表页标题预评分筛选并排序待抓取的详情页
+
+        标题为空的记录（解析器未提供标题）无法预评分，始终保留并排在有得分的记录之后
+
+        :param list_items: 列表页记录
+        :param matcher: 多方案匹配器，预评分取各方案最高分
+        :return: 预评分达到阈值的记录，按预评分降序（同分保持列表页顺序），每条记录增加 'pre_score'
+        """
+        candidates = []
+        seen_urls = set()
+        for item in list_items:
+            if item['url'] in seen_urls:
+                continue
+            seen_urls.add(item['url'])
+
+            if not item.get('title'):
+                candidates.append({**item, 'pre_score': None})
+                continue
+
+            pre_score, _ = matcher.calculate_match_score(item['title'])
+            if pre_score >= self.pre_score_threshold:
+                candidates.append({**item, 'pre_score': pre_score})
+            else:
+                logger.debug(f"标题预评分 {pre_score} 低于阈值，跳过: {item['title']}")
+
+        candidates.sort(key=lambda item: -1 if item['pre_score'] is None else item['pre_score'], reverse=True)
+        return candidates
 
 
 if __name__ == "__main__":
@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+@Time    : 2026/10/18 11:00
+@Author  : Manus AI
+@File    : session_state.py
+@Desc    : 浏览器会话状态(storage_state)持久化，跨任务、跨进程复用通过验证码后的Cookie
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Optional
+from loguru import logger
+
+
+class SessionStateStore:
+    """
+    会话状态存储
+
+    验证码通过后将Playwright的storage_state写入磁盘，下次启动浏览器时加载。
+    多个爬虫进程共享同一个文件：写入采用临时文件+原子替换，
+    通过文件修改时间判断其他进程是否已刷新状态。
+    """
+
+    def __init__(self, path: Optional[str], max_age_hours: float = 12):
+        """
+        初始化会话状态存储
+
+        :param path: 状态文件路径，为空时禁用持久化
+        :param max_age_hours: 状态最长有效期（小时），超过后不再加载
+        """
+        self.path = Path(path) if path else None
+        self.max_age = max_age_hours * 3600
+        self.loaded_mtime: Optional[float] = None
+
+    @property
+    def enabled(self) -> bool:
+        """是否启用持久化"""
+        return self.path is not None
+
+    def load(self) -> Optional[Dict]:
+        """
+        读取未过期的会话状态
+
+        :return: storage_state字典，不存在、已过期或损坏时返回None
+        """
+        mtime = self._mtime()
+        if mtime is None:
+            return None
+
+        if time.time() - mtime > self.max_age:
+            logger.info(f"会话状态已超过有效期，忽略: {self.path}")
+            return None
+
+        try:
+            state = json.loads(self.path.read_text(encoding='utf-8'))
+        except (OSError, ValueError) as e:
+            logger.warning(f"会话状态读取失败: {e}")
+            return None
+
+        self.loaded_mtime = mtime
+        logger.info(f"已加载会话状态，Cookie数: {len(state.get('cookies', []))}")
+        return state
+
+    def save(self, state: Dict):
+        """
+        原子写入会话状态
+
+        :param state: Playwright storage_state字典
+        """
+        if not self.enabled:
+            return
+
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            tmp_path.write_text(json.dumps(state, ensure_ascii=False), encoding='utf-8')
+            os.replace(tmp_path, self.path)
+            self.loaded_mtime = self._mtime()
+            logger.info(f"会话状态已保存: {self.path}")
+        except OSError as e:
+            logger.warning(f"会话状态保存失败: {e}")
+
+    def has_newer(self) -> bool:
+        """
+        磁盘上是否有比当前已加载版本更新的状态（通常由其他进程刷新）
+
+        :return: True表示有更新的状态
+        """
+        mtime = self._mtime()
+        if mtime is None:
+            return False
+        return self.loaded_mtime is None or mtime > self.loaded_mtime
+
+    def invalidate(self):
+        """
+        站点重新要求验证码，说明已加载的状态失效。
+        仅在磁盘文件仍是自己加载的版本时删除，避免误删其他进程刚刷新的状态。
+        """
+        if self.loaded_mtime is None:
+            return
+
+        logger.info("会话状态已失效，需要重新通过验证码")
+        if self._mtime() == self.loaded_mtime:
+            try:
+                self.path.unlink()
+            except OSError:
+                pass
+        self.loaded_mtime = None
+
+    def _mtime(self) -> Optional[float]:
+        """状态文件修改时间，不存在时返回None"""
+        if not self.enabled:
+            return None
+        try:
+            return self.path.stat().st_mtime
+        except OSError:
+            return None
@@ -10,7 +10,6 @@
 
 import streamlit as st
 import pandas as pd
-from datetime import datetime, timedelta
 import sys
 import os
 
@@ -18,8 +17,7 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from app.core.database import SessionLocal
-from app.models.bid_project import BidProject, CrawlLog
-from sqlalchemy import func, desc
+from app.crud import project_queries
 
 
 st.set_page_config(
@@ -29,34 +27,21 @@ st.set_page_config(
 )
 
 
+def _or_unknown(series: pd.Series) -> pd.Series:
+    """空值显示为'未知'"""
+    return series.astype(object).where(series.notna(), '未知')
+
+
+def _format_time(series: pd.Series, empty: str = '') -> pd.Series:
+    """时间列格式化为'年-月-日 时:分'"""
+    return series.map(lambda t: t.strftime('%Y-%m-%d %H:%M') if pd.notna(t) else empty)
+
+
 def get_statistics():
     """获取统计数据"""
     db = SessionLocal()
     try:
-        # 总项目数
-        total_projects = db.query(func.count(BidProject.project_id)).scalar()
-
-        # 今日新增
-        today = datetime.now().date()
-        today_projects = db.query(func.count(BidProject.project_id)).filter(
-            func.date(BidProject.created_at) == today
-        ).scalar()
-
-        # 高分项目（>= 3.0）
-        high_score_projects = db.query(func.count(BidProject.project_id)).filter(
-            BidProject.match_score >= 3.0
-        ).scalar()
-
-        # 最近一次爬取时间
-        last_crawl = db.query(CrawlLog).order_by(desc(CrawlLog.start_time)).first()
-        last_crawl_time = last_crawl.start_time if last_crawl else None
-
-        return {
-            'total': total_projects or 0,
-            'today': today_projects or 0,
-            'high_score': high_score_projects or 0,
-            'last_crawl': last_crawl_time
-        }
+        return project_queries.get_statistics(db)
     finally:
         db.close()
 
@@ -65,50 +50,44 @@ def get_recent_projects(limit=20, min_score=0.0):
     """获取最近的项目列表"""
     db = SessionLocal()
     try:
-        projects = db.query(BidProject).filter(
-            BidProject.match_score >= min_score
-        ).order_by(
-            desc(BidProject.created_at)
-        ).limit(limit).all()
-
-        data = []
-        for p in projects:
-            data.append({
-                '标题': p.title,
-                '匹配分数': f"{p.match_score:.2f}",
-                '业主单位': p.owner_unit or '未知',
-                '预算(万元)': p.budget or '未知',
-                '报名截止': p.registration_end or '未知',
-                '抓取时间': p.created_at.strftime('%Y-%m-%d %H:%M') if p.created_at else '',
-                '详情链接': p.source_url
-            })
-
-        return pd.DataFrame(data)
+        df = project_queries.read_recent_projects(db, limit=limit, min_score=min_score)
     finally:
         db.close()
 
+    if df.empty:
+        return df
+
+    return pd.DataFrame({
+        '标题': df['title'],
+        '匹配分数': df['match_score'].map('{:.2f}'.format),
+        '业主单位': _or_unknown(df['owner_unit']),
+        '预算(万元)': _or_unknown(df['budget']),
+        '报名截止': _or_unknown(df['registration_end']),
+        '抓取时间': _format_time(df['created_at']),
+        '详情链接': df['source_url']
+    })
+
 
 def get_crawl_logs(limit=10):
     """获取爬取日志"""
     db = SessionLocal()
     try:
-        logs = db.query(CrawlLog).order_by(desc(CrawlLog.start_time)).limit(limit).all()
-
-        data = []
-        for log in logs:
-            data.append({
-                '任务ID': log.task_id[:8],
-                '开始时间': log.start_time.strftime('%Y-%m-%d %H:%M'),
-                '结束时间': log.end_time.strftime('%Y-%m-%d %H:%M') if log.end_time else '-',
-                '成功数': log.success_count,
-                '失败数': log.failed_count,
-                '状态': log.status
-            })
-
-        return pd.DataFrame(data)
+        df = project_queries.read_crawl_logs(db, limit=limit)
     finally:
         db.close()
 
+    if df.empty:
+        return df
+
+    return pd.DataFrame({
+        '任务ID': df['task_id'].str[:8],
+        '开始时间': _format_time(df['start_time']),
+        '结束时间': _format_time(df['end_time'], empty='-'),
+        '成功数': df['success_count'],
+        '失败数': df['failed_count'],
+        '状态': df['status']
+    })
+
 
 def main():
     """主函数"""
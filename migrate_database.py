@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+@Time    : 2026/10/18 23:00
+@Author  : Manus AI
+@File    : migrate_database.py
+@Desc    : 数据库迁移脚本（项目根目录运行）
+"""
+
+import argparse
+import sys
+import os
+
+# 将项目根目录添加到Python路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.database import engine
+from app.core.migrations import (
+    FTS_BACKFILL_BATCH_SIZE, FTS_CONFIG, RAW_MIGRATION_BATCH_SIZE, backfill_fts, install_fts, move_raw_html
+)
+
+
+def migrate_fts(args):
+    """安装全文检索触发器并回填历史数据"""
+    with engine.connect() as conn:
+        mode = install_fts(conn, args.config)
+    print(f"全文检索触发器已安装，分词方式: {mode}")
+    if not args.skip_backfill:
+        total = backfill_fts(engine, args.batch_size)
+        print(f"已回填 {total} 条项目的全文检索向量")
+
+
+def migrate_raw(args):
+    """把原始HTML迁移到压缩表"""
+    total = move_raw_html(engine, args.batch_size, drop_column=not args.keep_column)
+    print(f"已迁移 {total} 条项目的原始HTML")
+    if total and not args.keep_column:
+        print("提示: 业务低峰时执行 VACUUM FULL bid_projects; 释放磁盘空间")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="招投标监控系统数据库迁移")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    fts_parser = subparsers.add_parser('fts', help="全文检索向量改由数据库触发器生成，并回填历史数据")
+    fts_parser.add_argument('--config', default=FTS_CONFIG, help="全文检索配置名，不存在时回退到二元分词")
+    fts_parser.add_argument('--batch-size', type=int, default=FTS_BACKFILL_BATCH_SIZE, help="回填时每批更新的行数")
+    fts_parser.add_argument('--skip-backfill', action='store_true', help="只安装触发器，不回填")
+    fts_parser.set_defaults(func=migrate_fts)
+
+    raw_parser = subparsers.add_parser('raw', help="原始HTML迁移到 bid_project_raw 压缩表")
+    raw_parser.add_argument('--batch-size', type=int, default=RAW_MIGRATION_BATCH_SIZE, help="每批迁移的行数")
+    raw_parser.add_argument('--keep-column', action='store_true', help="迁移后保留（已清空的）content_raw 字段")
+    raw_parser.set_defaults(func=migrate_raw)
+
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("招投标监控系统 - 数据库迁移")
+    print("=" * 60)
+
+    try:
+        args.func(args)
+        print("\n✅ 迁移完成")
+
+    except Exception as e:
+        print(f"\n❌ 迁移失败: {e}")
+        sys.exit(1)
@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+@Time    : 2026/10/18 22:00
+@Author  : Manus AI
+@File    : rescore_projects.py
+@Desc    : 关键词或权重调整后，按当前配置重新计算历史项目匹配分数（项目根目录运行）
+"""
+
+import argparse
+import sys
+import os
+
+# 将项目根目录添加到Python路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.database import SessionLocal, engine
+from app.core.matcher import MultiProfileMatcher
+from app.core.rescorer import RESCORE_CHECKPOINT_PATH, RESCORE_CHUNK_SIZE, rescore_projects
+from app.crud.keyword_profile_crud import get_active_profiles
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="批量重新计算历史项目匹配分数")
+    parser.add_argument('--chunk-size', type=int, default=RESCORE_CHUNK_SIZE, help="每批读取和写回的项目数")
+    parser.add_argument('--checkpoint', default=RESCORE_CHECKPOINT_PATH, help="断点文件路径，留空不记录断点")
+    parser.add_argument('--restart', action='store_true', help="忽略已有断点，从头开始")
+    parser.add_argument('--dry-run', action='store_true', help="只计算不写回数据库")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("招投标监控系统 - 历史项目重新评分")
+    print("=" * 60)
+
+    db = SessionLocal()
+    try:
+        profiles = get_active_profiles(db)
+    finally:
+        db.close()
+    matcher = MultiProfileMatcher(profiles)
+
+    try:
+        stats = rescore_projects(engine, matcher, chunk_size=args.chunk_size, checkpoint_path=args.checkpoint or None,
+                                 restart=args.restart, dry_run=args.dry_run)
+        print(f"\n✅ 重新评分完成：处理 {stats['scanned']} 条，更新 {stats['updated']} 条，耗时 {stats['elapsed_s']}s")
+
+    except KeyboardInterrupt:
+        print("\n已中断，再次运行将从断点继续")
+        sys.exit(1)
@@ -0,0 +1,34 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+@Time    : 2026/10/18 16:30
+@Author  : Manus AI
+@File    : run_ocr_service.py
+@Desc    : OCR服务启动脚本（项目根目录运行）
+"""
+
+import sys
+import os
+
+# 将项目根目录添加到Python路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from crawler.ocr_service import OcrService, OCR_SERVICE_SOCKET, DEFAULT_SOCKET_PATH
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("招投标监控系统 - OCR服务")
+    print("=" * 60)
+
+    socket_path = OCR_SERVICE_SOCKET or DEFAULT_SOCKET_PATH
+    print(f"\n监听: {socket_path}")
+    print("爬虫进程需配置环境变量 OCR_SERVICE_SOCKET 指向该路径")
+
+    service = OcrService(socket_path=socket_path)
+    try:
+        service.serve_forever()
+    except KeyboardInterrupt:
+        print("\nOCR服务停止")
+    finally:
+        service.server_close()
@@ -67,7 +67,7 @@ def test_captcha():
         
         print("\n提示:")
         print("  - 如果验证码识别失败，请检查 PaddleOCR 是否正确安装")
-        print("  - 验证码图片保存在 /tmp/bid_monitor_captcha/ 目录")
+        print("  - 配置 CAPTCHA_ARCHIVE_DIR 后验证码样本会归档到该目录")
         print("  - 可以查看保存的图片来判断识别失败的原因")
 
 
@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+@Time    : 2026/10/18 22:30
+@Author  : Manus AI
+@File    : test_bid_project_crud.py
+@Desc    : 招标项目数据库操作单元测试（批量写入、关键词命中明细）
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from datetime import datetime, timezone
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import sessionmaker
+from app.crud.bid_project_crud import (
+    SearchCursor, _collect_raw_html, _prepare_rows, build_raw_upsert_statement, build_search_statement,
+    build_keyword_trend_statement, build_upsert_statement, bulk_save_keyword_hits, save_keyword_hits,
+    search_projects_by_keywords
+)
+from app.models.bid_project import ProjectKeywordHit
+
+
+class TestBulkUpsert:
+    """测试批量写入语句"""
+
+    def test_prepare_rows(self):
+        """测试按project_id去重，各行字段统一并补默认值"""
+        rows = _prepare_rows([
+            {'project_id': 'a', 'title': '旧标题', 'source_url': 'u1', 'match_score': 1.0},
+            {'project_id': 'b', 'title': '标题B', 'source_url': 'u2', 'content_text': '正文', 'match_score': 2.0},
+            {'project_id': 'a', 'title': '新标题', 'source_url': 'u1'},
+        ])
+
+        assert [row['project_id'] for row in rows] == ['a', 'b']
+        assert all(set(row) == set(rows[0]) for row in rows)
+        assert rows[0]['title'] == '新标题'
+        assert rows[0]['match_score'] == 0.0
+        assert rows[0]['content_text'] is None
+        assert 'content_tsvector' not in rows[1]
+
+    def test_build_upsert_statement(self):
+        """测试一条多行INSERT，冲突时按配置跳过或覆盖，并返回是否新插入"""
+        rows = _prepare_rows([
+            {'project_id': 'a', 'title': 'A', 'source_url': 'u1'},
+            {'project_id': 'b', 'title': 'B', 'source_url': 'u2'},
+        ])
+
+        sql = str(build_upsert_statement(rows).compile(dialect=postgresql.dialect()))
+        assert sql.count('INSERT INTO bid_projects') == 1
+        assert 'ON CONFLICT (project_id) DO NOTHING' in sql
+        assert sql.endswith('RETURNING bid_projects.project_id, xmax = 0 AS inserted')
+
+        sql = str(build_upsert_statement(rows, update_existing=True).compile(dialect=postgresql.dialect()))
+        assert 'ON CONFLICT (project_id) DO UPDATE SET' in sql
+        assert 'title = excluded.title' in sql
+        assert 'project_id = excluded.project_id' not in sql
+        assert 'updated_at = now()' in sql
+
+    def test_raw_html_split_out(self):
+        """测试原始HTML不写入bid_projects，单独写入压缩表"""
+        projects = [
+            {'project_id': 'a', 'title': 'A', 'source_url': 'u1', 'content_raw': '<p>旧</p>'},
+            {'project_id': 'b', 'title': 'B', 'source_url': 'u2', 'content_raw': None},
+            {'project_id': 'a', 'title': 'A', 'source_url': 'u1', 'content_raw': '<p>新</p>'},
+        ]
+
+        assert all('content_raw' not in row for row in _prepare_rows(projects))
+        assert _collect_raw_html(projects) == {'a': '<p>新</p>'}
+
+        raw_rows = [{'project_id': 'a', 'codec': 'zlib', 'content': b'x', 'raw_size': 1}]
+        sql = str(build_raw_upsert_statement(raw_rows).compile(dialect=postgresql.dialect()))
+        assert 'INSERT INTO bid_project_raw' in sql
+        assert 'ON CONFLICT (project_id) DO NOTHING' in sql
+
+        sql = str(build_raw_upsert_statement(raw_rows, update_existing=True).compile(dialect=postgresql.dialect()))
+        assert 'content = excluded.content' in sql
+
+
+class TestSearch:
+    """测试全文检索语句"""
+
+    @staticmethod
+    def _compile(statement):
+        """编译为PostgreSQL语句"""
+        return statement.compile(dialect=postgresql.dialect())
+
+    def test_ranked_search_with_bound_parameters(self):
+        """测试搜索词作为绑定参数传入，按相关度排序，只取列表字段"""
+        compiled = self._compile(build_search_statement("标识' OR 1=1 --", min_score=2.0, max_budget=500))
+        sql = str(compiled)
+
+        assert "OR 1=1" not in sql
+        assert compiled.params['query'] == "标识' OR 1=1 --"
+        assert 'ts_rank_cd(bid_projects.content_tsvector, bid_fts_query(' in sql
+        assert 'bid_projects.content_tsvector @@ bid_fts_query(' in sql
+        assert 'bid_projects.match_score >=' in sql and 'bid_projects.budget <=' in sql
+        assert 'content_raw' not in sql and 'content_text' not in sql
+        assert 'DESC, bid_projects.created_at DESC, bid_projects.project_id DESC' in sql
+
+    def test_keyset_pagination(self):
+        """测试翻页使用游标比较而非OFFSET"""
+        cursor = SearchCursor(0.25, datetime(2026, 10, 1, tzinfo=timezone.utc), 'p9')
+        compiled = self._compile(build_search_statement('标识', after=cursor, limit=20))
+        sql = str(compiled)
+
+        assert 'OFFSET' not in sql
+        assert ', bid_projects.created_at, bid_projects.project_id) < (CAST(' in sql
+        assert 'TIMESTAMP WITH TIME ZONE' in sql
+        assert {0.25, 'p9', 20}.issubset(set(compiled.params.values()))
+
+    def test_search_without_query(self):
+        """测试无搜索词时只按过滤条件和抓取时间排序"""
+        sql = str(self._compile(build_search_statement(deadline_from=datetime(2026, 1, 1))))
+
+        assert '@@' not in sql
+        assert 'bid_projects.registration_end >=' in sql
+
+    def test_search_projects_by_keywords_empty(self):
+        """测试关键词为空时直接返回空列表"""
+        assert search_projects_by_keywords(None, []) == []
+
+
+class TestKeywordHits:
+    """测试关键词命中明细"""
+
+    def setup_method(self):
+        """每个测试方法前执行"""
+        engine = create_engine('sqlite://')
+        ProjectKeywordHit.__table__.create(engine)
+        self.db = sessionmaker(bind=engine)()
+
+    def teardown_method(self):
+        """每个测试方法后执行"""
+        self.db.close()
+
+    def test_save_keyword_hits(self):
+        """测试按字段保存命中次数，重复保存覆盖旧明细"""
+        save_keyword_hits(self.db, 'p1', {'广告': {'title': 1, 'body': 2}, '标识': {'owner_unit': 1}})
+        save_keyword_hits(self.db, 'p1', {'广告': {'body': 3}})
+
+        rows = self.db.query(ProjectKeywordHit).all()
+        assert [(row.project_id, row.keyword, row.title_count, row.body_count, row.owner_unit_count)
+                for row in rows] == [('p1', '广告', 0, 3, 0)]
+
+    def test_bulk_save_keyword_hits(self):
+        """测试一次保存多个项目的明细，只覆盖涉及的项目"""
+        save_keyword_hits(self.db, 'p1', {'广告': {'title': 1}})
+        save_keyword_hits(self.db, 'p3', {'标识': {'body': 1}})
+
+        assert bulk_save_keyword_hits(self.db, {
+            'p1': {'标识': {'body': 2}},
+            'p2': {'广告': {'title': 1}, '标识': {'owner_unit': 1}},
+        })
+        rows = self.db.query(ProjectKeywordHit).order_by(ProjectKeywordHit.project_id, ProjectKeywordHit.keyword).all()
+        assert [(row.project_id, row.keyword, row.title_count, row.body_count, row.owner_unit_count)
+                for row in rows] == [
+            ('p1', '标识', 0, 2, 0), ('p2', '广告', 1, 0, 0), ('p2', '标识', 0, 0, 1), ('p3', '标识', 0, 1, 0)
+        ]
+        assert bulk_save_keyword_hits(self.db, {})
+
+    def test_keyword_trend_statement(self):
+        """测试趋势按项目抓取时间分天统计，而不是命中明细的记录时间"""
+        statement = build_keyword_trend_statement('广告', datetime(2026, 10, 1, tzinfo=timezone.utc))
+        sql = str(statement.compile(dialect=postgresql.dialect()))
+
+        assert 'JOIN bid_projects ON bid_projects.project_id = project_keyword_hits.project_id' in sql
+        assert 'date(bid_projects.created_at) AS day' in sql
+        assert 'bid_projects.created_at >=' in sql
+        assert 'GROUP BY date(bid_projects.created_at)' in sql
+        assert 'project_keyword_hits.created_at' not in sql
+
+    def test_cascade_on_project_delete(self):
+        """测试命中明细随项目级联删除"""
+        foreign_key, = ProjectKeywordHit.__table__.c.project_id.foreign_keys
+        assert foreign_key.target_fullname == 'bid_projects.project_id'
+        assert foreign_key.ondelete == 'CASCADE'
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+@Time    : 2026/10/18 15:20
+@Author  : Manus AI
+@File    : test_captcha_archive.py
+@Desc    : 验证码样本归档单元测试
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import pytest
+from crawler.captcha_archive import CaptchaArchive
+
+
+class TestCaptchaArchive:
+    """测试验证码样本归档"""
+
+    def test_save_and_iter(self, tmp_path):
+        """测试保存样本和元数据"""
+        archive = CaptchaArchive(str(tmp_path))
+        path = archive.save(b'png-bytes', '3+5=?', 8, True)
+
+        assert path.read_bytes() == b'png-bytes'
+        samples = list(archive.iter_samples())
+        assert len(samples) == 1
+        assert samples[0][1] == {'text': '3+5=?', 'answer': 8, 'verified': True}
+
+    def test_no_collision_within_same_second(self, tmp_path):
+        """测试同一秒内多次保存不会覆盖"""
+        archive = CaptchaArchive(str(tmp_path))
+        paths = {archive.save(bytes([i]), None, None, False) for i in range(5)}
+
+        assert len(paths) == 5
+
+    def test_bounded(self, tmp_path):
+        """测试超过上限时删除最旧样本"""
+        archive = CaptchaArchive(str(tmp_path), max_samples=3)
+        for i in range(5):
+            archive.save(bytes([i]), str(i), i, True)
+
+        samples = list(archive.iter_samples())
+        assert [meta['answer'] for _, meta in samples] == [2, 3, 4]
+        assert len(list(tmp_path.glob('*.json'))) == 3
+
+    def test_disabled(self):
+        """测试未配置目录时不归档"""
+        archive = CaptchaArchive(None)
+
+        assert archive.enabled is False
+        assert archive.save(b'png-bytes', None, None, False) is None
+        assert list(archive.iter_samples()) == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
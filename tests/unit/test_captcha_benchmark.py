@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+@Time    : 2026/10/18 18:00
+@Author  : Manus AI
+@File    : test_captcha_benchmark.py
+@Desc    : 验证码识别基准测试工具单元测试
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import pytest
+from benchmarks.captcha_benchmark import load_corpus, summarize_latencies, compare_results
+from crawler.captcha_archive import CaptchaArchive
+
+
+class TestLoadCorpus:
+    """测试样本集加载"""
+
+    def test_labels_csv(self, tmp_path):
+        """测试labels.csv格式，跳过表头和无效行"""
+        (tmp_path / 'a.png').write_bytes(b'png')
+        (tmp_path / 'labels.csv').write_text('file,answer\na.png,15\nb.png,abc\n', encoding='utf-8')
+
+        assert load_corpus(str(tmp_path)) == [(tmp_path / 'a.png', 15)]
+
+    def test_archive_uses_verified_samples(self, tmp_path):
+        """测试归档目录格式，只使用验证通过的样本"""
+        archive = CaptchaArchive(str(tmp_path))
+        archive.save(b'png-1', '3+5=?', 8, True)
+        archive.save(b'png-2', '3+6=?', 8, False)
+
+        samples = load_corpus(str(tmp_path))
+
+        assert len(samples) == 1
+        assert samples[0][1] == 8
+        assert samples[0][0].read_bytes() == b'png-1'
+
+
+class TestReport:
+    """测试统计和回退对比"""
+
+    def test_summarize_latencies(self):
+        """测试延迟分位数（毫秒）"""
+        stats = summarize_latencies([i / 1000 for i in range(1, 101)])
+
+        assert stats['p50'] == pytest.approx(50.5)
+        assert stats['p99'] == pytest.approx(99.01)
+        assert stats['max'] == pytest.approx(100)
+
+    def test_summarize_empty(self):
+        """测试无样本时不报错"""
+        assert summarize_latencies([])['p95'] is None
+
+    def test_compare_results(self):
+        """测试准确率下降和延迟增加被识别为回退"""
+        baseline = {'tiers': {'template': {'accuracy': 0.95, 'latency_ms': {'p95': 2.0}}}}
+        same = {'tiers': {'template': {'accuracy': 0.95, 'latency_ms': {'p95': 2.1}}}}
+        worse = {'tiers': {'template': {'accuracy': 0.90, 'latency_ms': {'p95': 5.0}}}}
+
+        assert compare_results(same, baseline) == []
+        assert len(compare_results(worse, baseline)) == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+@Time    : 2026/10/18 18:30
+@Author  : Manus AI
+@File    : test_captcha_cache.py
+@Desc    : 验证码答案缓存单元测试
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import cv2
+import numpy as np
+import pytest
+from crawler.captcha_cache import CaptchaAnswerCache, dhash
+from crawler.captcha_solver import CaptchaSolver
+
+
+def make_image(seed: int) -> np.ndarray:
+    """生成随机块状图片，模拟不同的验证码"""
+    rng = np.random.default_rng(seed)
+    blocks = rng.integers(0, 256, (8, 24), dtype=np.uint8)
+    gray = np.kron(blocks, np.ones((5, 5), dtype=np.uint8))
+    return np.repeat(gray[:, :, None], 3, axis=2)
+
+
+class TestDhash:
+    """测试感知哈希"""
+
+    def test_stable_across_encoding(self):
+        """测试同一张图片重新编码（JPEG有损）后哈希相近"""
+        image = make_image(1)
+        _, buffer = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, 90])
+        reencoded = cv2.imdecode(buffer, cv2.IMREAD_COLOR)
+
+        assert bin(dhash(image) ^ dhash(reencoded)).count('1') <= 8
+
+    def test_different_images(self):
+        """测试不同图片哈希差异大"""
+        assert bin(dhash(make_image(1)) ^ dhash(make_image(2))).count('1') > 50
+
+
+def answer_of(cache: CaptchaAnswerCache, key: int):
+    """查找已验证的答案"""
+    entry = cache.lookup(key)
+    return entry.answer if entry else None
+
+
+def is_wrong(cache: CaptchaAnswerCache, key: int, answer: int) -> bool:
+    """答案是否已知错误"""
+    entry = cache.lookup(key)
+    return entry is not None and answer in entry.wrong
+
+
+class TestCaptchaAnswerCache:
+    """测试答案缓存"""
+
+    def test_positive_and_negative_entries(self):
+        """测试记录正确答案和错误答案"""
+        cache = CaptchaAnswerCache(None)
+        cache.record(1, 8, verified=False)
+
+        assert is_wrong(cache, 1, 8)
+        assert answer_of(cache, 1) is None
+
+        cache.record(1, 9, verified=True, text='4+5=?')
+        assert answer_of(cache, 1) == 9
+        assert cache.lookup(1).text == '4+5=?'
+
+    def test_verified_answer_invalidated(self):
+        """测试已验证答案提交失败后失效"""
+        cache = CaptchaAnswerCache(None)
+        cache.record(1, 9, verified=True)
+        cache.record(1, 9, verified=False)
+
+        assert answer_of(cache, 1) is None
+        assert is_wrong(cache, 1, 9)
+
+    def test_lru_eviction(self):
+        """测试超过上限时淘汰最久未使用的条目"""
+        cache = CaptchaAnswerCache(None, max_entries=2)
+        cache.record(1, 1, verified=True)
+        cache.record(2, 2, verified=True)
+        cache.lookup(1)
+        cache.record(3, 3, verified=True)
+
+        assert answer_of(cache, 1) == 1
+        assert answer_of(cache, 2) is None
+        assert len(cache) == 2
+
+    def test_hamming_distance(self):
+        """测试允许汉明距离时匹配相近的哈希"""
+        cache = CaptchaAnswerCache(None, max_distance=2)
+        cache.record(0b1111, 7, verified=True)
+
+        assert answer_of(cache, 0b1100) == 7
+        assert answer_of(cache, 0b0000) is None
+
+    def test_persistence(self, tmp_path):
+        """测试SQLite持久化，重启后按上限加载，被淘汰的条目不保留"""
+        path = str(tmp_path / 'cache.db')
+        cache = CaptchaAnswerCache(path, max_entries=2)
+        key = 1 << 255
+        cache.record(key, 12, verified=True, text='3*4=?')
+        cache.record(2, 5, verified=False)
+        cache.record(3, 6, verified=True)
+        cache.close()
+
+        reloaded = CaptchaAnswerCache(path, max_entries=2)
+        assert answer_of(reloaded, key) is None
+        assert is_wrong(reloaded, 2, 5)
+        assert answer_of(reloaded, 3) == 6
+
+    def test_disabled(self):
+        """测试上限为0时禁用"""
+        cache = CaptchaAnswerCache(None, max_entries=0)
+        cache.record(1, 1, verified=True)
+
+        assert cache.lookup(1) is None
+
+
+class TestSolverCache:
+    """测试识别器使用答案缓存"""
+
+    def setup_method(self):
+        """每个测试方法前执行：客户端模式（不加载本地模型），OCR替换为计数替身"""
+        self.solver = CaptchaSolver(service_socket='/tmp/bid_monitor_ocr_missing.sock', template_model='',
+                                    cache_path='')
+        self.calls = []
+        self.solver._recognize = lambda image, array=None, use_template=True: self.calls.append(1) or '3+5=?'
+        _, buffer = cv2.imencode('.png', make_image(3))
+        self.image = buffer.tobytes()
+
+    def test_cache_hit_skips_ocr(self):
+        """测试验证通过后再次遇到同一张图片不再OCR"""
+        assert self.solver.solve_image(self.image) == 8
+        self.solver.report(self.image, 8, verified=True)
+
+        assert self.solver.solve_image(self.image) == 8
+        assert len(self.calls) == 1
+
+    def test_known_wrong_answer(self):
+        """测试识别结果曾提交失败时放弃"""
+        self.solver.report(self.image, 8, verified=False)
+
+        assert self.solver.solve_image(self.image) is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+@Time    : 2026/10/18 17:30
+@Author  : Manus AI
+@File    : test_captcha_templates.py
+@Desc    : 模板匹配验证码识别单元测试（使用合成字形图片）
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import numpy as np
+import pytest
+from crawler.captcha_templates import TemplateCaptchaSolver, to_label, segment, binarize
+
+CHARS = '0123456789+-*=?'
+
+
+def make_font(seed: int = 7) -> dict:
+    """生成每个字符的随机点阵字形（9x6），保证各字符互不相同"""
+    rng = np.random.default_rng(seed)
+    font = {}
+    for char in CHARS:
+        glyph = rng.random((9, 6)) > 0.5
+        glyph[:, 0] = True  # 保证字形列连续，切分时不会断开
+        font[char] = glyph
+    return font
+
+
+def render(text: str, font: dict, rng: np.random.Generator) -> np.ndarray:
+    """把文本渲染成白底黑字的BGR图片，字符间留空并放大2倍"""
+    columns = [np.zeros((9, 3), dtype=bool)]
+    for char in text:
+        columns.append(font[char])
+        columns.append(np.zeros((9, int(rng.integers(2, 5))), dtype=bool))
+    mask = np.kron(np.hstack(columns), np.ones((2, 2), dtype=bool))
+    mask = np.pad(mask, ((4, 4), (0, 0)))
+    gray = np.where(mask, 30, 230).astype(np.int16) + rng.integers(-20, 20, mask.shape)
+    return np.repeat(np.clip(gray, 0, 255).astype(np.uint8)[:, :, None], 3, axis=2)
+
+
+def random_expression(rng: np.random.Generator) -> str:
+    """生成随机算术表达式文本"""
+    return f"{rng.integers(0, 100)}{rng.choice(list('+-*'))}{rng.integers(0, 10)}=?"
+
+
+class TestTemplateCaptchaSolver:
+    """测试模板匹配识别"""
+
+    def setup_method(self):
+        """每个测试方法前执行：用合成样本训练模板"""
+        self.font = make_font()
+        self.rng = np.random.default_rng(42)
+        samples = [(render(text, self.font, self.rng), text)
+                   for text in (random_expression(self.rng) for _ in range(60))]
+        # 覆盖所有数字
+        samples.append((render('0123456789', self.font, self.rng), '0123456789'))
+        self.solver = TemplateCaptchaSolver.train(samples)
+
+    def test_to_label(self):
+        """测试OCR文本转标签"""
+        assert to_label('12 × 3 = ？') == '12*3=?'
+        assert to_label('7加8') == '7+8'
+
+    def test_segment(self):
+        """测试字符切分数量"""
+        image = render('3+5=?', self.font, self.rng)
+
+        assert len(segment(binarize(image))) == 5
+
+    def test_recognize(self):
+        """测试识别新样本"""
+        for _ in range(20):
+            text = random_expression(self.rng)
+            result, confidence = self.solver.recognize(render(text, self.font, self.rng))
+
+            assert result == text
+            assert confidence > 0.85
+
+    def test_low_confidence_on_unknown_glyphs(self):
+        """测试未知字形的置信度低，交给PaddleOCR兜底"""
+        other_font = make_font(seed=99)
+        image = render('3+5=?', other_font, self.rng)
+
+        _, confidence = self.solver.recognize(image)
+        assert confidence < 0.85
+
+    def test_save_and_load(self, tmp_path):
+        """测试模板保存和加载"""
+        path = str(tmp_path / 'templates.npz')
+        self.solver.save(path)
+        loaded = TemplateCaptchaSolver.load(path)
+
+        image = render('8*4=?', self.font, self.rng)
+        assert loaded.recognize(image)[0] == '8*4=?'
+
+    def test_train_without_usable_samples(self):
+        """测试没有可用样本时报错"""
+        image = render('3+5', self.font, self.rng)
+
+        with pytest.raises(ValueError):
+            TemplateCaptchaSolver.train([(image, '3+5=?')])
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
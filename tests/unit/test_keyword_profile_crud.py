@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+@Time    : 2026/10/18 21:00
+@Author  : Manus AI
+@File    : test_keyword_profile_crud.py
+@Desc    : 关键词订阅方案数据库操作单元测试
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.crud.keyword_profile_crud import DEFAULT_PROFILE_ID, get_active_profiles
+from app.models.bid_project import Keyword, KeywordProfile, ProfileKeyword
+
+
+class TestGetActiveProfiles:
+    """测试订阅方案加载"""
+
+    def setup_method(self):
+        """每个测试方法前执行"""
+        engine = create_engine('sqlite://')
+        for model in (Keyword, KeywordProfile, ProfileKeyword):
+            model.__table__.create(engine)
+        self.db = sessionmaker(bind=engine)()
+        self.db.add_all([
+            Keyword(id='kw_广告', keyword='广告', weight=1.5, is_active='true'),
+            Keyword(id='kw_文化', keyword='文化', weight=1.1, is_active='false'),
+        ])
+        self.db.commit()
+
+    def teardown_method(self):
+        """每个测试方法后执行"""
+        self.db.close()
+
+    def test_fallback_to_global_keywords(self):
+        """测试未配置方案时使用全局关键词表作为默认方案"""
+        profiles = get_active_profiles(self.db, default_threshold=2.5)
+
+        assert len(profiles) == 1
+        assert profiles[0]['id'] == DEFAULT_PROFILE_ID
+        assert profiles[0]['alert_threshold'] == 2.5
+        assert profiles[0]['keywords'] == [{'keyword': '广告', 'weight': 1.5}]
+
+    def test_profiles_with_keywords(self):
+        """测试加载启用的方案及其启用的关键词"""
+        self.db.add_all([
+            KeywordProfile(id='p1', name='标识团队', alert_threshold=3.0,
+                           wecom_webhook='https://example.com/hook', is_active='true'),
+            KeywordProfile(id='p2', name='停用团队', is_active='false'),
+            ProfileKeyword(id='p1_1', profile_id='p1', keyword='标识', weight=2.0, is_active='true'),
+            ProfileKeyword(id='p1_2', profile_id='p1', keyword='标牌', weight=1.0, is_active='false'),
+            ProfileKeyword(id='p2_1', profile_id='p2', keyword='广告', weight=1.0, is_active='true'),
+        ])
+        self.db.commit()
+
+        profiles = get_active_profiles(self.db)
+
+        assert [profile['id'] for profile in profiles] == ['p1']
+        assert profiles[0]['alert_threshold'] == 3.0
+        assert profiles[0]['wecom_webhook'] == 'https://example.com/hook'
+        assert profiles[0]['keywords'] == [{'keyword': '标识', 'weight': 2.0}]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+@Time    : 2026/10/18 19:30
+@Author  : Manus AI
+@File    : test_list_walker.py
+@Desc    : 列表页增量翻页抓取单元测试
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import pytest
+from crawler.list_walker import ListWalker, pick_watermark
+from crawler.parsers.okcis_parser import OkcisParser
+
+LIST_URL = 'https://www.okcis.cn/bn/'
+
+
+def make_page(items, next_page=None):
+    """生成列表页HTML，items为 (编号, 日期) 列表"""
+    rows = ''.join(
+        f'<li><a hint="公告{number}" href="/n{number}.html">公告{number}</a><span>{date}</span></li>'
+        for number, date in items
+    )
+    link = f'<a href="/bn/?page={next_page}">下一页</a>' if next_page else ''
+    return f'<html><body><ul>{rows}</ul>{link}</body></html>'
+
+
+class FakeFetcher:
+    """按URL返回预设HTML的抓取器"""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.requested = []
+
+    def fetch_page(self, url):
+        self.requested.append(url)
+        return self.pages.get(url)
+
+
+class TestListWalker:
+    """测试翻页抓取"""
+
+    def setup_method(self):
+        """每个测试方法前执行：三页列表，每页两条公告"""
+        self.fetcher = FakeFetcher({
+            LIST_URL: make_page([(6, '2026-02-03'), (5, '2026-02-03')], next_page=2),
+            LIST_URL + '?page=2': make_page([(4, '2026-02-02'), (3, '2026-02-02')], next_page=3),
+            LIST_URL + '?page=3': make_page([(2, '2026-02-01'), (1, '2026-02-01')]),
+        })
+        self.walker = ListWalker(self.fetcher, OkcisParser(), max_pages=10)
+
+    def urls(self, result):
+        return [item['url'].rsplit('/', 1)[-1] for item in result.items]
+
+    def test_first_run_only_first_page(self):
+        """测试没有高水位时只抓取第一页"""
+        result = self.walker.walk(LIST_URL)
+
+        assert self.urls(result) == ['n6.html', 'n5.html']
+        assert result.pages == 1
+        assert result.newest['url'] == 'https://www.okcis.cn/n6.html'
+
+    def test_stop_at_watermark_url(self):
+        """测试遇到高水位URL即停止，不再请求后续页"""
+        result = self.walker.walk(LIST_URL, watermark_url='https://www.okcis.cn/n3.html')
+
+        assert self.urls(result) == ['n6.html', 'n5.html', 'n4.html']
+        assert result.reached_watermark
+        assert len(self.fetcher.requested) == 2
+
+    def test_stop_at_watermark_date(self):
+        """测试高水位公告被删除时按日期停止"""
+        result = self.walker.walk(LIST_URL, watermark_url='https://www.okcis.cn/deleted.html',
+                                  watermark_date='2026-02-02')
+
+        assert self.urls(result) == ['n6.html', 'n5.html', 'n4.html', 'n3.html']
+        assert result.reached_watermark
+        # 第三页整页早于高水位日期，抓取后即停止
+        assert result.pages == 3
+
+    def test_exhausted_and_max_pages(self):
+        """测试翻到最后一页，以及达到最大页数时停止"""
+        result = self.walker.walk(LIST_URL, watermark_url='https://www.okcis.cn/n0.html')
+        assert result.exhausted
+        assert len(result.items) == 6
+
+        self.walker.max_pages = 2
+        result = self.walker.walk(LIST_URL, watermark_url='https://www.okcis.cn/n0.html')
+        assert result.pages == 2
+        assert not (result.exhausted or result.reached_watermark)
+
+    def test_watermark_kept_when_walk_incomplete(self):
+        """测试翻页中途失败或达到最大页数时不推进高水位"""
+        watermark = 'https://www.okcis.cn/n1.html'
+        del self.fetcher.pages[LIST_URL + '?page=2']
+        result = self.walker.walk(LIST_URL, watermark_url=watermark)
+        assert result.pages == 1 and not result.complete
+        assert pick_watermark(result, set()) is None
+
+        self.fetcher.pages[LIST_URL + '?page=2'] = make_page([(4, '2026-02-02'), (3, '2026-02-02')], next_page=3)
+        self.walker.max_pages = 2
+        result = self.walker.walk(LIST_URL, watermark_url=watermark)
+        assert result.pages == 2 and not result.complete
+        assert pick_watermark(result, set()) is None
+
+        self.walker.max_pages = 10
+        result = self.walker.walk(LIST_URL, watermark_url=watermark)
+        assert result.complete
+        assert pick_watermark(result, set())['url'] == 'https://www.okcis.cn/n6.html'
+
+    def test_watermark_drains_backlog(self):
+        """测试有未处理公告时高水位推进到最早一条未处理公告之后，下次只翻到这里"""
+        result = self.walker.walk(LIST_URL, watermark_url='https://www.okcis.cn/n1.html')
+        pending = {'https://www.okcis.cn/n5.html', 'https://www.okcis.cn/n3.html'}
+
+        assert pick_watermark(result, pending) == {'url': 'https://www.okcis.cn/n2.html',
+                                                   'publish_date': '2026-02-01'}
+
+        # 最早一条未处理完时保持原高水位
+        assert pick_watermark(result, {'https://www.okcis.cn/n2.html'}) is None
+
+        # 下次任务从新高水位开始，积压的公告仍在翻页结果中
+        result = self.walker.walk(LIST_URL, watermark_url='https://www.okcis.cn/n2.html')
+        assert set(self.urls(result)) >= {'n5.html', 'n3.html'}
+
+    def test_first_run_with_pending_items(self):
+        """测试首次抓取有未处理公告时按日期记录高水位，公告挤到第二页也能翻到"""
+        result = self.walker.walk(LIST_URL)
+        assert result.first_run and result.complete
+        assert pick_watermark(result, set())['url'] == 'https://www.okcis.cn/n6.html'
+
+        watermark = pick_watermark(result, {'https://www.okcis.cn/n5.html'})
+        assert watermark == {'url': None, 'publish_date': '2026-02-03'}
+
+        # 新公告发布后 n5 被挤到第二页
+        self.fetcher.pages[LIST_URL] = make_page([(8, '2026-02-04'), (6, '2026-02-03')], next_page=2)
+        self.fetcher.pages[LIST_URL + '?page=2'] = make_page([(5, '2026-02-03'), (4, '2026-02-02')], next_page=3)
+        result = self.walker.walk(LIST_URL, watermark_date=watermark['publish_date'])
+        assert 'n5.html' in self.urls(result)
+        assert result.complete
+
+    def test_pinned_old_item_not_used_as_watermark(self):
+        """测试置顶的旧公告不作为新高水位"""
+        self.fetcher.pages[LIST_URL] = make_page([(1, '2026-02-01'), (6, '2026-02-03')], next_page=2)
+
+        result = self.walker.walk(LIST_URL)
+
+        assert result.newest['url'] == 'https://www.okcis.cn/n6.html'
+
+    def test_first_page_failed(self):
+        """测试第一页抓取失败"""
+        walker = ListWalker(FakeFetcher({}), OkcisParser())
+
+        assert walker.walk(LIST_URL).pages == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -12,8 +12,9 @@ import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
+import random
 import pytest
-from app.core.matcher import KeywordMatcher
+from app.core.matcher import KeywordMatcher, MultiProfileMatcher
 
 
 class TestKeywordMatcher:
@@ -66,5 +67,228 @@ class TestKeywordMatcher:
         assert self.matcher.is_relevant(text2, threshold=2.0) is False
 
 
+class TestAhoCorasickEngine:
+    """测试Aho-Corasick引擎与正则引擎结果一致"""
+
+    def test_overlapping_counts_match_regex(self):
+        """测试重叠出现的计数与re.findall一致"""
+        keywords = [{'keyword': 'aa', 'weight': 1.0}, {'keyword': 'a', 'weight': 0.5},
+                    {'keyword': 'aba', 'weight': 2.0}, {'keyword': 'b', 'weight': 1.0}]
+        text = 'aaaabababaa'
+
+        assert KeywordMatcher(keywords, engine='aho_corasick').calculate_match_score(text) == \
+            KeywordMatcher(keywords, engine='regex').calculate_match_score(text)
+        assert KeywordMatcher(keywords, engine='aho_corasick').count_keywords(text)[0] == 3
+
+    def test_random_equivalence(self):
+        """测试随机关键词和文本下两种引擎结果完全一致"""
+        rng = random.Random(7)
+        alphabet = 'ab标识牌广告'
+        keywords = [
+            {'keyword': ''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 4))),
+             'weight': round(rng.uniform(0.5, 2.0), 1)}
+            for _ in range(40)
+        ]
+        auto_matcher = KeywordMatcher(keywords, engine='aho_corasick')
+        regex_matcher = KeywordMatcher(keywords, engine='regex')
+
+        for _ in range(50):
+            text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 200)))
+            assert auto_matcher.calculate_match_score(text) == regex_matcher.calculate_match_score(text)
+
+    def test_regex_keywords_fall_back(self):
+        """测试含正则元字符的关键词仍按正则匹配"""
+        keywords = [{'keyword': '标识|标志', 'weight': 1.0}, {'keyword': '广告', 'weight': 1.5}]
+        matcher = KeywordMatcher(keywords, engine='aho_corasick')
+
+        score, details = matcher.calculate_match_score('标识标志广告')
+        assert details == {'标识|标志': 2, '广告': 1}
+        assert score == 3.0
+
+
+class TestScoreBatch:
+    """测试批量评分"""
+
+    def setup_method(self):
+        """每个测试方法前执行"""
+        rng = random.Random(11)
+        alphabet = 'ab标识牌广告'
+        self.keywords = [
+            {'keyword': ''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 4))),
+             'weight': round(rng.uniform(0.5, 2.0), 1)}
+            for _ in range(40)
+        ]
+        self.texts = [''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 200))) for _ in range(100)]
+        self.texts.append(None)
+        self.matcher = KeywordMatcher(self.keywords, engine='aho_corasick')
+
+    def test_scores_match_single_document_scoring(self):
+        """测试批量分数与逐篇计算一致"""
+        scores, matrix = self.matcher.score_batch(self.texts)
+
+        assert matrix.shape == (len(self.texts), len(self.keywords))
+        for text, score in zip(self.texts, scores):
+            assert score == self.matcher.calculate_match_score(text)[0]
+
+    def test_count_matrix(self):
+        """测试计数矩阵内容"""
+        _, matrix = self.matcher.score_batch(self.texts)
+        dense = matrix.toarray()
+
+        for row, text in enumerate(self.texts):
+            counts = self.matcher.count_keywords(text) if text else {}
+            assert {col: int(dense[row, col]) for col in dense[row].nonzero()[0]} == counts
+
+    def test_custom_weights(self):
+        """测试传入新权重重新评分，无需重新扫描文本"""
+        _, matrix = self.matcher.score_batch(self.texts)
+        doubled = [kw_data['weight'] * 2 for kw_data in self.keywords]
+
+        rescored = KeywordMatcher(
+            [{'keyword': kw_data['keyword'], 'weight': weight} for kw_data, weight in zip(self.keywords, doubled)],
+            engine='aho_corasick'
+        ).score_batch(self.texts)[0]
+        assert list(matrix.score(doubled)) == list(rescored)
+
+        with pytest.raises(ValueError):
+            matrix.score([1.0])
+
+    def test_iter_score_batches(self):
+        """测试流式批量评分与一次性评分一致"""
+        scores, _ = self.matcher.score_batch(self.texts)
+        batches = list(self.matcher.iter_score_batches(iter(self.texts), batch_size=30))
+
+        assert [matrix.shape[0] for _, matrix in batches] == [30, 30, 30, 11]
+        assert [score for batch_scores, _ in batches for score in batch_scores] == list(scores)
+
+
+class TestMultiProfileMatcher:
+    """测试多订阅方案匹配器"""
+
+    def setup_method(self):
+        """每个测试方法前执行"""
+        rng = random.Random(3)
+        alphabet = 'ab标识牌广告'
+        vocabulary = sorted({''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 4))) for _ in range(60)})
+        # 各方案关键词为词表的有序子集，方案之间有重叠关键词，权重各不相同
+        self.profiles = [
+            {'id': f'team{i}', 'name': f'团队{i}', 'alert_threshold': 2.0,
+             'keywords': [{'keyword': keyword, 'weight': round(rng.uniform(0.5, 2.0), 1)}
+                          for keyword in vocabulary if rng.random() < 0.4]}
+            for i in range(5)
+        ]
+        self.texts = [''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 200))) for _ in range(50)]
+        self.matcher = MultiProfileMatcher(self.profiles, engine='aho_corasick')
+
+    def test_scores_match_single_profile_matchers(self):
+        """测试各方案分数与单独使用 KeywordMatcher 的结果一致"""
+        singles = {profile['id']: KeywordMatcher(profile['keywords'], engine='regex') for profile in self.profiles}
+
+        for text in self.texts:
+            results = self.matcher.score_profiles(text)
+            for profile_id, single in singles.items():
+                assert results[profile_id] == single.calculate_match_score(text)
+
+    def test_shared_vocabulary(self):
+        """测试重叠关键词只进入一次共享词表"""
+        distinct = {kw_data['keyword'] for profile in self.profiles for kw_data in profile['keywords']}
+
+        assert len(self.matcher.keywords) == len(distinct)
+        assert len(self.matcher.matcher.keywords) == len(distinct)
+        assert self.matcher.weight_matrix.shape == (len(distinct), len(self.profiles))
+
+    def test_calculate_match_score_takes_best_profile(self):
+        """测试兼容接口返回各方案最高分"""
+        for text in self.texts:
+            results = self.matcher.score_profiles(text)
+            score, _ = self.matcher.calculate_match_score(text)
+            assert score == max(profile_score for profile_score, _ in results.values())
+
+    def test_score_batch(self):
+        """测试批量计算的分数矩阵与逐篇计算一致"""
+        scores = self.matcher.score_batch(self.texts)
+
+        assert scores.shape == (len(self.texts), len(self.profiles))
+        for row, text in enumerate(self.texts):
+            results = self.matcher.score_profiles(text)
+            assert list(scores[row]) == [results[profile['id']][0] for profile in self.profiles]
+
+
+class TestFieldScoring:
+    """测试按字段加权评分"""
+
+    def setup_method(self):
+        """每个测试方法前执行"""
+        rng = random.Random(5)
+        alphabet = 'ab标识牌广告'
+        vocabulary = sorted({''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 3))) for _ in range(40)})
+        self.profiles = [
+            {'id': f'team{i}', 'keywords': [{'keyword': keyword, 'weight': round(rng.uniform(0.5, 2.0), 1)}
+                                            for keyword in vocabulary if rng.random() < 0.5]}
+            for i in range(3)
+        ]
+        self.documents = [
+            {'title': ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 20))) or None,
+             'body': ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 200))),
+             'owner_unit': ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 10)))}
+            for _ in range(40)
+        ]
+
+    def test_default_weights_match_concatenated_text(self):
+        """测试默认字段权重下与旧算法（标题+正文）分数一致"""
+        matcher = MultiProfileMatcher(self.profiles, field_weights={'title': 1, 'body': 1, 'owner_unit': 0})
+        keywords = [{'keyword': '广告', 'weight': 1.5}, {'keyword': '标识', 'weight': 1.2}]
+        fields = {'title': '广告标识', 'body': '广告牌', 'owner_unit': '广告公司'}
+        results, _ = MultiProfileMatcher([{'id': 'a', 'keywords': keywords}],
+                                         field_weights={'title': 1, 'body': 1, 'owner_unit': 0}).score_fields(fields)
+
+        assert results['a'] == KeywordMatcher(keywords).calculate_match_score('广告标识 广告牌')
+        for document in self.documents:
+            results, _ = matcher.score_fields(document)
+            expected = matcher.score_profiles(f"{document['title'] or ''} {document['body']}")
+            assert {key: score for key, (score, _) in results.items()} == \
+                {key: score for key, (score, _) in expected.items()}
+
+    def test_title_weight(self):
+        """测试标题中的关键词按字段权重加分"""
+        profiles = [{'id': 'a', 'keywords': [{'keyword': '广告', 'weight': 1.0}]}]
+        matcher = MultiProfileMatcher(profiles, field_weights={'title': 2, 'body': 1, 'owner_unit': 0.5})
+
+        assert matcher.score_fields({'title': '广告', 'body': '其他'})[0]['a'] == (1.5, {'广告': 1})
+        assert matcher.score_fields({'title': '其他', 'body': '广告'})[0]['a'] == (1.0, {'广告': 1})
+        assert matcher.score_fields({'owner_unit': '广告公司'})[0]['a'] == (0.75, {'广告': 1})
+
+    def test_field_weight_scales_count_not_score(self):
+        """测试字段权重折算出现次数后再进入递减公式，权重2不等于分数翻倍"""
+        profiles = [{'id': 'a', 'keywords': [{'keyword': '广告', 'weight': 2.0}]}]
+        matcher = MultiProfileMatcher(profiles, field_weights={'title': 2, 'body': 1})
+
+        title_once = matcher.score_fields({'title': '广告'})[0]['a'][0]
+        body_once = matcher.score_fields({'body': '广告'})[0]['a'][0]
+        body_twice = matcher.score_fields({'body': '广告广告'})[0]['a'][0]
+
+        assert (title_once, body_once) == (3.0, 2.0)
+        assert title_once == body_twice
+        assert matcher.score_fields({'title': '广告广告'})[0]['a'][0] == 5.0
+
+    def test_hits_by_field(self):
+        """测试命中明细按字段记录，包括不参与计分的字段"""
+        profiles = [{'id': 'a', 'keywords': [{'keyword': '广告', 'weight': 1.0}, {'keyword': '标识', 'weight': 1.0}]}]
+        matcher = MultiProfileMatcher(profiles, field_weights={'title': 1, 'body': 1})
+        results, hits = matcher.score_fields({'title': '广告', 'body': '广告广告', 'owner_unit': '标识公司'})
+
+        assert hits == {'广告': {'title': 1, 'body': 2}, '标识': {'owner_unit': 1}}
+        assert results['a'] == (2.0, {'广告': 3})
+
+    def test_score_batch_fields(self):
+        """测试批量按字段评分与逐篇计算一致"""
+        matcher = MultiProfileMatcher(self.profiles, field_weights={'title': 2, 'body': 1, 'owner_unit': 0.5})
+        scores = matcher.score_batch_fields(self.documents)
+
+        for row, document in enumerate(self.documents):
+            results, _ = matcher.score_fields(document)
+            assert list(scores[row]) == [results[profile['id']][0] for profile in self.profiles]
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+@Time    : 2026/10/18 21:30
+@Author  : Manus AI
+@File    : test_matcher_cache.py
+@Desc    : 已编译匹配器缓存单元测试
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.core.matcher_cache import MatcherCache
+from app.models.bid_project import Keyword, KeywordProfile, KeywordVersion, ProfileKeyword
+
+
+class TestMatcherCache:
+    """测试已编译匹配器缓存"""
+
+    def setup_method(self):
+        """每个测试方法前执行"""
+        engine = create_engine('sqlite://')
+        for model in (Keyword, KeywordProfile, ProfileKeyword, KeywordVersion):
+            model.__table__.create(engine)
+        self.db = sessionmaker(bind=engine)()
+        self.db.add_all([
+            Keyword(id='kw_广告', keyword='广告', weight=1.5, is_active='true'),
+            KeywordVersion(id='keywords', version=0),
+        ])
+        self.db.commit()
+
+    def teardown_method(self):
+        """每个测试方法后执行"""
+        self.db.close()
+
+    def _bump_version(self):
+        """模拟触发器递增版本号"""
+        self.db.query(KeywordVersion).filter(KeywordVersion.id == 'keywords').update(
+            {KeywordVersion.version: KeywordVersion.version + 1}
+        )
+        self.db.commit()
+
+    def test_reuse_when_unchanged(self):
+        """测试版本号不变时复用同一个匹配器"""
+        cache = MatcherCache(check_interval=0)
+        _, first = cache.get(self.db)
+        _, second = cache.get(self.db)
+
+        assert first is second
+        assert cache.rebuilds == 1
+
+    def test_rebuild_after_keyword_change(self):
+        """测试版本号变化后重建匹配器并使用新关键词"""
+        cache = MatcherCache(check_interval=0)
+        _, first = cache.get(self.db)
+        assert first.calculate_match_score('文化广场')[0] == 0.0
+
+        self.db.add(Keyword(id='kw_文化', keyword='文化', weight=1.1, is_active='true'))
+        self.db.commit()
+        self._bump_version()
+
+        _, second = cache.get(self.db)
+        assert second is not first
+        assert second.calculate_match_score('文化广场')[0] == 1.1
+        assert cache.rebuilds == 2
+
+    def test_check_interval(self):
+        """测试检查间隔内不查询版本号"""
+        cache = MatcherCache(check_interval=3600)
+        _, first = cache.get(self.db)
+        self._bump_version()
+
+        _, second = cache.get(self.db)
+        assert second is first
+
+        cache.invalidate()
+        _, third = cache.get(self.db)
+        assert third is not first
+
+    def test_missing_version_row(self):
+        """测试版本表未初始化时每次检查都重建"""
+        self.db.query(KeywordVersion).delete()
+        self.db.commit()
+        cache = MatcherCache(check_interval=0)
+        cache.get(self.db)
+        cache.get(self.db)
+
+        assert cache.rebuilds == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
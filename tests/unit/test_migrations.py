@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+@Time    : 2026/10/18 23:00
+@Author  : Manus AI
+@File    : test_migrations.py
+@Desc    : 数据库迁移单元测试
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import pytest
+from app.core.migrations import (
+    build_fts_function_sql, parse_fts_mode_comment, plan_fts_install, validate_config_name
+)
+
+
+class TestFtsFunctions:
+    """测试全文检索函数定义"""
+
+    def test_validate_config_name(self):
+        """测试配置名只允许标识符"""
+        assert validate_config_name('chinese') == 'chinese'
+        with pytest.raises(ValueError):
+            validate_config_name("chinese'); DROP TABLE bid_projects; --")
+
+    def test_parser_config(self):
+        """测试使用分词配置时标题和正文分别加权"""
+        sql = build_fts_function_sql('chinese', bigram=False)
+
+        assert "setweight(to_tsvector('chinese', coalesce(title, '')), 'A')" in sql
+        assert "setweight(to_tsvector('chinese', coalesce(content, '')), 'B')" in sql
+        assert "plainto_tsquery('chinese', q)" in sql
+        assert 'bid_fts_bigrams' not in sql
+
+    def test_bigram_fallback(self):
+        """测试二元分词模式下文档和查询使用相同的切分"""
+        sql = build_fts_function_sql('chinese', bigram=True)
+
+        assert "'chinese'" not in sql
+        assert "bid_fts_bigrams(title)" in sql
+        assert "bid_fts_bigrams(content)" in sql
+        assert "plainto_tsquery('simple'" in sql
+
+
+class TestFtsInstallPlan:
+    """测试启动时的全文检索安装判断"""
+
+    def test_parse_mode_comment(self):
+        """测试从函数注释解析分词方式"""
+        assert parse_fts_mode_comment('fts_mode=chinese') == 'chinese'
+        assert parse_fts_mode_comment('fts_mode=bigram') == 'bigram'
+        assert parse_fts_mode_comment(None) == ''
+        assert parse_fts_mode_comment('手工修改的注释') == ''
+
+    def test_install_when_missing(self):
+        """测试函数或触发器缺失时安装"""
+        assert plan_fts_install(None, 'chinese') == 'install'
+
+    def test_skip_when_unchanged(self):
+        """测试分词方式未变化时不重建触发器"""
+        assert plan_fts_install('chinese', 'chinese') == 'ok'
+
+    def test_mismatch_when_mode_changed(self):
+        """测试分词方式变化或未记录时需要重装并回填"""
+        assert plan_fts_install('bigram', 'chinese') == 'mismatch'
+        assert plan_fts_install('', 'chinese') == 'mismatch'
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
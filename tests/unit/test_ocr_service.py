@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+@Time    : 2026/10/18 16:40
+@Author  : Manus AI
+@File    : test_ocr_service.py
+@Desc    : OCR服务客户端/服务端协议单元测试
+"""
+
+import sys
+import os
+import socketserver
+import threading
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import pytest
+from crawler.ocr_service import OcrClient, OcrWorkerPool, _OcrRequestHandler
+from crawler.captcha_solver import CaptchaSolver
+
+
+class FakePool:
+    """模拟OCR进程池：按图片内容返回固定文本"""
+
+    def recognize(self, image: bytes):
+        if image == b'timeout':
+            raise TimeoutError("OCR识别超时")
+        return image.decode('utf-8')
+
+
+def _noop_init():
+    """工作进程初始化（不加载PaddleOCR）"""
+
+
+def _echo_or_fail(image: bytes):
+    """工作进程任务：crash 时进程直接退出，hang 时卡住，其余原样返回"""
+    if image == b'crash':
+        os._exit(1)
+    if image == b'hang':
+        time.sleep(60)
+    return image.decode('utf-8')
+
+
+class TestOcrWorkerPool:
+    """测试工作进程池异常后自动重建"""
+
+    def setup_method(self):
+        """每个测试方法前执行：创建不加载模型的进程池"""
+        self.pool = OcrWorkerPool(workers=1, timeout=2, initializer=_noop_init, task=_echo_or_fail)
+
+    def teardown_method(self):
+        """每个测试方法后执行"""
+        self.pool.shutdown()
+
+    def test_worker_killed(self):
+        """测试工作进程被杀死后，下一次请求仍能成功"""
+        assert self.pool.recognize(b'1+1') == '1+1'
+        for process in list(self.pool.executor._processes.values()):
+            process.kill()
+            process.join()
+
+        assert self.pool.recognize(b'2+2') == '2+2'
+        assert self.pool.restarts == 1
+
+    def test_worker_crash_during_request(self):
+        """测试识别中工作进程崩溃时重建，崩溃的请求重试一次后报错"""
+        with pytest.raises(RuntimeError):
+            self.pool.recognize(b'crash')
+
+        assert self.pool.recognize(b'3+3') == '3+3'
+
+    def test_timeout_terminates_stuck_worker(self):
+        """测试识别超时后终止卡住的工作进程，后续请求不受影响"""
+        executor = self.pool.executor
+        with pytest.raises(TimeoutError):
+            self.pool.recognize(b'hang')
+
+        assert self.pool.executor is not executor
+        assert self.pool.recognize(b'4+4') == '4+4'
+
+
+class TestOcrService:
+    """测试OCR服务"""
+
+    def setup_method(self):
+        """每个测试方法前执行：启动使用模拟进程池的服务"""
+        self.socket_path = f"/tmp/bid_monitor_ocr_test_{os.getpid()}.sock"
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self.server = socketserver.ThreadingUnixStreamServer(self.socket_path, _OcrRequestHandler)
+        self.server.daemon_threads = True
+        self.server.pool = FakePool()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def teardown_method(self):
+        """每个测试方法后执行"""
+        self.server.shutdown()
+        self.server.server_close()
+        os.unlink(self.socket_path)
+
+    def test_recognize(self):
+        """测试客户端请求识别"""
+        client = OcrClient(self.socket_path, timeout=2)
+
+        assert client.recognize('3+5=?'.encode('utf-8')) == '3+5=?'
+
+    def test_recognize_error(self):
+        """测试服务端识别失败时客户端抛出异常"""
+        client = OcrClient(self.socket_path, timeout=2)
+
+        with pytest.raises(RuntimeError):
+            client.recognize(b'timeout')
+
+    def test_service_unavailable(self):
+        """测试服务不可用时抛出OSError"""
+        client = OcrClient('/tmp/bid_monitor_ocr_missing.sock', timeout=1)
+
+        with pytest.raises(OSError):
+            client.recognize(b'1+1')
+
+    def test_solver_uses_service(self):
+        """测试识别器作为瘦客户端通过服务识别，不加载本地模型"""
+        solver = CaptchaSolver(service_socket=self.socket_path, cache_path='')
+
+        assert solver.solve_image('12 × 3 = ?'.encode('utf-8')) == 36
+        assert solver._ocr is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
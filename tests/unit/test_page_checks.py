@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+@Time    : 2026/10/18 13:30
+@Author  : Manus AI
+@File    : test_page_checks.py
+@Desc    : 页面特征检测单元测试
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import pytest
+from crawler.page_checks import is_captcha_html, needs_javascript
+
+
+class TestPageChecks:
+    """测试验证码页和JS渲染页检测"""
+
+    def test_captcha_by_title(self):
+        """测试通过标题识别验证码页"""
+        html = "<html><head><title>请输入验证码</title></head><body></body></html>"
+        assert is_captcha_html(html) is True
+
+    def test_captcha_by_input(self):
+        """测试通过输入框识别验证码页"""
+        html = '<html><body><img src="/code.png"><input type="text" placeholder="请输入验证结果"></body></html>'
+        assert is_captcha_html(html) is True
+
+    def test_normal_page(self):
+        """测试普通详情页"""
+        html = f"""
+        <html><head><title>招标公告</title></head>
+        <body><h1>某市文化广场标识标牌制作安装项目</h1><div class="content">{'项目内容' * 100}</div>
+        <script>var a = 1;</script></body></html>
+        """
+        assert is_captcha_html(html) is False
+        assert needs_javascript(html) is False
+
+    def test_javascript_shell(self):
+        """测试只有脚本外壳的页面"""
+        html = f"""
+        <html><body><div id="app"></div>
+        <script>{'render();' * 100}</script>
+        <noscript>请启用JavaScript</noscript></body></html>
+        """
+        assert needs_javascript(html) is True
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -41,6 +41,36 @@ class TestOkcisParser:
         assert "https://www.okcis.cn/20260131-n1.html" in urls
         assert "https://www.okcis.cn/20260131-n2.html" in urls
 
+    def test_get_list_items(self):
+        """测试列表页记录解析：hint属性作为标题，发布日期取自所在行或URL"""
+        test_html = """
+        <html>
+            <body>
+                <ul>
+                    <li><a hint="某市标识标牌采购项目" href="/20260131-n1.html">某市标识...</a><span>2026-02-01</span></li>
+                    <li><a hint="办公用品采购" href="https://www.okcis.cn/n2.html">办公用品...</a></li>
+                </ul>
+                <a hint="宣传栏制作项目" href="/20260105-n3.html">宣传栏...</a>
+            </body>
+        </html>
+        """
+
+        items = self.parser.get_list_items(test_html)
+
+        assert [item['title'] for item in items] == ['某市标识标牌采购项目', '办公用品采购', '宣传栏制作项目']
+        assert items[0]['url'] == "https://www.okcis.cn/20260131-n1.html"
+        assert items[0]['publish_date'] == '2026-02-01'
+        assert items[1]['publish_date'] is None
+        assert items[2]['publish_date'] == '2026-01-05'
+
+    def test_get_next_page_url(self):
+        """测试下一页链接解析"""
+        test_html = '<a href="?page=1">上一页</a><a href="?page=3">下一页</a>'
+
+        assert self.parser.get_next_page_url(test_html, "https://www.okcis.cn/bn/?page=2") == \
+            "https://www.okcis.cn/bn/?page=3"
+        assert self.parser.get_next_page_url('<span>下一页</span>', "https://www.okcis.cn/bn/") is None
+
     def test_parse_detail_page(self):
         """测试详情页解析"""
         test_html = """
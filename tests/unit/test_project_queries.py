@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+@Time    : 2026/10/18 23:50
+@Author  : Manus AI
+@File    : test_project_queries.py
+@Desc    : 看板只读查询单元测试
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from datetime import date
+import pytest
+from sqlalchemy.dialects import postgresql
+from app.crud.project_queries import (
+    build_crawl_logs_statement, build_recent_projects_statement, build_statistics_statement
+)
+
+
+def _compile(statement):
+    """编译为PostgreSQL语句"""
+    return statement.compile(dialect=postgresql.dialect())
+
+
+class TestProjectQueries:
+    """测试只读查询只选取展示需要的列"""
+
+    def test_recent_projects_projection(self):
+        """测试最近项目查询不读取正文、检索向量和原始HTML"""
+        compiled = _compile(build_recent_projects_statement(limit=50, min_score=2.0))
+        sql = str(compiled)
+
+        assert sql.startswith('SELECT bid_projects.title, bid_projects.match_score, bid_projects.owner_unit')
+        assert 'content_' not in sql
+        assert 'bid_project_raw' not in sql
+        assert 'ORDER BY bid_projects.created_at DESC' in sql
+        assert set(compiled.params.values()) == {2.0, 50}
+
+    def test_crawl_logs_projection(self):
+        """测试爬取日志查询不读取错误信息和运行指标"""
+        sql = str(_compile(build_crawl_logs_statement(limit=10)))
+
+        assert 'crawl_logs.task_id' in sql
+        assert 'error_message' not in sql
+        assert 'metrics' not in sql
+
+    def test_statistics_single_statement(self):
+        """测试统计数据由一条聚合语句返回"""
+        compiled = _compile(build_statistics_statement(date(2026, 10, 18)))
+        sql = str(compiled)
+
+        assert sql.count('FROM bid_projects') == 1
+        assert 'count(*) FILTER (WHERE date(bid_projects.created_at) = %(date_1)s::DATE)' in sql
+        assert compiled.params['date_1'] == date(2026, 10, 18)
+        assert 'count(*) FILTER (WHERE bid_projects.match_score >=' in sql
+        assert 'max(crawl_logs.start_time)' in sql
+        assert 3.0 in compiled.params.values()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+@Time    : 2026/10/18 14:30
+@Author  : Manus AI
+@File    : test_rate_limiter.py
+@Desc    : 自适应限速器单元测试
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import pytest
+from crawler.rate_limiter import AdaptiveRateLimiter
+
+
+class FakeClock:
+    """可手动推进的时钟"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestAdaptiveRateLimiter:
+    """测试自适应限速器"""
+
+    def setup_method(self):
+        """每个测试方法前执行"""
+        self.clock = FakeClock()
+        self.limiter = AdaptiveRateLimiter(
+            initial_rate=1.0, min_rate=0.1, max_rate=2.0, increase=0.5,
+            burst=2, window=10, jitter=0, clock=self.clock
+        )
+        self.url = "https://www.okcis.cn/bn/"
+
+    def test_token_bucket(self):
+        """测试令牌桶：突发容量内不等待，之后按速率等待"""
+        assert self.limiter.reserve(self.url) == 0
+        assert self.limiter.reserve(self.url) == 0
+        assert self.limiter.reserve(self.url) == pytest.approx(1.0)
+
+        self.clock.now += 5
+        assert self.limiter.reserve(self.url) == 0
+
+    def test_additive_increase(self):
+        """测试成功响应提升速率，且不超过上限"""
+        self.limiter.record_success(self.url)
+        assert self.limiter.get_metrics()['www.okcis.cn']['rate'] == 1.5
+
+        for _ in range(5):
+            self.limiter.record_success(self.url)
+        assert self.limiter.get_metrics()['www.okcis.cn']['rate'] == 2.0
+
+    def test_multiplicative_decrease_on_captcha(self):
+        """测试验证码率超过阈值时降速并进入退避"""
+        self.limiter.record_captcha(self.url)
+
+        metrics = self.limiter.get_metrics()['www.okcis.cn']
+        assert metrics['rate'] == 0.5
+        assert metrics['backoff'] is True
+        assert metrics['captcha'] == 1
+
+        # 冷却时间内不重复降速
+        self.limiter.record_error(self.url)
+        assert self.limiter.get_metrics()['www.okcis.cn']['rate'] == 0.5
+
+        self.clock.now += 10
+        self.limiter.record_error(self.url)
+        assert self.limiter.get_metrics()['www.okcis.cn']['rate'] == 0.25
+
+    def test_no_increase_while_backing_off(self):
+        """测试退避期间成功响应不提升速率"""
+        self.limiter.record_captcha(self.url)
+        self.limiter.record_success(self.url)
+
+        assert self.limiter.get_metrics()['www.okcis.cn']['rate'] == 0.5
+
+    def test_hosts_are_independent(self):
+        """测试不同域名互不影响"""
+        self.limiter.record_captcha(self.url)
+        self.limiter.record_success("https://other.example.com/a")
+
+        metrics = self.limiter.get_metrics()
+        assert metrics['www.okcis.cn']['rate'] == 0.5
+        assert metrics['other.example.com']['rate'] == 1.5
+
+    def test_reset_stats_keeps_rate(self):
+        """测试清空计数时保留已学习的速率"""
+        self.limiter.record_captcha(self.url)
+        self.limiter.reset_stats()
+
+        metrics = self.limiter.get_metrics()['www.okcis.cn']
+        assert metrics['captcha'] == 0
+        assert metrics['rate'] == 0.5
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
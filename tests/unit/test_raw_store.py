@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+@Time    : 2026/10/18 23:30
+@Author  : Manus AI
+@File    : test_raw_store.py
+@Desc    : 原始HTML压缩存储单元测试
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from app.core.raw_store import CODEC_ZLIB, CODEC_ZSTD, compress_html, decompress_html
+from app.models.bid_project import BidProject
+
+
+class TestRawStore:
+    """测试压缩和解压"""
+
+    def setup_method(self):
+        """测试前准备"""
+        self.html = '<html><body><div class="content">标识标牌制作安装项目招标公告</div></body></html>' * 50
+
+    def test_zlib_round_trip(self):
+        """测试zlib压缩后可还原，且体积明显变小"""
+        stored = compress_html(self.html, CODEC_ZLIB)
+
+        assert stored['codec'] == CODEC_ZLIB
+        assert stored['raw_size'] == len(self.html.encode('utf-8'))
+        assert len(stored['content']) * 5 < stored['raw_size']
+        assert decompress_html(stored['codec'], stored['content']) == self.html
+
+    def test_zstd_round_trip(self):
+        """测试zstd压缩后可还原"""
+        pytest.importorskip('zstandard')
+        stored = compress_html(self.html, CODEC_ZSTD)
+
+        assert decompress_html(CODEC_ZSTD, stored['content']) == self.html
+
+    def test_unknown_codec(self):
+        """测试不支持的压缩方式"""
+        with pytest.raises(ValueError):
+            compress_html(self.html, 'lz4')
+        with pytest.raises(ValueError):
+            decompress_html('lz4', b'')
+
+
+class TestBidProjectRaw:
+    """测试项目模型的原始HTML字段"""
+
+    def test_content_raw_stored_in_side_table(self):
+        """测试content_raw写入关联的压缩记录，读取时解压"""
+        project = BidProject(project_id='p1', title='标识标牌', source_url='u1', content_raw='<p>标识标牌</p>')
+
+        assert project.raw is not None
+        assert project.raw.content != '<p>标识标牌</p>'.encode('utf-8')
+        assert project.content_raw == '<p>标识标牌</p>'
+
+        project.content_raw = None
+        assert project.raw is None and project.content_raw is None
+
+    def test_heavy_columns_deferred(self):
+        """测试列表查询不读取正文和检索向量"""
+        sql = str(select(BidProject).compile(dialect=postgresql.dialect()))
+
+        assert 'bid_projects.title' in sql
+        assert 'content_text' not in sql
+        assert 'content_tsvector' not in sql
+        assert 'content_raw' not in sql
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+@Time    : 2026/10/18 22:00
+@Author  : Manus AI
+@File    : test_rescorer.py
+@Desc    : 历史项目批量重新评分单元测试
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import pytest
+from app.core.matcher import MultiProfileMatcher
+from app.core.rescorer import build_update_statement, load_checkpoint, save_checkpoint, score_rows
+
+
+class TestRescorer:
+    """测试重新评分的评分、语句构建和断点"""
+
+    def setup_method(self):
+        """每个测试方法前执行"""
+        self.profiles = [
+            {'id': 'a', 'keywords': [{'keyword': '广告', 'weight': 1.5}]},
+            {'id': 'b', 'keywords': [{'keyword': '标识', 'weight': 1.2}, {'keyword': '广告', 'weight': 0.5}]},
+        ]
+        self.matcher = MultiProfileMatcher(self.profiles)
+
+    def test_score_rows(self):
+        """测试取各方案最高分，空标题和空正文按空字符串处理"""
+        rows = [('p1', '广告牌', None, None), ('p2', None, '标识标识广告', '标识公司'), ('p3', '道路', '', None)]
+
+        assert score_rows(self.matcher, rows) == [('p1', 1.5), ('p2', 2.3), ('p3', 0.0)]
+        assert score_rows(MultiProfileMatcher([]), rows) == [('p1', 0.0), ('p2', 0.0), ('p3', 0.0)]
+
+    def test_build_update_statement(self):
+        """测试一批项目生成一条带绑定参数的UPDATE语句"""
+        statement, params = build_update_statement([('p1', 1.5), ("p'2", 0.0)])
+        sql = str(statement)
+
+        assert sql.count('UPDATE') == 1
+        assert 'FROM (VALUES (:id_0, CAST(:score_0 AS double precision)), (:id_1,' in sql
+        assert 'IS DISTINCT FROM' in sql
+        assert "p'2" not in sql
+        assert params == {'id_0': 'p1', 'score_0': 1.5, 'id_1': "p'2", 'score_1': 0.0}
+
+    def test_checkpoint_roundtrip(self, tmp_path):
+        """测试断点保存和读取"""
+        path = str(tmp_path / 'state' / 'checkpoint.json')
+        assert load_checkpoint(path) == {'last_project_id': None, 'scanned': 0, 'updated': 0}
+
+        save_checkpoint(path, {'last_project_id': 'p9', 'scanned': 9, 'updated': 3})
+        assert load_checkpoint(path) == {'last_project_id': 'p9', 'scanned': 9, 'updated': 3}
+        assert not os.path.exists(f"{path}.tmp")
+
+        save_checkpoint(None, {'last_project_id': 'p10'})
+        assert load_checkpoint(None)['last_project_id'] is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
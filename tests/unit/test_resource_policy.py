@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+@Time    : 2026/10/18 12:20
+@Author  : Manus AI
+@File    : test_resource_policy.py
+@Desc    : 请求拦截策略单元测试
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import pytest
+from crawler.resource_policy import ResourcePolicy, ESTIMATED_RESOURCE_BYTES
+
+
+class TestResourcePolicy:
+    """测试请求拦截策略"""
+
+    def setup_method(self):
+        """每个测试方法前执行"""
+        self.policy = ResourcePolicy(
+            blocked_types=['image', 'font', 'stylesheet'],
+            blocked_domains=['hm.baidu.com'],
+            allowed_domains=['captcha.okcis.cn']
+        )
+
+    def test_block_by_type(self):
+        """测试按资源类型拦截"""
+        assert self.policy.should_block('image', 'https://www.okcis.cn/logo.png') is True
+        assert self.policy.should_block('font', 'https://www.okcis.cn/a.woff') is True
+        assert self.policy.should_block('script', 'https://www.okcis.cn/app.js') is False
+        assert self.policy.should_block('document', 'https://www.okcis.cn/bn/') is False
+
+    def test_block_by_domain(self):
+        """测试按域名拦截，包含子域名"""
+        assert self.policy.should_block('script', 'https://hm.baidu.com/hm.js') is True
+        assert self.policy.should_block('script', 'https://x.hm.baidu.com/hm.js') is True
+        assert self.policy.should_block('script', 'https://www.baidu.com/hm.js') is False
+
+    def test_allowed_domain_wins(self):
+        """测试放行域名优先于资源类型"""
+        assert self.policy.should_block('image', 'https://captcha.okcis.cn/code.png') is False
+
+    def test_stats(self):
+        """测试拦截统计"""
+        self.policy.record_blocked('image')
+        self.policy.record_blocked('image')
+        self.policy.record_blocked('font')
+
+        stats = self.policy.get_stats()
+        assert stats['blocked_requests'] == 3
+        assert stats['bytes_saved'] == 2 * ESTIMATED_RESOURCE_BYTES['image'] + ESTIMATED_RESOURCE_BYTES['font']
+        assert stats['by_type'] == {'image': 2, 'font': 1}
+
+        self.policy.reset_stats()
+        assert self.policy.get_stats()['blocked_requests'] == 0
+
+    def test_disabled(self):
+        """测试空策略不拦截"""
+        policy = ResourcePolicy()
+
+        assert policy.enabled is False
+        assert policy.should_block('image', 'https://www.okcis.cn/logo.png') is False
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
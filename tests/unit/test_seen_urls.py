@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+@Time    : 2026/10/18 19:00
+@Author  : Manus AI
+@File    : test_seen_urls.py
+@Desc    : 已抓取URL索引单元测试
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import sessionmaker
+from app.core.seen_urls import SeenUrlIndex, build_failure_statement, normalize_url, url_hash
+from app.models.bid_project import SeenUrl
+
+
+class TestNormalizeUrl:
+    """测试URL规范化"""
+
+    def test_equivalent_urls(self):
+        """测试等价URL规范化后相同"""
+        assert normalize_url('HTTPS://WWW.OKCIS.CN:443/20260131-n1.html#top') == \
+            'https://www.okcis.cn/20260131-n1.html'
+        assert normalize_url('https://www.okcis.cn/a?b=2&a=1&utm_source=x') == \
+            normalize_url('https://www.okcis.cn/a?a=1&b=2')
+
+    def test_different_urls(self):
+        """测试路径大小写和非默认端口保留"""
+        assert url_hash('https://www.okcis.cn/A.html') != url_hash('https://www.okcis.cn/a.html')
+        assert normalize_url('http://example.com:8080/x') == 'http://example.com:8080/x'
+
+
+class TestSeenUrlIndex:
+    """测试URL索引（SQLite内存数据库）"""
+
+    def setup_method(self):
+        """每个测试方法前执行：创建seen_urls表并写入已抓取URL"""
+        engine = create_engine('sqlite://')
+        SeenUrl.__table__.create(engine)
+        self.db = sessionmaker(bind=engine)()
+        self.db.add(SeenUrl(url_hash=url_hash('https://www.okcis.cn/n1.html'),
+                            url=normalize_url('https://www.okcis.cn/n1.html')))
+        self.db.commit()
+        self.index = SeenUrlIndex()
+
+    def teardown_method(self):
+        """每个测试方法后执行"""
+        self.db.close()
+
+    def test_filter_unseen(self):
+        """测试过滤已抓取的URL，保持原顺序"""
+        urls = ['https://www.okcis.cn/n3.html', 'https://www.okcis.cn/n1.html#x', 'https://www.okcis.cn/n2.html']
+
+        assert self.index.filter_unseen(self.db, urls) == [
+            'https://www.okcis.cn/n3.html', 'https://www.okcis.cn/n2.html'
+        ]
+
+    def test_duplicate_urls(self):
+        """测试同一列表中重复或等价的URL"""
+        urls = ['https://www.okcis.cn/n2.html', 'https://www.okcis.cn/n2.html#top', 'https://www.okcis.cn/n1.html']
+
+        assert self.index.filter_unseen(self.db, urls) == urls[:2]
+        assert self.index.filter_unseen(self.db, []) == []
+
+    def test_failed_urls_retried_until_limit(self):
+        """测试失败次数未达上限的URL继续抓取，达到上限后放弃"""
+        for number, failures in ((2, 2), (3, 3)):
+            url = f'https://www.okcis.cn/n{number}.html'
+            self.db.add(SeenUrl(url_hash=url_hash(url), url=normalize_url(url), status='failed', failures=failures))
+        self.db.commit()
+        urls = ['https://www.okcis.cn/n2.html', 'https://www.okcis.cn/n3.html']
+
+        assert SeenUrlIndex(max_failures=3).filter_unseen(self.db, urls) == ['https://www.okcis.cn/n2.html']
+        assert SeenUrlIndex(max_failures=5).filter_unseen(self.db, urls) == urls
+
+    def test_failure_statement(self):
+        """测试失败计数只累加失败记录，不影响已入库的URL"""
+        sql = str(build_failure_statement([{'url_hash': 'a', 'url': 'u'}]).compile(dialect=postgresql.dialect()))
+
+        assert 'ON CONFLICT (url_hash) DO UPDATE SET failures = (seen_urls.failures +' in sql
+        assert 'WHERE seen_urls.status =' in sql
+        assert sql.endswith('RETURNING seen_urls.url_hash, seen_urls.failures')
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
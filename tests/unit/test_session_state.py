@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+@Time    : 2026/10/18 11:20
+@Author  : Manus AI
+@File    : test_session_state.py
+@Desc    : 会话状态持久化单元测试
+"""
+
+import sys
+import os
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import pytest
+from crawler.session_state import SessionStateStore
+
+
+class TestSessionStateStore:
+    """测试会话状态存储"""
+
+    def setup_method(self):
+        """每个测试方法前执行"""
+        self.state = {'cookies': [{'name': 'sid', 'value': 'abc', 'domain': '.okcis.cn', 'path': '/'}], 'origins': []}
+
+    def test_save_and_load(self, tmp_path):
+        """测试保存后可重新加载"""
+        store = SessionStateStore(str(tmp_path / 'state' / 'storage_state.json'))
+        store.save(self.state)
+
+        loaded = SessionStateStore(str(tmp_path / 'state' / 'storage_state.json')).load()
+
+        assert loaded == self.state
+
+    def test_load_expired(self, tmp_path):
+        """测试过期状态不加载"""
+        path = tmp_path / 'storage_state.json'
+        SessionStateStore(str(path)).save(self.state)
+        old = time.time() - 3 * 3600
+        os.utime(path, (old, old))
+
+        assert SessionStateStore(str(path), max_age_hours=2).load() is None
+
+    def test_has_newer(self, tmp_path):
+        """测试检测其他进程刷新的状态"""
+        path = tmp_path / 'storage_state.json'
+        worker_a = SessionStateStore(str(path))
+        worker_b = SessionStateStore(str(path))
+
+        assert worker_a.has_newer() is False
+
+        worker_b.save(self.state)
+        assert worker_a.has_newer() is True
+        assert worker_b.has_newer() is False
+
+        worker_a.load()
+        assert worker_a.has_newer() is False
+
+    def test_invalidate_keeps_newer_state(self, tmp_path):
+        """测试失效时不删除其他进程刚刷新的状态"""
+        path = tmp_path / 'storage_state.json'
+        worker_a = SessionStateStore(str(path))
+        worker_b = SessionStateStore(str(path))
+        worker_a.save(self.state)
+        worker_b.load()
+
+        # worker_a 刷新了状态，worker_b 持有的旧版本失效
+        new_mtime = os.stat(path).st_mtime + 10
+        os.utime(path, (new_mtime, new_mtime))
+        worker_b.invalidate()
+        assert path.exists()
+
+        # worker_a 自己加载的版本失效时删除文件
+        worker_a.load()
+        worker_a.invalidate()
+        assert not path.exists()
+
+    def test_disabled(self):
+        """测试未配置路径时禁用"""
+        store = SessionStateStore(None)
+        store.save(self.state)
+
+        assert store.enabled is False
+        assert store.load() is None
+        assert store.has_newer() is False
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])